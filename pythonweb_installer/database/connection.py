@@ -4,8 +4,11 @@ Database connection functionality.
 import os
 import re
 import logging
+import queue
 import sqlite3
-from typing import Dict, Any, List, Tuple, Optional, Union
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, List, Tuple, Optional, Union, Iterator, Sequence
 from urllib.parse import urlparse
 
 try:
@@ -29,14 +32,17 @@ class DatabaseConnection:
     Database connection manager.
     """
     
-    def __init__(self, connection_string: str):
+    def __init__(self, connection_string: str, shared: bool = False):
         """
         Initialize the database connection manager.
         
         Args:
             connection_string: Database connection string
+            shared: Whether the connection may be handed between threads, one
+                holder at a time (as a pooled connection is)
         """
         self.connection_string = connection_string
+        self.shared = shared
         self.connection = None
         self.cursor = None
         self.db_type = self._determine_db_type(connection_string)
@@ -86,8 +92,9 @@ class DatabaseConnection:
                 if db_dir and not os.path.exists(db_dir):
                     os.makedirs(db_dir, exist_ok=True)
                 
-                # Connect to the database
-                self.connection = sqlite3.connect(db_path)
+                # Connect to the database; only shared connections skip the
+                # same-thread check
+                self.connection = sqlite3.connect(db_path, check_same_thread=not self.shared)
                 self.connection.row_factory = sqlite3.Row
             
             elif self.db_type == 'postgresql':
@@ -206,6 +213,66 @@ class DatabaseConnection:
             logger.error(f"Failed to execute query: {str(e)}")
             return False, None
     
+    def executemany(
+        self,
+        query: str,
+        params_seq: Sequence[Union[List, Tuple, Dict]]
+    ) -> Tuple[bool, None]:
+        """
+        Execute a query once for each set of parameters.
+        
+        Args:
+            query: SQL query
+            params_seq: Sequence of query parameters
+            
+        Returns:
+            Tuple[bool, None]: Success status and no results
+        """
+        try:
+            if not self.connection:
+                logger.error("Not connected to database")
+                return False, None
+            
+            # Execute the query for all parameter sets in one driver call
+            self.cursor.executemany(query, params_seq)
+            
+            return True, None
+        
+        except Exception as e:
+            logger.error(f"Failed to execute query: {str(e)}")
+            return False, None
+    
+    def execute_batch(self, statements: List[str]) -> Tuple[bool, None]:
+        """
+        Execute several statements without fetching results.
+        
+        Args:
+            statements: SQL statements
+            
+        Returns:
+            Tuple[bool, None]: Success status and no results
+        """
+        try:
+            if not self.connection:
+                logger.error("Not connected to database")
+                return False, None
+            
+            if self.db_type == 'sqlite':
+                # Send all statements to SQLite as a single script inside one
+                # transaction; executescript would otherwise autocommit each
+                # statement, leaving commit() and rollback() with nothing to do
+                script = ";\n".join(statement.strip().rstrip(';') for statement in statements)
+                self.connection.executescript("BEGIN;\n" + script + ";")
+            else:
+                for statement in statements:
+                    self.cursor.execute(statement)
+            
+            return True, None
+        
+        except Exception as e:
+            logger.error(f"Failed to execute batch: {str(e)}")
+            return False, None
+    
     def commit(self) -> bool:
         """
         Commit the current transaction.
@@ -666,19 +733,21 @@ class DatabaseConnection:
             return False
 
 
-def create_connection(connection_string: str) -> Optional[DatabaseConnection]:
+def create_connection(connection_string: str,
+                      shared: bool = False) -> Optional[DatabaseConnection]:
     """
     Create a database connection.
     
     Args:
         connection_string: Database connection string
+        shared: Whether the connection may be handed between threads
         
     Returns:
         Optional[DatabaseConnection]: Database connection object or None if connection failed
     """
     try:
         # Create a database connection
-        connection = DatabaseConnection(connection_string)
+        connection = DatabaseConnection(connection_string, shared=shared)
         
         # Connect to the database
         if connection.connect():
@@ -691,6 +760,117 @@ def create_connection(connection_string: str) -> Optional[DatabaseConnection]:
         return None
 
 
+class ConnectionPool:
+    """
+    Pool of database connections shared between threads.
+    """
+    
+    def __init__(self, connection_string: str, pool_size: int = 5, timeout: Optional[float] = None):
+        """
+        Initialize the connection pool.
+        
+        Args:
+            connection_string: Database connection string
+            pool_size: Maximum number of open connections
+            timeout: Seconds to wait for a free connection, or None to wait forever
+        """
+        self.connection_string = connection_string
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[DatabaseConnection]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+    
+    def _checkout(self) -> DatabaseConnection:
+        """
+        Take an idle connection, opening a new one while the pool is not full.
+        
+        Returns:
+            DatabaseConnection: Database connection
+            
+        Raises:
+            ConnectionError: If no connection could be opened or none became free in time
+        """
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        # Reserve a slot before connecting so the pool never exceeds its size
+        with self._lock:
+            can_create = self._created < self.pool_size
+            
+            if can_create:
+                self._created += 1
+        
+        if can_create:
+            connection = create_connection(self.connection_string, shared=True)
+            
+            if connection is None:
+                with self._lock:
+                    self._created -= 1
+                
+                raise ConnectionError(f"Failed to connect to {self.connection_string}")
+            
+            return connection
+        
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise ConnectionError("Timed out waiting for a pooled database connection")
+    
+    @contextmanager
+    def acquire(self) -> Iterator[DatabaseConnection]:
+        """
+        Check out a connection for the duration of a with block.
+        
+        Uncommitted work is rolled back if the block raises.
+        
+        Yields:
+            DatabaseConnection: Database connection
+        """
+        connection = self._checkout()
+        
+        try:
+            yield connection
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            self._idle.put(connection)
+    
+    def close(self) -> None:
+        """
+        Disconnect all idle connections.
+        """
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            
+            connection.disconnect()
+            
+            with self._lock:
+                self._created -= 1
+
+
+def create_connection_pool(connection_string: str, pool_size: int = 5,
+                           timeout: Optional[float] = None) -> ConnectionPool:
+    """
+    Create a database connection pool.
+    
+    Args:
+        connection_string: Database connection string
+        pool_size: Maximum number of open connections
+        timeout: Seconds to wait for a free connection, or None to wait forever
+        
+    Returns:
+        ConnectionPool: Connection pool
+    """
+    return ConnectionPool(connection_string, pool_size, timeout)
+
+
 def get_connection_string(db_type: str, **kwargs) -> str:
     """
     Get a database connection string.
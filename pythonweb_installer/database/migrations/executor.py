@@ -12,6 +12,7 @@ from pythonweb_installer.database.connection import DatabaseConnection
 from pythonweb_installer.database.migrations.version import (
     VersionManager,
     create_version_manager,
+    forget_migrations_table,
     parse_migration_version
 )
 
@@ -88,7 +89,7 @@ class MigrationExecutor:
             
             return migrations
         
-        except Exception as e:
+        except OSError as e:
             logger.error(f"Failed to get available migrations: {str(e)}")
             return []
     
@@ -115,7 +116,7 @@ class MigrationExecutor:
             
             return None
         
-        except Exception as e:
+        except (OSError, UnicodeDecodeError) as e:
             logger.error(f"Failed to get migration description: {str(e)}")
             return None
     
@@ -187,13 +188,18 @@ class MigrationExecutor:
             
             # Load the module
             spec = importlib.util.spec_from_file_location(module_name, migration_path)
+            
+            if spec is None or spec.loader is None:
+                logger.error(f"Failed to load migration module: {migration_path}")
+                return None
+            
             module = importlib.util.module_from_spec(spec)
             sys.modules[module_name] = module
             spec.loader.exec_module(module)
             
             return module
         
-        except Exception as e:
+        except (OSError, ImportError, SyntaxError) as e:
             logger.error(f"Failed to load migration module: {str(e)}")
             return None
     
@@ -246,12 +252,14 @@ class MigrationExecutor:
             logger.error(f"Failed to apply migration: {str(e)}")
             return False, f"Failed to apply migration: {str(e)}"
     
-    def revert_migration(self, migration: Dict[str, Any]) -> Tuple[bool, str]:
+    def revert_migration(self, migration: Dict[str, Any],
+                         module: Optional[Any] = None) -> Tuple[bool, str]:
         """
         Revert a migration.
         
         Args:
             migration: Migration
+            module: Already loaded migration module
             
         Returns:
             Tuple[bool, str]: Success status and message
@@ -262,7 +270,8 @@ class MigrationExecutor:
                 return True, f"Migration not applied: {migration['version']}"
             
             # Load the migration module
-            module = self.load_migration_module(migration['path'])
+            if module is None:
+                module = self.load_migration_module(migration['path'])
             
             if not module:
                 return False, f"Failed to load migration module: {migration['path']}"
@@ -309,9 +318,8 @@ class MigrationExecutor:
             if steps is not None and steps > 0:
                 pending_migrations = pending_migrations[:steps]
             
-            # Apply the migrations
+            # Apply the migrations, recording each one as soon as it is applied
             applied_migrations = []
-            batch = self.version_manager.get_last_batch_number() + 1
             
             for migration in pending_migrations:
                 # Apply the migration
@@ -358,11 +366,9 @@ class MigrationExecutor:
                         batches_to_rollback.append(batch)
             
             # Get the migrations to rollback
-            migrations_to_rollback = []
-            
-            for batch in batches_to_rollback:
-                batch_migrations = self.version_manager.get_migrations_in_batch(batch)
-                migrations_to_rollback.extend(batch_migrations)
+            migrations_to_rollback = self.version_manager.get_migrations_in_batches(
+                batches_to_rollback
+            )
             
             if not migrations_to_rollback:
                 return True, "No migrations to rollback", []
@@ -373,22 +379,33 @@ class MigrationExecutor:
             # Create a map of version to migration
             migration_map = {m['version']: m for m in available_migrations}
             
-            # Rollback the migrations
-            reverted_migrations = []
+            # Plan the rollback up front so nothing is reverted if a migration is missing
+            planned_migrations = []
             
             for migration in migrations_to_rollback:
                 version = migration['version']
                 
                 # Check if the migration exists
                 if version not in migration_map:
-                    return False, f"Migration not found: {version}", reverted_migrations
+                    return False, f"Migration not found: {version}", []
                 
-                # Get the migration
+                # Load the migration module
                 migration_to_revert = migration_map[version]
-                migration_to_revert['applied'] = True
+                module = self.load_migration_module(migration_to_revert['path'])
                 
+                if not module:
+                    error_msg = f"Failed to load migration module: {migration_to_revert['path']}"
+                    return False, error_msg, []
+                
+                migration_to_revert['applied'] = True
+                planned_migrations.append((migration_to_revert, module))
+            
+            # Rollback the migrations
+            reverted_migrations = []
+            
+            for migration_to_revert, module in planned_migrations:
                 # Revert the migration
-                success, message = self.revert_migration(migration_to_revert)
+                success, message = self.revert_migration(migration_to_revert, module)
                 
                 if success:
                     # Add the migration to the list of reverted migrations
@@ -448,6 +465,9 @@ class MigrationExecutor:
                     # Return the error
                     return False, message, reverted_migrations
             
+            # The down migrations may have dropped the migrations table
+            forget_migrations_table(self.connection)
+            
             return True, f"Reset {len(reverted_migrations)} migrations", reverted_migrations
         
         except Exception as e:
@@ -462,6 +482,15 @@ class MigrationExecutor:
             Tuple[bool, str, List[Dict[str, Any]]]: Success status, message, and applied migrations
         """
         try:
+            # Nothing to reset, so only apply the migrations
+            if not self.version_manager.has_any_applied():
+                migrate_success, migrate_message, applied_migrations = self.migrate()
+                
+                if not migrate_success:
+                    return False, migrate_message, []
+                
+                return True, f"Refreshed {len(applied_migrations)} migrations", applied_migrations
+            
             # Reset all migrations
             reset_success, reset_message, reverted_migrations = self.reset()
             
@@ -4,7 +4,7 @@ Database migration script generation functionality.
 import os
 import re
 import logging
-from typing import Dict, Any, List, Tuple, Optional, Union
+from typing import Tuple, Optional
 
 from pythonweb_installer.database.migrations.version import (
     generate_migration_version,
@@ -13,121 +13,7 @@ from pythonweb_installer.database.migrations.version import (
 
 logger = logging.getLogger(__name__)
 
-
-class MigrationGenerator:
-    """
-    Database migration generator.
-    """
-    
-    def __init__(self, migrations_dir: str):
-        """
-        Initialize the migration generator.
-        
-        Args:
-            migrations_dir: Migrations directory
-        """
-        self.migrations_dir = migrations_dir
-    
-    def generate_migration(self, name: str, description: Optional[str] = None,
-                          template: str = "default") -> Tuple[bool, str, Optional[str]]:
-        """
-        Generate a migration script.
-        
-        Args:
-            name: Migration name
-            description: Migration description
-            template: Migration template
-            
-        Returns:
-            Tuple[bool, str, Optional[str]]: Success status, message, and migration path
-        """
-        try:
-            # Create the migrations directory if it doesn't exist
-            os.makedirs(self.migrations_dir, exist_ok=True)
-            
-            # Generate the migration version
-            version = generate_migration_version()
-            
-            # Format the migration name
-            formatted_name = format_migration_name(name)
-            
-            # Generate the migration filename
-            filename = f"{version}_{formatted_name}.py"
-            
-            # Generate the migration path
-            migration_path = os.path.join(self.migrations_dir, filename)
-            
-            # Check if the migration already exists
-            if os.path.exists(migration_path):
-                return False, f"Migration already exists: {filename}", None
-            
-            # Generate the migration content
-            content = self._generate_migration_content(version, name, description, template)
-            
-            # Write the migration file
-            with open(migration_path, 'w') as f:
-                f.write(content)
-            
-            logger.info(f"Generated migration: {filename}")
-            return True, f"Generated migration: {filename}", migration_path
-        
-        except Exception as e:
-            logger.error(f"Failed to generate migration: {str(e)}")
-            return False, f"Failed to generate migration: {str(e)}", None
-    
-    def _generate_migration_content(self, version: str, name: str, description: Optional[str] = None,
-                                   template: str = "default") -> str:
-        """
-        Generate migration content.
-        
-        Args:
-            version: Migration version
-            name: Migration name
-            description: Migration description
-            template: Migration template
-            
-        Returns:
-            str: Migration content
-        """
-        # Get the template content
-        template_content = self._get_template_content(template)
-        
-        # Replace placeholders
-        content = template_content.replace("{{version}}", version)
-        content = content.replace("{{name}}", name)
-        content = content.replace("{{description}}", description or "")
-        
-        return content
-    
-    def _get_template_content(self, template: str) -> str:
-        """
-        Get template content.
-        
-        Args:
-            template: Template name
-            
-        Returns:
-            str: Template content
-        """
-        if template == "default":
-            return self._get_default_template()
-        elif template == "create_table":
-            return self._get_create_table_template()
-        elif template == "alter_table":
-            return self._get_alter_table_template()
-        elif template == "data_migration":
-            return self._get_data_migration_template()
-        else:
-            return self._get_default_template()
-    
-    def _get_default_template(self) -> str:
-        """
-        Get the default template.
-        
-        Returns:
-            str: Template content
-        """
-        return '''"""
+_DEFAULT_TEMPLATE = '''"""
 Migration: {{name}}
 Version: {{version}}
 Description: {{description}}
@@ -182,15 +68,8 @@ def down(connection: DatabaseConnection) -> Tuple[bool, str]:
         connection.rollback()
         return False, f"Failed to revert migration: {str(e)}"
 '''
-    
-    def _get_create_table_template(self) -> str:
-        """
-        Get the create table template.
-        
-        Returns:
-            str: Template content
-        """
-        return '''"""
+
+_CREATE_TABLE_TEMPLATE = '''"""
 Migration: {{name}}
 Version: {{version}}
 Description: {{description}}
@@ -277,15 +156,8 @@ def down(connection: DatabaseConnection) -> Tuple[bool, str]:
         connection.rollback()
         return False, f"Failed to drop table: {str(e)}"
 '''
-    
-    def _get_alter_table_template(self) -> str:
-        """
-        Get the alter table template.
-        
-        Returns:
-            str: Template content
-        """
-        return '''"""
+
+_ALTER_TABLE_TEMPLATE = '''"""
 Migration: {{name}}
 Version: {{version}}
 Description: {{description}}
@@ -380,15 +252,8 @@ def down(connection: DatabaseConnection) -> Tuple[bool, str]:
         connection.rollback()
         return False, f"Failed to revert table alteration: {str(e)}"
 '''
-    
-    def _get_data_migration_template(self) -> str:
-        """
-        Get the data migration template.
-        
-        Returns:
-            str: Template content
-        """
-        return '''"""
+
+_DATA_MIGRATION_TEMPLATE = '''"""
 Migration: {{name}}
 Version: {{version}}
 Description: {{description}}
@@ -420,35 +285,23 @@ def up(connection: DatabaseConnection) -> Tuple[bool, str]:
             connection.rollback()
             return False, "Failed to get data to migrate"
         
-        # Migrate the data
-        for row in results:
-            # Transform the data
-            transformed_data = {
-                'id': row['id'],
-                'name': row['name'],
-                'description': row['description'] or '',
-                'status': 'active'
-            }
-            
-            # Insert the transformed data
-            insert_sql = """
-            INSERT INTO target_table (id, name, description, status)
-            VALUES (?, ?, ?, ?)
-            """
-            
-            success, _ = connection.execute(
-                insert_sql,
-                [
-                    transformed_data['id'],
-                    transformed_data['name'],
-                    transformed_data['description'],
-                    transformed_data['status']
-                ]
-            )
-            
-            if not success:
-                connection.rollback()
-                return False, "Failed to insert transformed data"
+        # Transform the data
+        rows_to_insert = [
+            (row['id'], row['name'], row['description'] or '', 'active')
+            for row in results
+        ]
+        
+        # Insert the transformed data in a single batch
+        insert_sql = """
+        INSERT INTO target_table (id, name, description, status)
+        VALUES (?, ?, ?, ?)
+        """
+        
+        success, _ = connection.executemany(insert_sql, rows_to_insert)
+        
+        if not success:
+            connection.rollback()
+            return False, "Failed to insert transformed data"
         
         # Commit the transaction
         connection.commit()
@@ -492,6 +345,113 @@ def down(connection: DatabaseConnection) -> Tuple[bool, str]:
         return False, f"Failed to revert data migration: {str(e)}"
 '''
 
+# Binary mode keeps Windows from translating line endings in the written file
+_CREATE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+
+# Matches the {{placeholder}} markers used in the templates
+_PLACEHOLDER_RE = re.compile(r'\{\{(version|name|description)\}\}')
+
+# Migration templates by name; unknown names fall back to the default template
+_TEMPLATES = {
+    "default": _DEFAULT_TEMPLATE,
+    "create_table": _CREATE_TABLE_TEMPLATE,
+    "alter_table": _ALTER_TABLE_TEMPLATE,
+    "data_migration": _DATA_MIGRATION_TEMPLATE
+}
+
+
+class MigrationGenerator:
+    """
+    Database migration generator.
+    """
+    
+    def __init__(self, migrations_dir: str):
+        """
+        Initialize the migration generator.
+        
+        Args:
+            migrations_dir: Migrations directory
+        """
+        self.migrations_dir = migrations_dir
+        self._dir_ensured = False
+    
+    def generate_migration(self, name: str, description: Optional[str] = None,
+                          template: str = "default") -> Tuple[bool, str, Optional[str]]:
+        """
+        Generate a migration script.
+        
+        Args:
+            name: Migration name
+            description: Migration description
+            template: Migration template
+            
+        Returns:
+            Tuple[bool, str, Optional[str]]: Success status, message, and migration path
+        """
+        try:
+            # Create the migrations directory on first use
+            if not self._dir_ensured:
+                os.makedirs(self.migrations_dir, exist_ok=True)
+                self._dir_ensured = True
+            
+            # Generate the migration version
+            version = generate_migration_version()
+            
+            # Generate the migration filename and path
+            filename = f"{version}_{format_migration_name(name)}.py"
+            migration_path = os.path.join(self.migrations_dir, filename)
+            
+            # Generate and encode the migration content before touching the file
+            content = self._generate_migration_content(version, name, description, template)
+            data = memoryview(content.encode('utf-8'))
+            
+            # Create the migration file, failing if it already exists
+            try:
+                fd = os.open(migration_path, _CREATE_FLAGS, 0o644)
+            except FileExistsError:
+                return False, f"Migration already exists: {filename}", None
+            
+            # Write the migration file, resuming after any short write
+            try:
+                while data:
+                    data = data[os.write(fd, data):]
+            finally:
+                os.close(fd)
+            
+            logger.info(f"Generated migration: {filename}")
+            return True, f"Generated migration: {filename}", migration_path
+        
+        except Exception as e:
+            logger.error(f"Failed to generate migration: {str(e)}")
+            return False, f"Failed to generate migration: {str(e)}", None
+    
+    def _generate_migration_content(self, version: str, name: str,
+                                    description: Optional[str] = None,
+                                    template: str = "default") -> str:
+        """
+        Generate migration content.
+        
+        Args:
+            version: Migration version
+            name: Migration name
+            description: Migration description
+            template: Migration template
+            
+        Returns:
+            str: Migration content
+        """
+        # Get the template content
+        template_content = _TEMPLATES.get(template, _DEFAULT_TEMPLATE)
+        
+        # Replace placeholders in a single pass
+        values = {
+            'version': version,
+            'name': name,
+            'description': description or ""
+        }
+        
+        return _PLACEHOLDER_RE.sub(lambda match: values[match.group(1)], template_content)
+
 
 def create_migration_generator(migrations_dir: str) -> MigrationGenerator:
     """
@@ -1,16 +1,36 @@
 """
 Database migration version tracking functionality.
 """
-import os
 import re
+import string
+import time
 import logging
 import datetime
-from typing import Dict, Any, List, Tuple, Optional, Union
+import sqlite3
+import weakref
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple, Optional
 
 from pythonweb_installer.database.connection import DatabaseConnection
 
 logger = logging.getLogger(__name__)
 
+# Patterns used to validate versions and format migration names
+_VERSION_RE = re.compile(r'^\d{14}$')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Connections whose migrations table is known to exist, mapped to the DB-API
+# connection it was checked on; reconnecting invalidates the entry
+_ENSURED_CONNECTIONS: "weakref.WeakKeyDictionary[DatabaseConnection, Any]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Translation table deleting every ASCII character not allowed in a migration name
+_NAME_CHARS = frozenset(string.ascii_letters + string.digits + '_')
+_NAME_DELETE_TABLE = str.maketrans('', '', ''.join(
+    chr(i) for i in range(128) if chr(i) not in _NAME_CHARS
+))
+
 
 class VersionManager:
     """
@@ -26,6 +46,23 @@ class VersionManager:
         """
         self.connection = connection
         self.migrations_table = "migrations"
+        self._last_batch_cache: Optional[int] = None
+        
+        # The table name is fixed, so the statements are built once
+        table = self.migrations_table
+        self._sql_select_all = f"SELECT * FROM {table} ORDER BY id ASC"
+        self._sql_max_batch = f"SELECT MAX(batch) AS last_batch FROM {table}"
+        self._sql_select_last = f"SELECT * FROM {table} ORDER BY id DESC LIMIT 1"
+        self._sql_any_applied = f"SELECT 1 AS applied FROM {table} LIMIT 1"
+        self._sql_is_applied = f"SELECT 1 AS applied FROM {table} WHERE version = ? LIMIT 1"
+        self._sql_insert = (
+            f"INSERT INTO {table} (version, name, description, batch, success) "
+            f"VALUES (?, ?, ?, ?, ?)"
+        )
+        self._sql_delete = f"DELETE FROM {table} WHERE version = ?"
+        self._sql_select_batch = f"SELECT * FROM {table} WHERE batch = ? ORDER BY id DESC"
+        self._sql_delete_all = f"DELETE FROM {table}"
+        
         self._ensure_migrations_table()
     
     def _ensure_migrations_table(self) -> bool:
@@ -36,8 +73,15 @@ class VersionManager:
             bool: True if the table exists or was created, False otherwise
         """
         try:
+            # Skip the lookup if this connection was already checked
+            dbapi_connection = self.connection.connection
+            if (dbapi_connection is not None
+                    and _ENSURED_CONNECTIONS.get(self.connection) is dbapi_connection):
+                return True
+            
             # Check if the migrations table exists
             if self.connection.table_exists(self.migrations_table):
+                _ENSURED_CONNECTIONS[self.connection] = dbapi_connection
                 return True
             
             # Create the migrations table
@@ -66,6 +110,7 @@ class VersionManager:
                 
                 if success:
                     self.connection.commit()
+                    _ENSURED_CONNECTIONS[self.connection] = dbapi_connection
                     logger.info(f"Created migrations table: {self.migrations_table}")
                     return True
                 else:
@@ -87,20 +132,13 @@ class VersionManager:
         Returns:
             List[Dict[str, Any]]: List of applied migrations
         """
-        try:
-            # Get the applied migrations
-            sql = f"SELECT * FROM {self.migrations_table} ORDER BY id ASC"
-            
-            success, results = self.connection.execute(sql)
-            
-            if success and results:
-                return results
-            
-            return []
+        # Get the applied migrations
+        success, results = self.connection.execute(self._sql_select_all)
         
-        except Exception as e:
-            logger.error(f"Failed to get applied migrations: {str(e)}")
-            return []
+        if success and results:
+            return results
+        
+        return []
     
     def get_last_batch_number(self) -> int:
         """
@@ -109,20 +147,22 @@ class VersionManager:
         Returns:
             int: Last batch number
         """
-        try:
-            # Get the last batch number
-            sql = f"SELECT MAX(batch) AS last_batch FROM {self.migrations_table}"
-            
-            success, results = self.connection.execute(sql)
-            
-            if success and results and results[0]['last_batch'] is not None:
-                return results[0]['last_batch']
-            
-            return 0
+        # Use the cached batch number if it is known
+        if self._last_batch_cache is not None:
+            return self._last_batch_cache
         
-        except Exception as e:
-            logger.error(f"Failed to get last batch number: {str(e)}")
+        # Get the last batch number
+        success, results = self.connection.execute(self._sql_max_batch)
+        
+        if not success:
             return 0
+        
+        if results and results[0]['last_batch'] is not None:
+            self._last_batch_cache = results[0]['last_batch']
+        else:
+            self._last_batch_cache = 0
+        
+        return self._last_batch_cache
     
     def get_last_migration(self) -> Optional[Dict[str, Any]]:
         """
@@ -131,20 +171,25 @@ class VersionManager:
         Returns:
             Optional[Dict[str, Any]]: Last applied migration or None
         """
-        try:
-            # Get the last applied migration
-            sql = f"SELECT * FROM {self.migrations_table} ORDER BY id DESC LIMIT 1"
-            
-            success, results = self.connection.execute(sql)
-            
-            if success and results:
-                return results[0]
-            
-            return None
+        # Get the last applied migration
+        success, results = self.connection.execute(self._sql_select_last)
         
-        except Exception as e:
-            logger.error(f"Failed to get last migration: {str(e)}")
-            return None
+        if success and results:
+            return results[0]
+        
+        return None
+    
+    def has_any_applied(self) -> bool:
+        """
+        Check if any migration is applied.
+        
+        Returns:
+            bool: True if at least one migration is applied, False otherwise
+        """
+        # Stop at the first row instead of reading the whole table
+        success, results = self.connection.execute(self._sql_any_applied)
+        
+        return bool(success and results)
     
     def is_migration_applied(self, version: str) -> bool:
         """
@@ -156,20 +201,10 @@ class VersionManager:
         Returns:
             bool: True if the migration is applied, False otherwise
         """
-        try:
-            # Check if the migration is applied
-            sql = f"SELECT COUNT(*) AS count FROM {self.migrations_table} WHERE version = ?"
-            
-            success, results = self.connection.execute(sql, [version])
-            
-            if success and results:
-                return results[0]['count'] > 0
-            
-            return False
+        # Check if the migration is applied
+        success, results = self.connection.execute(self._sql_is_applied, [version])
         
-        except Exception as e:
-            logger.error(f"Failed to check if migration is applied: {str(e)}")
-            return False
+        return bool(success and results)
     
     def record_migration(self, version: str, name: str, description: Optional[str] = None,
                         batch: Optional[int] = None, success: bool = True) -> bool:
@@ -192,16 +227,17 @@ class VersionManager:
                 batch = self.get_last_batch_number() + 1
             
             # Record the migration
-            sql = f"""
-            INSERT INTO {self.migrations_table}
-            (version, name, description, batch, success)
-            VALUES (?, ?, ?, ?, ?)
-            """
-            
-            success, _ = self.connection.execute(sql, [version, name, description, batch, 1 if success else 0])
+            success, _ = self.connection.execute(
+                self._sql_insert,
+                [version, name, description, batch, 1 if success else 0]
+            )
             
             if success:
                 self.connection.commit()
+                
+                if self._last_batch_cache is not None:
+                    self._last_batch_cache = max(self._last_batch_cache, batch)
+                
                 logger.info(f"Recorded migration: {version}")
                 return True
             else:
@@ -209,7 +245,7 @@ class VersionManager:
                 logger.error(f"Failed to record migration: {version}")
                 return False
         
-        except Exception as e:
+        except (sqlite3.Error, OSError) as e:
             self.connection.rollback()
             logger.error(f"Failed to record migration: {str(e)}")
             return False
@@ -226,12 +262,11 @@ class VersionManager:
         """
         try:
             # Remove the migration
-            sql = f"DELETE FROM {self.migrations_table} WHERE version = ?"
-            
-            success, _ = self.connection.execute(sql, [version])
+            success, _ = self.connection.execute(self._sql_delete, [version])
             
             if success:
                 self.connection.commit()
+                self._last_batch_cache = None
                 logger.info(f"Removed migration: {version}")
                 return True
             else:
@@ -239,7 +274,7 @@ class VersionManager:
                 logger.error(f"Failed to remove migration: {version}")
                 return False
         
-        except Exception as e:
+        except (sqlite3.Error, OSError) as e:
             self.connection.rollback()
             logger.error(f"Failed to remove migration: {str(e)}")
             return False
@@ -254,20 +289,40 @@ class VersionManager:
         Returns:
             List[Dict[str, Any]]: List of migrations in the batch
         """
-        try:
-            # Get the migrations in the batch
-            sql = f"SELECT * FROM {self.migrations_table} WHERE batch = ? ORDER BY id DESC"
-            
-            success, results = self.connection.execute(sql, [batch])
-            
-            if success and results:
-                return results
+        # Get the migrations in the batch
+        success, results = self.connection.execute(self._sql_select_batch, [batch])
+        
+        if success and results:
+            return results
+        
+        return []
+    
+    def get_migrations_in_batches(self, batches: List[int]) -> List[Dict[str, Any]]:
+        """
+        Get migrations in several batches with a single query.
+        
+        Args:
+            batches: Batch numbers
             
+        Returns:
+            List[Dict[str, Any]]: List of migrations, newest batch first
+        """
+        if not batches:
             return []
         
-        except Exception as e:
-            logger.error(f"Failed to get migrations in batch: {str(e)}")
-            return []
+        # Get the migrations in all requested batches at once
+        placeholders = ', '.join('?' for _ in batches)
+        sql = (
+            f"SELECT * FROM {self.migrations_table} WHERE batch IN ({placeholders}) "
+            f"ORDER BY batch DESC, id DESC"
+        )
+        
+        success, results = self.connection.execute(sql, list(batches))
+        
+        if success and results:
+            return results
+        
+        return []
     
     def reset_migrations(self) -> bool:
         """
@@ -278,12 +333,11 @@ class VersionManager:
         """
         try:
             # Reset the migrations
-            sql = f"DELETE FROM {self.migrations_table}"
-            
-            success, _ = self.connection.execute(sql)
+            success, _ = self.connection.execute(self._sql_delete_all)
             
             if success:
                 self.connection.commit()
+                self._last_batch_cache = 0
                 logger.info("Reset all migrations")
                 return True
             else:
@@ -291,12 +345,25 @@ class VersionManager:
                 logger.error("Failed to reset migrations")
                 return False
         
-        except Exception as e:
+        except (sqlite3.Error, OSError) as e:
             self.connection.rollback()
             logger.error(f"Failed to reset migrations: {str(e)}")
             return False
 
 
+def forget_migrations_table(connection: DatabaseConnection) -> None:
+    """
+    Forget that the migrations table exists on a connection.
+    
+    Call this after dropping tables, so the next version manager checks for
+    the migrations table again.
+    
+    Args:
+        connection: Database connection
+    """
+    _ENSURED_CONNECTIONS.pop(connection, None)
+
+
 def create_version_manager(connection: DatabaseConnection) -> VersionManager:
     """
     Create a version manager.
@@ -317,11 +384,11 @@ def generate_migration_version() -> str:
     Returns:
         str: Migration version
     """
-    # Generate a timestamp-based version
-    now = datetime.datetime.now()
-    return now.strftime("%Y%m%d%H%M%S")
+    # Generate a UTC timestamp-based version so machines in different time zones agree
+    return time.strftime("%Y%m%d%H%M%S", time.gmtime())
 
 
+@lru_cache(maxsize=2048)
 def parse_migration_version(version: str) -> Optional[datetime.datetime]:
     """
     Parse a migration version.
@@ -334,7 +401,7 @@ def parse_migration_version(version: str) -> Optional[datetime.datetime]:
     """
     try:
         # Parse the version
-        if re.match(r'^\d{14}$', version):
+        if _VERSION_RE.match(version):
             return datetime.datetime.strptime(version, "%Y%m%d%H%M%S")
         
         return None
@@ -355,10 +422,13 @@ def format_migration_name(name: str) -> str:
         str: Formatted name
     """
     # Convert spaces to underscores
-    name = re.sub(r'\s+', '_', name.strip())
+    name = _WHITESPACE_RE.sub('_', name.strip())
     
     # Remove special characters
-    name = re.sub(r'[^a-zA-Z0-9_]', '', name)
+    name = name.translate(_NAME_DELETE_TABLE)
+    
+    if not name.isascii():
+        name = ''.join(c for c in name if c.isascii())
     
     # Convert to lowercase
     name = name.lower()
@@ -1,23 +1,293 @@
 """
 Database schema creation functionality.
 """
-import os
 import re
 import json
 import yaml
 import logging
-from typing import Dict, Any, List, Tuple, Optional, Union, Set
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, List, Tuple, Optional, Union, Set, Iterable, Callable, BinaryIO
 
-from pythonweb_installer.database.connection import DatabaseConnection
+from pythonweb_installer.database.connection import DatabaseConnection, ConnectionPool
+from pythonweb_installer.database.migrations.version import forget_migrations_table
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 
 logger = logging.getLogger(__name__)
 
 
+# Identifiers allowed in generated DDL without quoting
+_IDENT_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+# CREATE TABLE statements keyed by if_not_exists
+_CREATE_TABLE_TEMPLATES = {
+    True: "CREATE TABLE IF NOT EXISTS {name} (\n{body}\n);",
+    False: "CREATE TABLE {name} (\n{body}\n);"
+}
+
+# CREATE INDEX statements keyed by (unique, if_not_exists)
+_CREATE_INDEX_TEMPLATES = {
+    (True, True): "CREATE UNIQUE INDEX IF NOT EXISTS {name} ON {table} ({columns});",
+    (True, False): "CREATE UNIQUE INDEX {name} ON {table} ({columns});",
+    (False, True): "CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns});",
+    (False, False): "CREATE INDEX {name} ON {table} ({columns});"
+}
+
+# SQL literals for boolean defaults, indexed by the boolean value
+_BOOL_LITERAL = ('0', '1')
+
+# Databases that can build indexes concurrently from several connections;
+# SQLite serializes writers on the database file, so it builds them in the batch
+_PARALLEL_INDEX_DB_TYPES = ('postgresql', 'mysql')
+
+
+def _check_identifier(name: Any, kind: str) -> None:
+    """
+    Check that a name is a plain SQL identifier.
+    
+    Args:
+        name: Identifier to check
+        kind: Kind of identifier, used in the error message
+        
+    Raises:
+        ValueError: If the name is not a valid identifier
+    """
+    if not isinstance(name, str) or not _IDENT_RE.match(name):
+        raise ValueError(f"Invalid {kind} name: {name!r}")
+
+
+def _quote_string(value: str) -> str:
+    """
+    Quote a string as an SQL literal.
+    
+    Args:
+        value: String value
+        
+    Returns:
+        str: Quoted literal with embedded quotes doubled
+    """
+    return "'" + value.replace("'", "''") + "'"
+
+
+# Default value formatters by exact type; other values are rendered with str().
+# bool has its own entry, so it is never formatted as an int
+_DEFAULT_FORMATTERS: Dict[type, Callable[[Any], str]] = {
+    str: _quote_string,
+    bool: _BOOL_LITERAL.__getitem__,
+    int: str,
+    float: str,
+    type(None): lambda value: 'NULL'
+}
+
+
+def _format_default(value: Any) -> str:
+    """
+    Format a column default value as an SQL literal.
+    
+    Args:
+        value: Default value
+        
+    Returns:
+        str: SQL literal
+    """
+    formatter = _DEFAULT_FORMATTERS.get(type(value))
+    
+    if formatter is None:
+        # Fall back to isinstance checks for subclasses such as str enums
+        for value_type, type_formatter in _DEFAULT_FORMATTERS.items():
+            if isinstance(value, value_type):
+                formatter = type_formatter
+                break
+        else:
+            return str(value)
+    
+    return formatter(value)
+
+
+def _foreign_key_key(foreign_key: Dict[str, Any]) -> Tuple[str, str, str, str]:
+    """
+    Build a hashable key describing a foreign key definition.
+    
+    Args:
+        foreign_key: Foreign key definition
+        
+    Returns:
+        Tuple[str, str, str, str]: Referenced table, referenced column, ON DELETE and
+        ON UPDATE actions
+    """
+    return (
+        foreign_key['table'],
+        foreign_key.get('column', 'id'),
+        foreign_key.get('on_delete', 'CASCADE'),
+        foreign_key.get('on_update', 'CASCADE')
+    )
+
+
+def _columns_key(columns: List[Dict[str, Any]]) -> Tuple[Tuple[Any, ...], ...]:
+    """
+    Build a hashable key describing a list of column definitions.
+    
+    The key holds one tuple per column attribute (names, types, flags, ...)
+    rather than one tuple per column, so each attribute is read in a single
+    comprehension over the column dicts.
+    
+    Args:
+        columns: List of column definitions
+        
+    Returns:
+        Tuple[Tuple[Any, ...], ...]: Column attribute tuples
+    """
+    defaults = tuple(column.get('default') for column in columns)
+    
+    return (
+        tuple(column['name'] for column in columns),
+        tuple(column['type'] for column in columns),
+        tuple(bool(column.get('not_null', False)) for column in columns),
+        # The default types are part of the key so that e.g. 1 and 1.0 are told apart
+        tuple(map(type, defaults)),
+        defaults,
+        tuple(bool(column.get('unique', False)) for column in columns),
+        tuple(bool(column.get('primary_key', False)) for column in columns),
+        tuple(
+            _foreign_key_key(column['foreign_key']) if 'foreign_key' in column else None
+            for column in columns
+        )
+    )
+
+
+def _duplicates(names: Iterable[Any]) -> List[Any]:
+    """
+    Find the names that occur more than once.
+    
+    Args:
+        names: Names to check
+        
+    Returns:
+        List[Any]: Duplicated names, in order of first occurrence
+    """
+    return [name for name, count in Counter(names).items() if count > 1]
+
+
+def _build_foreign_key(column_name: str, foreign_key_key: Tuple[str, str, str, str]) -> str:
+    """
+    Generate a foreign key constraint definition.
+    
+    Args:
+        column_name: Name of the referencing column
+        foreign_key_key: Referenced table, referenced column, ON DELETE and ON UPDATE actions
+        
+    Returns:
+        str: Foreign key constraint definition
+    """
+    foreign_table, foreign_column, on_delete, on_update = foreign_key_key
+    
+    _check_identifier(foreign_table, "table")
+    _check_identifier(foreign_column, "column")
+    
+    foreign_key_parts = [
+        f"    FOREIGN KEY ({column_name}) REFERENCES {foreign_table}({foreign_column})"
+    ]
+    
+    if on_delete:
+        foreign_key_parts.append(f" ON DELETE {on_delete}")
+    
+    if on_update:
+        foreign_key_parts.append(f" ON UPDATE {on_update}")
+    
+    return "".join(foreign_key_parts)
+
+
+@lru_cache(maxsize=256)
+def _compile_table_body(columns_key: Tuple[Tuple[Any, ...], ...]) -> str:
+    """
+    Generate the column, primary key and foreign key definitions of a table.
+    
+    Args:
+        columns_key: Column attribute tuples built by _columns_key
+        
+    Returns:
+        str: Definitions joined for the body of a CREATE TABLE statement
+    """
+    names, types, not_nulls, _, defaults, uniques, primary_key_flags, foreign_keys = columns_key
+    
+    # Size the definitions list up front: one entry per column, one for the
+    # primary key constraint and one per foreign key
+    column_count = len(names)
+    foreign_key_count = column_count - foreign_keys.count(None)
+    column_definitions = [""] * (column_count + (True in primary_key_flags) + foreign_key_count)
+    primary_keys: List[str] = []
+    position = 0
+    foreign_key_position = len(column_definitions) - foreign_key_count
+    
+    # Add the columns
+    for (column_name, column_type, not_null, default_value,
+         unique, primary_key, foreign_key_key) in zip(names, types, not_nulls, defaults,
+                                                      uniques, primary_key_flags, foreign_keys):
+        _check_identifier(column_name, "column")
+        
+        # Start the column definition
+        column_parts = [f"    {column_name} {column_type}"]
+        
+        # Add NOT NULL constraint if specified
+        if not_null:
+            column_parts.append(" NOT NULL")
+        
+        # Add DEFAULT value if specified
+        if default_value is not None:
+            column_parts.append(f" DEFAULT {_format_default(default_value)}")
+        
+        # Add UNIQUE constraint if specified
+        if unique:
+            column_parts.append(" UNIQUE")
+        
+        # Check if this is a primary key
+        if primary_key:
+            primary_keys.append(column_name)
+        
+        # Add foreign key constraints after the primary key constraint
+        if foreign_key_key is not None:
+            column_definitions[foreign_key_position] = _build_foreign_key(
+                column_name, foreign_key_key
+            )
+            foreign_key_position += 1
+        
+        # Add the column definition to the list
+        column_definitions[position] = "".join(column_parts)
+        position += 1
+    
+    # Add primary key constraint if specified
+    if primary_keys:
+        column_definitions[position] = f"    PRIMARY KEY ({', '.join(primary_keys)})"
+    
+    # Join the column definitions
+    return ",\n".join(column_definitions)
+
+
 class SchemaManager:
     """
     Database schema manager.
     """
     
+    __slots__ = ('connection',)
+    
     def __init__(self, connection: DatabaseConnection):
         """
         Initialize the schema manager.
@@ -79,88 +349,24 @@ class SchemaManager:
             
         Returns:
             str: SQL statement
-        """
-        # Start the SQL statement
-        sql = f"CREATE TABLE "
-        
-        # Add IF NOT EXISTS clause if requested
-        if if_not_exists:
-            sql += f"IF NOT EXISTS "
-        
-        # Add the table name
-        sql += f"{table_name} (\n"
-        
-        # Add the columns
-        column_definitions = []
-        primary_keys = []
-        
-        for column in columns:
-            column_name = column['name']
-            column_type = column['type']
-            
-            # Start the column definition
-            column_def = f"    {column_name} {column_type}"
             
-            # Add NOT NULL constraint if specified
-            if column.get('not_null', False):
-                column_def += " NOT NULL"
-            
-            # Add DEFAULT value if specified
-            if 'default' in column and column['default'] is not None:
-                default_value = column['default']
-                
-                # Format the default value based on its type
-                if isinstance(default_value, str):
-                    default_value = f"'{default_value}'"
-                elif isinstance(default_value, bool):
-                    default_value = "1" if default_value else "0"
-                
-                column_def += f" DEFAULT {default_value}"
-            
-            # Add UNIQUE constraint if specified
-            if column.get('unique', False):
-                column_def += " UNIQUE"
-            
-            # Check if this is a primary key
-            if column.get('primary_key', False):
-                primary_keys.append(column_name)
-            
-            # Add the column definition to the list
-            column_definitions.append(column_def)
-        
-        # Add primary key constraint if specified
-        if primary_keys:
-            primary_key_def = f"    PRIMARY KEY ({', '.join(primary_keys)})"
-            column_definitions.append(primary_key_def)
-        
-        # Add foreign key constraints if specified
-        for column in columns:
-            if 'foreign_key' in column:
-                foreign_key = column['foreign_key']
-                column_name = column['name']
-                
-                foreign_table = foreign_key['table']
-                foreign_column = foreign_key.get('column', 'id')
-                on_delete = foreign_key.get('on_delete', 'CASCADE')
-                on_update = foreign_key.get('on_update', 'CASCADE')
-                
-                foreign_key_def = f"    FOREIGN KEY ({column_name}) REFERENCES {foreign_table}({foreign_column})"
-                
-                if on_delete:
-                    foreign_key_def += f" ON DELETE {on_delete}"
-                
-                if on_update:
-                    foreign_key_def += f" ON UPDATE {on_update}"
-                
-                column_definitions.append(foreign_key_def)
+        Raises:
+            ValueError: If a name is not a valid identifier
+        """
+        _check_identifier(table_name, "table")
         
-        # Join the column definitions
-        sql += ",\n".join(column_definitions)
+        # Build a hashable description of the columns to look up the cached body
+        columns_key = _columns_key(columns)
         
-        # Close the SQL statement
-        sql += "\n);"
+        try:
+            body = _compile_table_body(columns_key)
+        except TypeError:
+            # Unhashable default values cannot be cached
+            body = _compile_table_body.__wrapped__(columns_key)
         
-        return sql
+        return _CREATE_TABLE_TEMPLATES[bool(if_not_exists)].format_map(
+            {'name': table_name, 'body': body}
+        )
     
     def create_index(self, table_name: str, index_name: str, columns: List[str], 
                      unique: bool = False, if_not_exists: bool = True) -> Tuple[bool, str]:
@@ -214,28 +420,19 @@ class SchemaManager:
             
         Returns:
             str: SQL statement
+            
+        Raises:
+            ValueError: If a name is not a valid identifier
         """
-        # Start the SQL statement
-        sql = f"CREATE "
-        
-        # Add UNIQUE if specified
-        if unique:
-            sql += "UNIQUE "
-        
-        # Add INDEX
-        sql += "INDEX "
+        _check_identifier(table_name, "table")
+        _check_identifier(index_name, "index")
         
-        # Add IF NOT EXISTS clause if requested
-        if if_not_exists:
-            sql += f"IF NOT EXISTS "
-        
-        # Add the index name and table
-        sql += f"{index_name} ON {table_name} "
-        
-        # Add the columns
-        sql += f"({', '.join(columns)});"
+        for column in columns:
+            _check_identifier(column, "column")
         
-        return sql
+        return _CREATE_INDEX_TEMPLATES[bool(unique), bool(if_not_exists)].format_map(
+            {'name': index_name, 'table': table_name, 'columns': ', '.join(columns)}
+        )
     
     def drop_table(self, table_name: str, if_exists: bool = True) -> Tuple[bool, str]:
         """
@@ -269,6 +466,7 @@ class SchemaManager:
             if success:
                 # Commit the transaction
                 self.connection.commit()
+                forget_migrations_table(self.connection)
                 logger.info(f"Dropped table {table_name}")
                 return True, f"Table {table_name} dropped successfully"
             else:
@@ -375,8 +573,10 @@ class SchemaManager:
             str: SQL statement
             
         Raises:
-            ValueError: If the alteration type is not supported
+            ValueError: If the alteration type is not supported or a name is not a valid identifier
         """
+        _check_identifier(table_name, "table")
+        
         # Get the alteration type
         alteration_type = alteration.get('type')
         
@@ -385,38 +585,34 @@ class SchemaManager:
             column_name = alteration.get('name')
             column_type = alteration.get('type')
             
+            _check_identifier(column_name, "column")
+            
             # Start the SQL statement
-            sql = f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}"
+            parts = [f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}"]
             
             # Add NOT NULL constraint if specified
             if alteration.get('not_null', False):
-                sql += " NOT NULL"
+                parts.append(" NOT NULL")
             
             # Add DEFAULT value if specified
             if 'default' in alteration and alteration['default'] is not None:
-                default_value = alteration['default']
-                
-                # Format the default value based on its type
-                if isinstance(default_value, str):
-                    default_value = f"'{default_value}'"
-                elif isinstance(default_value, bool):
-                    default_value = "1" if default_value else "0"
-                
-                sql += f" DEFAULT {default_value}"
+                parts.append(f" DEFAULT {_format_default(alteration['default'])}")
             
             # Add UNIQUE constraint if specified
             if alteration.get('unique', False):
-                sql += " UNIQUE"
+                parts.append(" UNIQUE")
             
             # Close the SQL statement
-            sql += ";"
+            parts.append(";")
             
-            return sql
+            return "".join(parts)
         
         elif alteration_type == 'drop_column':
             # Drop a column
             column_name = alteration.get('name')
             
+            _check_identifier(column_name, "column")
+            
             # Generate the SQL
             sql = f"ALTER TABLE {table_name} DROP COLUMN {column_name};"
             
@@ -427,6 +623,9 @@ class SchemaManager:
             old_name = alteration.get('old_name')
             new_name = alteration.get('new_name')
             
+            _check_identifier(old_name, "column")
+            _check_identifier(new_name, "column")
+            
             # Generate the SQL
             sql = f"ALTER TABLE {table_name} RENAME COLUMN {old_name} TO {new_name};"
             
@@ -436,6 +635,8 @@ class SchemaManager:
             # Rename a table
             new_name = alteration.get('new_name')
             
+            _check_identifier(new_name, "table")
+            
             # Generate the SQL
             sql = f"ALTER TABLE {table_name} RENAME TO {new_name};"
             
@@ -455,12 +656,23 @@ class SchemaManager:
             Tuple[bool, str]: Success status and message
         """
         try:
-            # Check if the schema file exists
-            if not os.path.exists(schema_file):
+            path = Path(schema_file)
+            ext = path.suffix.lower()
+            
+            # Open the schema file directly instead of checking that it exists first
+            try:
+                f = open(path, 'rb')
+            except FileNotFoundError:
                 return False, f"Schema file {schema_file} does not exist"
             
-            # Load the schema from the file
-            schema = self._load_schema_from_file(schema_file)
+            with f:
+                # Stream the tables of JSON schemas one at a time when ijson is available
+                if IJSON_AVAILABLE and ext == '.json':
+                    tables = ijson.items(f, 'tables.item', use_float=True)
+                    return self.create_schema({'tables': tables})
+                
+                # Load the schema from the file
+                schema = self._parse_schema(f, ext)
             
             # Create the schema
             return self.create_schema(schema)
@@ -469,7 +681,7 @@ class SchemaManager:
             logger.error(f"Failed to create schema from file {schema_file}: {str(e)}")
             return False, f"Failed to create schema from file {schema_file}: {str(e)}"
     
-    def _load_schema_from_file(self, schema_file: str) -> Dict[str, Any]:
+    def _load_schema_from_file(self, schema_file: Union[str, Path]) -> Dict[str, Any]:
         """
         Load a schema from a file.
         
@@ -482,49 +694,85 @@ class SchemaManager:
         Raises:
             ValueError: If the file format is not supported
         """
-        # Get the file extension
-        _, ext = os.path.splitext(schema_file)
+        path = Path(schema_file)
         
+        with open(path, 'rb') as f:
+            return self._parse_schema(f, path.suffix.lower())
+    
+    def _parse_schema(self, f: BinaryIO, ext: str) -> Dict[str, Any]:
+        """
+        Parse a schema from an open binary file.
+        
+        Args:
+            f: Schema file opened in binary mode
+            ext: Lowercase file extension selecting the format
+            
+        Returns:
+            Dict[str, Any]: Schema definition
+            
+        Raises:
+            ValueError: If the file format is not supported
+        """
         # Load the schema based on the file extension
-        if ext.lower() in ['.json']:
-            # Load JSON file
-            with open(schema_file, 'r') as f:
-                return json.load(f)
+        schema: Dict[str, Any]
+        if ext == '.json':
+            # Load JSON file, parsing the raw bytes with orjson when available
+            if ORJSON_AVAILABLE:
+                schema = orjson.loads(f.read())
+            else:
+                schema = json.load(f)
+            return schema
         
-        elif ext.lower() in ['.yaml', '.yml']:
-            # Load YAML file
-            with open(schema_file, 'r') as f:
-                return yaml.safe_load(f)
+        elif ext in ['.yaml', '.yml']:
+            # Load YAML file with the libyaml loader when available
+            schema = yaml.load(f, Loader=_YamlLoader)
+            return schema
         
         else:
             raise ValueError(f"Unsupported schema file format: {ext}")
     
-    def create_schema(self, schema: Dict[str, Any]) -> Tuple[bool, str]:
+    def create_schema(self, schema: Dict[str, Any], dry_run: bool = False,
+                      index_pool: Optional[ConnectionPool] = None) -> Tuple[bool, str]:
         """
         Create a database schema.
         
+        When an index pool with more than one connection is given on PostgreSQL or
+        MySQL, the tables are created in one batch first and the indexes are then
+        built concurrently on pooled connections, each in its own transaction. On
+        SQLite the pool is ignored and the indexes are created in the batch.
+        
         Args:
             schema: Schema definition
+            dry_run: Whether to return the generated SQL script instead of executing it
+            index_pool: Connection pool to build the indexes on in parallel
             
         Returns:
-            Tuple[bool, str]: Success status and message
+            Tuple[bool, str]: Success status and message (the SQL script on a dry run)
         """
         try:
             # Get the tables from the schema
             tables = schema.get('tables', [])
             
-            # Create each table
+            # List the existing tables with a single catalog query; a dry run
+            # reports the full script regardless of what already exists
+            existing_tables = set() if dry_run else set(self.connection.get_tables())
+            
+            # Generate the statements for every table and index up front
+            statements: List[str] = []
+            table_statements: List[str] = []
+            index_statements: List[str] = []
+            
             for table in tables:
                 table_name = table.get('name')
                 columns = table.get('columns', [])
                 
-                # Create the table
-                success, message = self.create_table(table_name, columns)
+                # Skip tables that already exist; their indexes are still ensured
+                if table_name not in existing_tables:
+                    table_sql = self._generate_create_table_sql(table_name, columns)
+                    statements.append(table_sql)
+                    table_statements.append(table_sql)
                 
-                if not success:
-                    return False, message
-                
-                # Create indexes for the table
+                # Generate the indexes for the table
                 indexes = table.get('indexes', [])
                 
                 for index in indexes:
@@ -532,11 +780,43 @@ class SchemaManager:
                     index_columns = index.get('columns', [])
                     unique = index.get('unique', False)
                     
-                    # Create the index
-                    success, message = self.create_index(table_name, index_name, index_columns, unique)
-                    
-                    if not success:
-                        return False, message
+                    index_sql = self._generate_create_index_sql(
+                        table_name, index_name, index_columns, unique
+                    )
+                    statements.append(index_sql)
+                    index_statements.append(index_sql)
+            
+            if dry_run:
+                return True, "\n".join(statements)
+            
+            # Leave the indexes out of the batch if they are built in parallel
+            parallel_indexes = (
+                index_pool is not None
+                and index_pool.pool_size > 1
+                and bool(index_statements)
+                and self.connection.db_type in _PARALLEL_INDEX_DB_TYPES
+            )
+            
+            if parallel_indexes:
+                statements = table_statements
+            
+            # Execute all statements in a single batch
+            if statements:
+                success, _ = self.connection.execute_batch(statements)
+                
+                if not success:
+                    # Rollback the transaction
+                    self.connection.rollback()
+                    return False, "Failed to create database schema"
+                
+                # Commit the transaction
+                self.connection.commit()
+            
+            if parallel_indexes and index_pool is not None:
+                success, message = self._create_indexes_in_parallel(index_statements, index_pool)
+                
+                if not success:
+                    return False, message
             
             logger.info("Created database schema")
             return True, "Database schema created successfully"
@@ -545,6 +825,42 @@ class SchemaManager:
             logger.error(f"Failed to create schema: {str(e)}")
             return False, f"Failed to create schema: {str(e)}"
     
+    def _create_indexes_in_parallel(self, statements: List[str],
+                                    pool: ConnectionPool) -> Tuple[bool, str]:
+        """
+        Create indexes concurrently, each on a connection checked out of a pool.
+        
+        Args:
+            statements: CREATE INDEX statements
+            pool: Connection pool
+            
+        Returns:
+            Tuple[bool, str]: Success status and message
+        """
+        def create_index(sql: str) -> bool:
+            with pool.acquire() as connection:
+                success, _ = connection.execute(sql)
+                
+                if success:
+                    connection.commit()
+                else:
+                    connection.rollback()
+                
+                return success
+        
+        max_workers = min(pool.pool_size, len(statements))
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(create_index, statements))
+        
+        failed = [sql for sql, success in zip(statements, results) if not success]
+        
+        if failed:
+            logger.error(f"Failed to create index: {failed[0]}")
+            return False, f"Failed to create database schema index: {failed[0]}"
+        
+        return True, "Database schema indexes created successfully"
+    
     def drop_schema(self, schema: Dict[str, Any]) -> Tuple[bool, str]:
         """
         Drop a database schema.
@@ -560,14 +876,22 @@ class SchemaManager:
             tables = schema.get('tables', [])
             
             # Drop each table in reverse order to handle dependencies
-            for table in reversed(tables):
-                table_name = table.get('name')
-                
-                # Drop the table
-                success, message = self.drop_table(table_name)
+            statements = [
+                f"DROP TABLE IF EXISTS {table.get('name')};" for table in reversed(tables)
+            ]
+            
+            # Execute all statements in a single batch
+            if statements:
+                success, _ = self.connection.execute_batch(statements)
                 
                 if not success:
-                    return False, message
+                    # Rollback the transaction
+                    self.connection.rollback()
+                    return False, "Failed to drop database schema"
+                
+                # Commit the transaction
+                self.connection.commit()
+                forget_migrations_table(self.connection)
             
             logger.info("Dropped database schema")
             return True, "Database schema dropped successfully"
@@ -586,7 +910,7 @@ class SchemaManager:
         Returns:
             Tuple[bool, List[str]]: Validation status and list of errors
         """
-        errors = []
+        errors: List[str] = []
         
         try:
             # Check if the schema has tables
@@ -595,16 +919,18 @@ class SchemaManager:
                 return False, errors
             
             # Get the tables from the schema
-            tables = schema.get('tables', [])
+            tables: List[Dict[str, Any]] = schema.get('tables', [])
             
             # Check if there are any tables
             if not tables:
                 errors.append("Schema does not have any tables")
                 return False, errors
             
-            # Validate each table
-            table_names = set()
+            # Check if the table names are unique
+            for table_name in _duplicates(table['name'] for table in tables if 'name' in table):
+                errors.append(f"Duplicate table name: {table_name}")
             
+            # Validate each table
             for table in tables:
                 # Check if the table has a name
                 if 'name' not in table:
@@ -613,28 +939,27 @@ class SchemaManager:
                 
                 table_name = table.get('name')
                 
-                # Check if the table name is unique
-                if table_name in table_names:
-                    errors.append(f"Duplicate table name: {table_name}")
-                    continue
-                
-                table_names.add(table_name)
-                
                 # Check if the table has columns
                 if 'columns' not in table:
                     errors.append(f"Table {table_name} does not have columns")
                     continue
                 
-                columns = table.get('columns', [])
+                columns: List[Dict[str, Any]] = table.get('columns', [])
                 
                 # Check if there are any columns
                 if not columns:
                     errors.append(f"Table {table_name} does not have any columns")
                     continue
                 
-                # Validate each column
-                column_names = set()
+                # Check if the column names are unique
+                column_name_list = [column['name'] for column in columns if 'name' in column]
+                
+                for column_name in _duplicates(column_name_list):
+                    errors.append(f"Duplicate column name in table {table_name}: {column_name}")
                 
+                column_names: Set[str] = set(column_name_list)
+                
+                # Validate each column
                 for column in columns:
                     # Check if the column has a name
                     if 'name' not in column:
@@ -643,21 +968,18 @@ class SchemaManager:
                     
                     column_name = column.get('name')
                     
-                    # Check if the column name is unique
-                    if column_name in column_names:
-                        errors.append(f"Duplicate column name in table {table_name}: {column_name}")
-                        continue
-                    
-                    column_names.add(column_name)
-                    
                     # Check if the column has a type
                     if 'type' not in column:
                         errors.append(f"Column {column_name} in table {table_name} does not have a type")
                         continue
                 
                 # Validate each index
-                indexes = table.get('indexes', [])
-                index_names = set()
+                indexes: List[Dict[str, Any]] = table.get('indexes', [])
+                
+                # Check if the index names are unique
+                index_names = (index['name'] for index in indexes if 'name' in index)
+                for index_name in _duplicates(index_names):
+                    errors.append(f"Duplicate index name in table {table_name}: {index_name}")
                 
                 for index in indexes:
                     # Check if the index has a name
@@ -667,19 +989,12 @@ class SchemaManager:
                     
                     index_name = index.get('name')
                     
-                    # Check if the index name is unique
-                    if index_name in index_names:
-                        errors.append(f"Duplicate index name in table {table_name}: {index_name}")
-                        continue
-                    
-                    index_names.add(index_name)
-                    
                     # Check if the index has columns
                     if 'columns' not in index:
                         errors.append(f"Index {index_name} in table {table_name} does not have columns")
                         continue
                     
-                    index_columns = index.get('columns', [])
+                    index_columns: List[str] = index.get('columns', [])
                     
                     # Check if there are any columns
                     if not index_columns:
@@ -0,0 +1,257 @@
+"""
+Installed package metadata functionality.
+
+Reads the dist-info metadata of a virtual environment in-process, so that
+callers only need to run pip when the metadata cannot be read.
+"""
+import os
+import re
+import glob
+import string
+import logging
+import platform
+from typing import List, Dict, Any, Optional
+
+try:
+    import importlib.metadata as importlib_metadata
+    IMPORTLIB_METADATA_AVAILABLE = True
+except ImportError:
+    IMPORTLIB_METADATA_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_IS_WINDOWS = platform.system() == "Windows"
+
+# Characters allowed in package names and exact versions, for str.lstrip/strip
+NAME_CHARS = string.ascii_letters + string.digits + '_.-'
+
+# Runs of separators that are equivalent in package names
+_NAME_SEPARATORS_RE = re.compile(r'[-_.]+')
+
+# Environment marker limiting a requirement to an extra
+_EXTRA_MARKER_RE = re.compile(r'\bextra\s*==')
+
+# Package metadata fields reported by get_package_info, as in pip show
+_METADATA_FIELDS = ('Summary', 'Home-page', 'Author', 'Author-email', 'License')
+
+
+def _canonical_name(name: str) -> str:
+    """
+    Normalize a package name for comparison.
+
+    Args:
+        name: Package name
+
+    Returns:
+        str: Lowercase name with separator runs replaced by '-'
+    """
+    return _NAME_SEPARATORS_RE.sub('-', name).lower()
+
+
+def find_site_packages(env_path: str) -> Optional[str]:
+    """
+    Find the site-packages directory of a virtual environment.
+
+    Args:
+        env_path: Path to the virtual environment
+
+    Returns:
+        Optional[str]: Path to site-packages or None if not found
+    """
+    if _IS_WINDOWS:
+        candidates = [os.path.join(env_path, "Lib", "site-packages")]
+    else:
+        candidates = glob.glob(os.path.join(env_path, "lib", "python*", "site-packages"))
+
+    for candidate in candidates:
+        if os.path.isdir(candidate):
+            return candidate
+
+    return None
+
+
+def _required_names(distribution: Any) -> List[str]:
+    """
+    Get the names of the packages a distribution depends on.
+
+    Dependencies needed only for extras are left out, as in pip show.
+
+    Args:
+        distribution: importlib.metadata distribution
+
+    Returns:
+        List[str]: Names of the required packages
+    """
+    names = []
+    for requirement in distribution.requires or []:
+        if not _EXTRA_MARKER_RE.search(requirement):
+            names.append(requirement[:len(requirement) - len(requirement.lstrip(NAME_CHARS))])
+
+    return names
+
+
+def get_package_info_from_metadata(env_path: str, package_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Get information about an installed package from its metadata files.
+
+    Args:
+        env_path: Path to the virtual environment
+        package_name: Name of the package
+
+    Returns:
+        Optional[Dict[str, Any]]: Package information in the pip show format, or None
+        if the metadata cannot be read and pip has to be asked instead
+    """
+    if not IMPORTLIB_METADATA_AVAILABLE:
+        return None
+
+    site_packages = find_site_packages(env_path)
+    if site_packages is None:
+        return None
+
+    target = _canonical_name(package_name)
+    distribution = None
+    required_by: List[str] = []
+
+    try:
+        for dist in importlib_metadata.distributions(path=[site_packages]):
+            dist_name = dist.metadata['Name']
+            if not dist_name:
+                continue
+
+            if _canonical_name(dist_name) == target:
+                distribution = dist
+                continue
+
+            # Collect the packages that depend on the target
+            if any(_canonical_name(name) == target for name in _required_names(dist)):
+                required_by.append(dist_name)
+
+        if distribution is None:
+            return None
+
+        return _metadata_package_info(
+            distribution, site_packages, _required_names(distribution), required_by
+        )
+    except Exception as e:
+        logger.warning(f"Failed to read package metadata from {site_packages}: {str(e)}")
+        return None
+
+
+def get_all_package_info_from_metadata(env_path: str) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Get information about every installed package from the metadata files.
+
+    Args:
+        env_path: Path to the virtual environment
+
+    Returns:
+        Optional[Dict[str, Dict[str, Any]]]: Package information in the pip show
+        format by lowercase package name, or None if the metadata cannot be read
+        and pip has to be asked instead
+    """
+    if not IMPORTLIB_METADATA_AVAILABLE:
+        return None
+
+    site_packages = find_site_packages(env_path)
+    if site_packages is None:
+        return None
+
+    try:
+        distributions: Dict[str, Any] = {}
+        requires: Dict[str, List[str]] = {}
+        required_by: Dict[str, List[str]] = {}
+
+        # Read each distribution's metadata once, collecting the reverse
+        # dependencies along the way
+        for dist in importlib_metadata.distributions(path=[site_packages]):
+            dist_name = dist.metadata['Name']
+            if not dist_name or dist_name.lower() in distributions:
+                continue
+
+            distributions[dist_name.lower()] = dist
+            requires[dist_name.lower()] = _required_names(dist)
+            for name in requires[dist_name.lower()]:
+                required_by.setdefault(_canonical_name(name), []).append(dist_name)
+    except Exception as e:
+        logger.warning(f"Failed to read package metadata from {site_packages}: {str(e)}")
+        return None
+
+    # Every environment has at least pip installed
+    if not distributions:
+        return None
+
+    return {
+        key: _metadata_package_info(
+            dist, site_packages, requires[key], required_by.get(_canonical_name(key), [])
+        )
+        for key, dist in distributions.items()
+    }
+
+
+def list_installed_packages_from_metadata(env_path: str) -> Optional[List[Dict[str, str]]]:
+    """
+    List the installed packages and versions from the metadata files.
+
+    Args:
+        env_path: Path to the virtual environment
+
+    Returns:
+        Optional[List[Dict[str, str]]]: Packages in the pip list format, or None if
+        the metadata cannot be read and pip has to be asked instead
+    """
+    if not IMPORTLIB_METADATA_AVAILABLE:
+        return None
+
+    site_packages = find_site_packages(env_path)
+    if site_packages is None:
+        return None
+
+    try:
+        packages = {}
+        for dist in importlib_metadata.distributions(path=[site_packages]):
+            dist_name = dist.metadata['Name']
+            if dist_name and dist_name.lower() not in packages:
+                packages[dist_name.lower()] = {"name": dist_name, "version": dist.version}
+    except Exception as e:
+        logger.warning(f"Failed to read package metadata from {site_packages}: {str(e)}")
+        return None
+
+    # Every environment has at least pip installed
+    if not packages:
+        return None
+
+    return list(packages.values())
+
+
+def _metadata_package_info(
+    distribution: Any,
+    site_packages: str,
+    requires: List[str],
+    required_by: List[str]
+) -> Dict[str, Any]:
+    """
+    Build the pip show style information of a distribution.
+
+    Args:
+        distribution: importlib.metadata distribution
+        site_packages: Path to the site-packages directory
+        requires: Names of the packages the distribution depends on
+        required_by: Names of the packages that depend on the distribution
+
+    Returns:
+        Dict[str, Any]: Package information in the pip show format
+    """
+    metadata = distribution.metadata
+
+    package_info = {
+        "name": metadata['Name'],
+        "version": distribution.version
+    }
+    for field in _METADATA_FIELDS:
+        package_info[field.lower().replace("-", "_")] = metadata.get(field) or ""
+    package_info["location"] = site_packages
+    package_info["requires"] = sorted(requires, key=str.lower)
+    package_info["required_by"] = sorted(required_by, key=str.lower)
+
+    return package_info
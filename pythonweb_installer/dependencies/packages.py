@@ -4,15 +4,97 @@ Package installation and management functionality.
 import os
 import re
 import json
+import hashlib
 import logging
 import subprocess
 import platform
+from operator import itemgetter
 from typing import List, Dict, Any, Tuple, Optional, Set
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from pythonweb_installer.environment.virtualenv import list_installed_packages
+from pythonweb_installer.environment.cache import clear_validation_cache
+from pythonweb_installer.dependencies.metadata import NAME_CHARS, get_package_info_from_metadata
 
 logger = logging.getLogger(__name__)
 
+_IS_WINDOWS = platform.system() == "Windows"
+
+# Python's own descriptors are non-inheritable, so pip does not need
+# close_fds on POSIX; leaving it off lets CPython launch pip with posix_spawn
+_CLOSE_FDS = _IS_WINDOWS
+
+# Pip executables known to exist, by virtual environment path
+_PIP_EXE_CACHE: Dict[str, str] = {}
+
+# Patterns used to parse package specifications
+_COMMENT_RE = re.compile(r'(?:^|\s)#.*$')
+_EGG_RE = re.compile(r'#egg=([a-zA-Z0-9_.-]+)')
+
+# "Key: value" lines of pip show output; the value never spans lines. The
+# pattern is bytes so only the matched keys and values need decoding.
+_SHOW_RE = re.compile(rb'(?m)^([A-Za-z-]+):[ \t]*(.*)$')
+
+
+def resolve_pip_exe(env_path: str) -> Tuple[str, bool]:
+    """
+    Determine the pip executable of a virtual environment.
+
+    Only executables that were found are cached, so an environment created
+    later is still picked up. Callers drop the entry with forget_pip_exe
+    when running a cached executable fails because it no longer exists.
+
+    Args:
+        env_path: Path to the virtual environment
+
+    Returns:
+        Tuple[str, bool]: Path to the pip executable and whether it exists
+    """
+    pip_exe = _PIP_EXE_CACHE.get(env_path)
+    if pip_exe is not None:
+        return pip_exe, True
+
+    if _IS_WINDOWS:
+        pip_exe = os.path.join(env_path, "Scripts", "pip.exe")
+    else:
+        pip_exe = os.path.join(env_path, "bin", "pip")
+
+    if not os.path.exists(pip_exe):
+        return pip_exe, False
+
+    _PIP_EXE_CACHE[env_path] = pip_exe
+    return pip_exe, True
+
+
+def forget_pip_exe(env_path: str) -> None:
+    """
+    Drop a cached pip executable, after it turned out to be missing.
+
+    Args:
+        env_path: Path to the virtual environment
+    """
+    _PIP_EXE_CACHE.pop(env_path, None)
+
+
+def _decode_output(output: Any) -> str:
+    """
+    Decode the captured output of a pip command.
+
+    pip is run without text=True, so output is only decoded where it is used.
+
+    Args:
+        output: Captured stdout or stderr
+
+    Returns:
+        str: Decoded output
+    """
+    return output.decode('utf-8', errors='replace') if hasattr(output, 'decode') else str(output)
+
 
 def parse_requirements_file(file_path: str) -> Tuple[bool, List[Dict[str, str]]]:
     """
@@ -26,36 +108,32 @@ def parse_requirements_file(file_path: str) -> Tuple[bool, List[Dict[str, str]]]
     """
     logger.info(f"Parsing requirements file: {file_path}")
 
-    if not os.path.exists(file_path):
-        logger.error(f"Requirements file not found: {file_path}")
-        return False, []
-
     packages = []
 
     try:
         with open(file_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-
-                # Skip empty lines and comments
-                if not line or line.startswith('#'):
-                    continue
+            raw = f.read()
 
-                # Skip options (lines starting with -)
-                if line.startswith('-'):
-                    continue
+        # Skip empty lines, comments and options (lines starting with -)
+        lines = [line for line in (line.strip() for line in raw.splitlines())
+                 if line and line[0] not in '#-']
 
-                # Handle line continuations
-                if line.endswith('\\'):
-                    line = line[:-1].strip()
+        # Handle line continuations, only if the file has any
+        if '\\' in raw:
+            lines = [line[:-1].strip() if line.endswith('\\') else line for line in lines]
 
-                # Extract package name and version
-                package_info = parse_package_spec(line)
-                if package_info:
-                    packages.append(package_info)
+        # Parse repeated lines only once, keeping the first occurrence
+        for line in dict.fromkeys(lines):
+            # Extract package name and version
+            package_info = parse_package_spec(line)
+            if package_info:
+                packages.append(package_info)
 
         logger.info(f"Found {len(packages)} packages in requirements file")
         return True, packages
+    except FileNotFoundError:
+        logger.error(f"Requirements file not found: {file_path}")
+        return False, []
     except Exception as e:
         logger.error(f"Failed to parse requirements file: {str(e)}")
         return False, []
@@ -71,8 +149,12 @@ def parse_package_spec(package_spec: str) -> Optional[Dict[str, str]]:
     Returns:
         Optional[Dict[str, str]]: Package information or None if invalid
     """
-    # Remove any comments
-    package_spec = package_spec.split('#')[0].strip()
+    # Remove any comments; as in pip, a comment starts at a '#' at the start of
+    # the line or after whitespace, so URL fragments such as #egg= are kept.
+    # Plain specifications have no '#' and never reach the regex engine.
+    if '#' in package_spec:
+        package_spec = _COMMENT_RE.sub('', package_spec)
+    package_spec = package_spec.strip()
 
     if not package_spec:
         return None
@@ -80,7 +162,7 @@ def parse_package_spec(package_spec: str) -> Optional[Dict[str, str]]:
     # Handle direct references (URLs, paths, etc.)
     if package_spec.startswith(('http://', 'https://', 'git+', 'file:')):
         # Extract the package name from the URL if possible
-        name_match = re.search(r'#egg=([a-zA-Z0-9_.-]+)', package_spec)
+        name_match = _EGG_RE.search(package_spec)
         if name_match:
             return {
                 'name': name_match.group(1),
@@ -88,8 +170,9 @@ def parse_package_spec(package_spec: str) -> Optional[Dict[str, str]]:
                 'direct_reference': True
             }
         else:
+            spec_hash = hashlib.blake2b(package_spec.encode('utf-8'), digest_size=4).hexdigest()
             return {
-                'name': f"unknown-{hash(package_spec) % 10000}",
+                'name': f"unknown-{spec_hash}",
                 'url': package_spec,
                 'direct_reference': True
             }
@@ -103,13 +186,14 @@ def parse_package_spec(package_spec: str) -> Optional[Dict[str, str]]:
     # package~=1.0.0
     # package!=1.0.0
     # package>1.0.0,<2.0.0
-    package_match = re.match(r'^([a-zA-Z0-9_.-]+)(.*)$', package_spec)
+    # Split off the name by stripping the leading name characters in C
+    version_spec = package_spec.lstrip(NAME_CHARS)
+    name = package_spec[:len(package_spec) - len(version_spec)]
 
-    if not package_match:
+    if not name:
         logger.warning(f"Invalid package specification: {package_spec}")
         return None
 
-    name, version_spec = package_match.groups()
     name = name.lower()  # Normalize package name
 
     package_info = {'name': name}
@@ -120,9 +204,10 @@ def parse_package_spec(package_spec: str) -> Optional[Dict[str, str]]:
             package_info['version_spec'] = version_spec
 
             # Extract exact version if specified
-            exact_version_match = re.match(r'^==([a-zA-Z0-9_.-]+)$', version_spec)
-            if exact_version_match:
-                package_info['version'] = exact_version_match.group(1)
+            exact_version = version_spec[2:]
+            if (version_spec.startswith('==') and exact_version
+                    and not exact_version.strip(NAME_CHARS)):
+                package_info['version'] = exact_version
 
     return package_info
 
@@ -154,12 +239,9 @@ def install_package(
     logger.info(f"Installing package: {package_spec}")
 
     # Determine the pip executable in the virtual environment
-    if platform.system() == "Windows":
-        pip_exe = os.path.join(env_path, "Scripts", "pip.exe")
-    else:
-        pip_exe = os.path.join(env_path, "bin", "pip")
+    pip_exe, pip_found = resolve_pip_exe(env_path)
 
-    if not os.path.exists(pip_exe):
+    if not pip_found:
         logger.error(f"Pip executable not found at {pip_exe}")
         return False, f"Pip executable not found at {pip_exe}"
 
@@ -185,19 +267,191 @@ def install_package(
 
     # Execute the installation command
     try:
-        result = subprocess.run(
+        subprocess.run(
             cmd,
             check=True,
-            stdout=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
             stderr=subprocess.PIPE,
-            text=True
+            close_fds=_CLOSE_FDS
         )
         logger.info(f"Successfully installed package: {package_spec}")
         return True, f"Successfully installed package: {package_spec}"
+    except FileNotFoundError:
+        # The environment was removed after pip was last found
+        forget_pip_exe(env_path)
+        logger.error(f"Pip executable not found at {pip_exe}")
+        return False, f"Pip executable not found at {pip_exe}"
     except subprocess.CalledProcessError as e:
-        error_msg = e.stderr if hasattr(e, 'stderr') else str(e)
+        error_msg = _decode_output(e.stderr)
         logger.error(f"Failed to install package {package_spec}: {error_msg}")
         return False, f"Failed to install package {package_spec}: {error_msg}"
+    finally:
+        # Pip may have changed the environment even if it failed
+        clear_validation_cache(env_path)
+
+
+def install_packages(
+    env_path: str,
+    package_specs: List[str],
+    upgrade: bool = False,
+    index_url: Optional[str] = None,
+    extra_index_url: Optional[str] = None,
+    no_deps: bool = False,
+    user: bool = False
+) -> Tuple[bool, Dict[str, Any]]:
+    """
+    Install several packages in the virtual environment with a single pip run.
+
+    Args:
+        env_path: Path to the virtual environment
+        package_specs: Package specifications (name, version, URL)
+        upgrade: Whether to upgrade the packages if already installed
+        index_url: Alternative package index URL
+        extra_index_url: Additional package index URL
+        no_deps: Whether to skip installing dependencies
+        user: Whether to install in user site-packages
+
+    Returns:
+        Tuple[bool, Dict[str, Any]]: Success status and installation results
+    """
+    if not package_specs:
+        return True, {"message": "No packages to install", "installed_packages": []}
+
+    logger.info(f"Installing {len(package_specs)} packages")
+
+    # Determine the pip executable in the virtual environment
+    pip_exe, pip_found = resolve_pip_exe(env_path)
+
+    if not pip_found:
+        logger.error(f"Pip executable not found at {pip_exe}")
+        return False, {"error": f"Pip executable not found at {pip_exe}"}
+
+    # Prepare the installation command
+    cmd = [pip_exe, "install"]
+
+    if upgrade:
+        cmd.append("--upgrade")
+
+    if index_url:
+        cmd.extend(["--index-url", index_url])
+
+    if extra_index_url:
+        cmd.extend(["--extra-index-url", extra_index_url])
+
+    if no_deps:
+        cmd.append("--no-deps")
+
+    if user:
+        cmd.append("--user")
+
+    cmd.extend(package_specs)
+
+    # Execute the installation command
+    try:
+        result = subprocess.run(
+            cmd,
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            close_fds=_CLOSE_FDS
+        )
+        logger.info(f"Successfully installed {len(package_specs)} packages")
+        return True, {
+            "message": f"Successfully installed {len(package_specs)} packages",
+            "installed_packages": _parse_installed_packages(_decode_output(result.stdout))
+        }
+    except FileNotFoundError:
+        # The environment was removed after pip was last found
+        forget_pip_exe(env_path)
+        logger.error(f"Pip executable not found at {pip_exe}")
+        return False, {"error": f"Pip executable not found at {pip_exe}"}
+    except subprocess.CalledProcessError as e:
+        error_msg = _decode_output(e.stderr)
+        logger.error(f"Failed to install packages: {error_msg}")
+        return False, {"error": f"Failed to install packages: {error_msg}"}
+    finally:
+        # Pip may have changed the environment even if it failed
+        clear_validation_cache(env_path)
+
+
+def install_packages_with_fallback(
+    env_path: str,
+    package_specs: List[str],
+    **kwargs: Any
+) -> Tuple[bool, Dict[str, Any]]:
+    """
+    Install several packages and report the packages that failed to install.
+
+    The packages are installed with a single install_packages run; only if that
+    fails are they installed one at a time to find the ones that fail. When the
+    failed packages are not needed, call install_packages directly.
+
+    Args:
+        env_path: Path to the virtual environment
+        package_specs: List of package specifications
+        **kwargs: Options passed to install_packages and install_package
+
+    Returns:
+        Tuple[bool, Dict[str, Any]]: Success status and installation results
+    """
+    if not package_specs:
+        return True, {
+            "message": "No packages to install",
+            "installed_packages": [],
+            "failed_packages": {}
+        }
+
+    logger.info(f"Installing {len(package_specs)} packages")
+
+    installed_packages = []
+    failed_packages = {}
+
+    success, result = install_packages(env_path, package_specs, **kwargs)
+
+    if success:
+        installed_packages = list(package_specs)
+    else:
+        # Install the packages one at a time to find the ones that fail
+        for package_spec in package_specs:
+            success, message = install_package(env_path, package_spec, **kwargs)
+
+            if success:
+                installed_packages.append(package_spec)
+            else:
+                failed_packages[package_spec] = message
+
+    if failed_packages:
+        logger.error(f"Failed to install {len(failed_packages)} of {len(package_specs)} packages")
+        return False, {
+            "error": f"Failed to install {len(failed_packages)} of {len(package_specs)} packages",
+            "installed_packages": installed_packages,
+            "failed_packages": failed_packages
+        }
+
+    return True, {
+        "message": f"Successfully installed {len(package_specs)} packages",
+        "installed_packages": installed_packages,
+        "failed_packages": failed_packages
+    }
+
+
+def _parse_installed_packages(output: str) -> List[str]:
+    """
+    Extract the installed packages from pip install output.
+
+    Args:
+        output: Standard output of pip install
+
+    Returns:
+        List[str]: Installed packages as reported by pip (name-version)
+    """
+    installed_packages = []
+    for line in output.splitlines():
+        if "Successfully installed" in line:
+            packages_str = line.split("Successfully installed")[1].strip()
+            installed_packages = [pkg.strip() for pkg in packages_str.split()]
+
+    return installed_packages
 
 
 def install_requirements(
@@ -227,12 +481,9 @@ def install_requirements(
         return False, {"error": f"Requirements file not found: {requirements_file}"}
 
     # Determine the pip executable in the virtual environment
-    if platform.system() == "Windows":
-        pip_exe = os.path.join(env_path, "Scripts", "pip.exe")
-    else:
-        pip_exe = os.path.join(env_path, "bin", "pip")
+    pip_exe, pip_found = resolve_pip_exe(env_path)
 
-    if not os.path.exists(pip_exe):
+    if not pip_found:
         logger.error(f"Pip executable not found at {pip_exe}")
         return False, {"error": f"Pip executable not found at {pip_exe}"}
 
@@ -255,25 +506,26 @@ def install_requirements(
             check=True,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True
+            close_fds=_CLOSE_FDS
         )
         logger.info(f"Successfully installed requirements from {requirements_file}")
 
-        # Parse the output to get installed packages
-        installed_packages = []
-        for line in result.stdout.splitlines():
-            if "Successfully installed" in line:
-                packages_str = line.split("Successfully installed")[1].strip()
-                installed_packages = [pkg.strip() for pkg in packages_str.split()]
-
         return True, {
             "message": f"Successfully installed requirements from {requirements_file}",
-            "installed_packages": installed_packages
+            "installed_packages": _parse_installed_packages(_decode_output(result.stdout))
         }
+    except FileNotFoundError:
+        # The environment was removed after pip was last found
+        forget_pip_exe(env_path)
+        logger.error(f"Pip executable not found at {pip_exe}")
+        return False, {"error": f"Pip executable not found at {pip_exe}"}
     except subprocess.CalledProcessError as e:
-        error_msg = e.stderr if hasattr(e, 'stderr') else str(e)
+        error_msg = _decode_output(e.stderr)
         logger.error(f"Failed to install requirements: {error_msg}")
         return False, {"error": f"Failed to install requirements: {error_msg}"}
+    finally:
+        # Pip may have changed the environment even if it failed
+        clear_validation_cache(env_path)
 
 
 def uninstall_package(
@@ -295,12 +547,9 @@ def uninstall_package(
     logger.info(f"Uninstalling package: {package_name}")
 
     # Determine the pip executable in the virtual environment
-    if platform.system() == "Windows":
-        pip_exe = os.path.join(env_path, "Scripts", "pip.exe")
-    else:
-        pip_exe = os.path.join(env_path, "bin", "pip")
+    pip_exe, pip_found = resolve_pip_exe(env_path)
 
-    if not os.path.exists(pip_exe):
+    if not pip_found:
         logger.error(f"Pip executable not found at {pip_exe}")
         return False, f"Pip executable not found at {pip_exe}"
 
@@ -314,19 +563,27 @@ def uninstall_package(
 
     # Execute the uninstallation command
     try:
-        result = subprocess.run(
+        subprocess.run(
             cmd,
             check=True,
-            stdout=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
             stderr=subprocess.PIPE,
-            text=True
+            close_fds=_CLOSE_FDS
         )
         logger.info(f"Successfully uninstalled package: {package_name}")
         return True, f"Successfully uninstalled package: {package_name}"
+    except FileNotFoundError:
+        # The environment was removed after pip was last found
+        forget_pip_exe(env_path)
+        logger.error(f"Pip executable not found at {pip_exe}")
+        return False, f"Pip executable not found at {pip_exe}"
     except subprocess.CalledProcessError as e:
-        error_msg = e.stderr if hasattr(e, 'stderr') else str(e)
+        error_msg = _decode_output(e.stderr)
         logger.error(f"Failed to uninstall package {package_name}: {error_msg}")
         return False, f"Failed to uninstall package {package_name}: {error_msg}"
+    finally:
+        # Pip may have changed the environment even if it failed
+        clear_validation_cache(env_path)
 
 
 def get_package_info(
@@ -345,13 +602,16 @@ def get_package_info(
     """
     logger.info(f"Getting information for package: {package_name}")
 
+    # Read the installed metadata directly, without starting pip
+    package_info = get_package_info_from_metadata(env_path, package_name)
+    if package_info is not None:
+        logger.info(f"Successfully retrieved information for package: {package_name}")
+        return True, package_info
+
     # Determine the pip executable in the virtual environment
-    if platform.system() == "Windows":
-        pip_exe = os.path.join(env_path, "Scripts", "pip.exe")
-    else:
-        pip_exe = os.path.join(env_path, "bin", "pip")
+    pip_exe, pip_found = resolve_pip_exe(env_path)
 
-    if not os.path.exists(pip_exe):
+    if not pip_found:
         logger.error(f"Pip executable not found at {pip_exe}")
         return False, {"error": f"Pip executable not found at {pip_exe}"}
 
@@ -362,15 +622,15 @@ def get_package_info(
             check=True,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True
+            close_fds=_CLOSE_FDS
         )
 
         # Parse the output
-        package_info = {}
-        for line in result.stdout.splitlines():
-            if ":" in line:
-                key, value = line.split(":", 1)
-                package_info[key.strip().lower().replace("-", "_")] = value.strip()
+        package_info = {
+            key.decode('ascii').lower().replace("-", "_"):
+                value.decode('utf-8', errors='replace').strip()
+            for key, value in _SHOW_RE.findall(result.stdout)
+        }
 
         # Parse requires into a list
         if "requires" in package_info and package_info["requires"]:
@@ -386,8 +646,13 @@ def get_package_info(
 
         logger.info(f"Successfully retrieved information for package: {package_name}")
         return True, package_info
+    except FileNotFoundError:
+        # The environment was removed after pip was last found
+        forget_pip_exe(env_path)
+        logger.error(f"Pip executable not found at {pip_exe}")
+        return False, {"error": f"Pip executable not found at {pip_exe}"}
     except subprocess.CalledProcessError as e:
-        error_msg = e.stderr if hasattr(e, 'stderr') else str(e)
+        error_msg = _decode_output(e.stderr)
         logger.error(f"Failed to get information for package {package_name}: {error_msg}")
         return False, {"error": f"Failed to get information for package {package_name}: {error_msg}"}
 
@@ -418,22 +683,29 @@ def generate_requirements_file(
         logger.error("Failed to list installed packages")
         return False, "Failed to list installed packages"
 
+    # pip list reports names in their original case, so lower each name once
+    # for both the exclusion check and the case-insensitive sort
+    keyed_packages = [(pkg["name"].lower(), pkg) for pkg in packages]
+
     # Filter out excluded packages
     if exclude_packages:
-        exclude_packages = [pkg.lower() for pkg in exclude_packages]
-        packages = [pkg for pkg in packages if pkg["name"].lower() not in exclude_packages]
+        exclude_set = frozenset(pkg.lower() for pkg in exclude_packages)
+        keyed_packages = [item for item in keyed_packages if item[0] not in exclude_set]
+
+    keyed_packages.sort(key=itemgetter(0))
 
     # Generate requirements file content
     try:
-        with open(output_file, 'w') as f:
-            f.write("# Generated by PythonWeb Installer\n")
-            f.write("# This file contains the packages installed in the virtual environment\n\n")
+        lines = [
+            "# Generated by PythonWeb Installer\n",
+            "# This file contains the packages installed in the virtual environment\n\n"
+        ]
+
+        line_format = "{name}=={version}\n" if include_versions else "{name}\n"
+        lines.extend(line_format.format_map(package) for _, package in keyed_packages)
 
-            for package in sorted(packages, key=lambda p: p["name"].lower()):
-                if include_versions:
-                    f.write(f"{package['name']}=={package['version']}\n")
-                else:
-                    f.write(f"{package['name']}\n")
+        with open(output_file, 'w') as f:
+            f.write("".join(lines))
 
         logger.info(f"Successfully generated requirements file: {output_file}")
         return True, f"Successfully generated requirements file: {output_file}"
@@ -455,12 +727,9 @@ def check_outdated_packages(env_path: str) -> Tuple[bool, List[Dict[str, str]]]:
     logger.info("Checking for outdated packages")
 
     # Determine the pip executable in the virtual environment
-    if platform.system() == "Windows":
-        pip_exe = os.path.join(env_path, "Scripts", "pip.exe")
-    else:
-        pip_exe = os.path.join(env_path, "bin", "pip")
+    pip_exe, pip_found = resolve_pip_exe(env_path)
 
-    if not os.path.exists(pip_exe):
+    if not pip_found:
         logger.error(f"Pip executable not found at {pip_exe}")
         return False, []
 
@@ -471,16 +740,24 @@ def check_outdated_packages(env_path: str) -> Tuple[bool, List[Dict[str, str]]]:
             check=True,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True
+            close_fds=_CLOSE_FDS
         )
 
-        # Parse the JSON output
-        outdated_packages = json.loads(result.stdout)
+        # Parse the JSON output, with orjson when available
+        if ORJSON_AVAILABLE:
+            outdated_packages = orjson.loads(result.stdout)
+        else:
+            outdated_packages = json.loads(result.stdout)
 
         logger.info(f"Found {len(outdated_packages)} outdated packages")
         return True, outdated_packages
+    except FileNotFoundError:
+        # The environment was removed after pip was last found
+        forget_pip_exe(env_path)
+        logger.error(f"Pip executable not found at {pip_exe}")
+        return False, []
     except subprocess.CalledProcessError as e:
-        error_msg = e.stderr if hasattr(e, 'stderr') else str(e)
+        error_msg = _decode_output(e.stderr)
         logger.error(f"Failed to check for outdated packages: {error_msg}")
         return False, []
     except json.JSONDecodeError as e:
@@ -3,21 +3,313 @@ Dependency resolution functionality.
 """
 import os
 import re
+import sys
 import json
+import time
+import hashlib
 import logging
+import tempfile
+import threading
 import subprocess
-import platform
+from collections import deque
+from functools import lru_cache
 from typing import List, Dict, Any, Tuple, Optional, Set
 
 from pythonweb_installer.dependencies.packages import (
     parse_requirements_file,
     get_package_info,
     install_package,
-    uninstall_package
+    install_packages,
+    uninstall_package,
+    resolve_pip_exe,
+    forget_pip_exe,
+    _CLOSE_FDS,
+    _decode_output
 )
+from pythonweb_installer.dependencies.metadata import (
+    NAME_CHARS,
+    find_site_packages,
+    get_all_package_info_from_metadata
+)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Larger pipes let pip write its list and show output without blocking on
+# the 64 KiB default; subprocess accepts pipesize from Python 3.10
+_PIPE_SIZE_KWARGS: Dict[str, Any] = {"pipesize": 1024 * 1024} if sys.version_info >= (3, 10) else {}
+
+# Conflict reported by pip, e.g.
+# "package1 1.0.0 has requirement package2>=2.0.0, but you have package2 1.0.0."
+_CONFLICT_RE = re.compile(
+    r"([a-zA-Z0-9_.-]+)\s+([a-zA-Z0-9_.-]+)\s+has requirement\s+"
+    r"([a-zA-Z0-9_.-]+)([>=<~!]+)([a-zA-Z0-9_.-]+),\s+"
+    r"but you have\s+([a-zA-Z0-9_.-]+)\s+([a-zA-Z0-9_.-]+)"
+)
+
+# Location of the on-disk index of pip package information
+_RESOLVE_INDEX_FILE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "pythonweb_installer",
+    "resolve_index.json"
+)
+
+# Entries older than this are not used
+_RESOLVE_INDEX_MAX_AGE = 24 * 60 * 60
+
+
+def _stat_stamp(stat: os.stat_result) -> Tuple[int, int, int]:
+    """
+    Identify a version of a file by its modification time, size and inode.
+
+    Args:
+        stat: Result of os.stat or os.fstat
+
+    Returns:
+        Tuple[int, int, int]: Stamp that changes whenever the file is replaced
+    """
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+class _ResolveIndex:
+    """
+    On-disk cache of the installed packages, their pip show information and
+    the result of pip check.
+
+    Entries are keyed by an environment signature (see _environment_signature),
+    so installing or removing a package makes the old entry unreachable. The
+    loaded index is kept in memory and only read again when the file changes.
+    """
+
+    def __init__(
+        self,
+        index_file: str = _RESOLVE_INDEX_FILE,
+        max_age: float = _RESOLVE_INDEX_MAX_AGE
+    ):
+        self.index_file = index_file
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._stamp: Optional[Tuple[int, int, int]] = None
+
+    def _file_stamp(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            return _stat_stamp(os.stat(self.index_file))
+        except OSError:
+            return None
+
+    def _refresh(self) -> None:
+        # Must be called with the lock held
+        stamp = self._file_stamp()
+        if stamp is not None and stamp == self._stamp:
+            return
+
+        index: Any = {}
+        if stamp is not None:
+            try:
+                with open(self.index_file, 'r') as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = {}
+
+        self._index = {
+            signature: entry for signature, entry in index.items()
+            if isinstance(entry, dict)
+        } if isinstance(index, dict) else {}
+        self._stamp = stamp
+
+    def _expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return now - float(entry.get("created", 0)) >= self.max_age
+
+    def get(self, signature: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached package information for an environment signature.
+
+        Args:
+            signature: Environment signature
+
+        Returns:
+            Optional[Dict[str, Any]]: Cached entry or None if missing or expired
+        """
+        with self._lock:
+            self._refresh()
+            entry = self._index.get(signature)
+
+        if entry is None or self._expired(entry, time.time()):
+            return None
+        return entry
+
+    def put(self, signature: str, **fields: Any) -> None:
+        """
+        Store information for an environment signature.
+
+        Fields are merged into the existing entry, if there is one.
+
+        Args:
+            signature: Environment signature
+            **fields: Information to store, e.g. installed (lowercase names of
+                the installed packages), packages (package information by
+                lowercase package name) or conflicts (pip check conflicts)
+        """
+        with self._lock:
+            # Pick up entries written by other processes before rewriting the file
+            self._refresh()
+
+            now = time.time()
+            index = {
+                key: entry for key, entry in self._index.items()
+                if not self._expired(entry, now)
+            }
+            entry = dict(index.get(signature) or {"created": now})
+            entry.update(fields)
+            index[signature] = entry
+            self._index = index
+
+            # Write to a temporary file first so readers never see a partial index
+            index_dir = os.path.dirname(self.index_file)
+            try:
+                os.makedirs(index_dir, exist_ok=True)
+                fd, temp_file = tempfile.mkstemp(dir=index_dir, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, 'w') as f:
+                        json.dump(index, f)
+                        f.flush()
+                        # The rename keeps the inode, size and modification time
+                        stamp = _stat_stamp(os.fstat(f.fileno()))
+                    os.replace(temp_file, self.index_file)
+                except OSError:
+                    os.remove(temp_file)
+                    raise
+            except OSError as e:
+                logger.warning(f"Failed to write resolve index {self.index_file}: {str(e)}")
+                return
+
+            self._stamp = stamp
+
+
+_RESOLVE_INDEX = _ResolveIndex()
+
+
+def _environment_signature(env_path: str) -> Optional[str]:
+    """
+    Compute a signature of the packages installed in a virtual environment.
+
+    The signature covers the names and modification times of the entries in
+    site-packages, which change whenever pip installs or removes a package.
+
+    Args:
+        env_path: Path to the virtual environment
+
+    Returns:
+        Optional[str]: Signature or None if site-packages cannot be read
+    """
+    site_packages = find_site_packages(env_path)
+    if site_packages is None:
+        return None
+
+    try:
+        with os.scandir(site_packages) as entries:
+            listing = sorted(f"{entry.name}:{entry.stat().st_mtime_ns}" for entry in entries)
+    except OSError:
+        return None
+
+    digest = hashlib.blake2b(os.path.abspath(env_path).encode('utf-8'), digest_size=16)
+    digest.update("\n".join(listing).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _spec_name(dep_spec: str) -> str:
+    """
+    Extract the lowercase package name from a dependency specification.
+
+    The name ends at the first character that cannot be part of it, such as a
+    version operator, an extras bracket, a space or a marker separator.
+
+    Args:
+        dep_spec: Dependency specification (e.g., "package>=1.0.0")
+
+    Returns:
+        str: Lowercase package name
+    """
+    dep_spec = dep_spec.strip()
+    return dep_spec[:len(dep_spec) - len(dep_spec.lstrip(NAME_CHARS))].lower()
+
+
+def _parse_pip_show_output(output: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Parse the output of pip show for one or more packages.
+
+    pip separates the packages with a line containing only "---".
+
+    Args:
+        output: Standard output of pip show
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Package information by lowercase package name
+    """
+    packages = {}
+    info: Dict[str, Any] = {}
+
+    for line in output.splitlines() + ["---"]:
+        if line == "---":
+            if "name" in info:
+                for key in ("requires", "required_by"):
+                    value = info.get(key)
+                    info[key] = [req.strip() for req in value.split(",")] if value else []
+                packages[info["name"].lower()] = info
+            info = {}
+            continue
+
+        key, separator, value = line.partition(":")
+        if separator and key and not key[0].isspace():
+            info[key.strip().lower().replace("-", "_")] = value.strip()
+
+    return packages
+
+
+@lru_cache(maxsize=32)
+def _parse_requirements_file_memoized(
+    requirements_file: str,
+    mtime_ns: int,
+    size: int
+) -> Tuple[bool, List[Dict[str, str]]]:
+    """
+    Parse a requirements file, memoized on its path, mtime and size.
+
+    Args:
+        requirements_file: Path to the requirements.txt file
+        mtime_ns: Modification time of the file in nanoseconds
+        size: Size of the file in bytes
+
+    Returns:
+        Tuple[bool, List[Dict[str, str]]]: Success status and list of package specifications
+    """
+    return parse_requirements_file(requirements_file)
+
+
+def _parse_requirements_file_cached(requirements_file: str) -> Tuple[bool, List[Dict[str, str]]]:
+    """
+    Parse a requirements file, reusing the result while the file is unchanged.
+
+    Args:
+        requirements_file: Path to the requirements.txt file
+
+    Returns:
+        Tuple[bool, List[Dict[str, str]]]: Success status and list of package specifications
+    """
+    try:
+        stat = os.stat(requirements_file)
+    except OSError:
+        # Let the parser report the missing file
+        return parse_requirements_file(requirements_file)
+
+    return _parse_requirements_file_memoized(requirements_file, stat.st_mtime_ns, stat.st_size)
+
 
 def detect_dependency_conflicts(
     env_path: str,
@@ -39,7 +331,7 @@ def detect_dependency_conflicts(
 
     # Get package specifications from requirements file if provided
     if requirements_file and not package_specs:
-        success, package_specs = parse_requirements_file(requirements_file)
+        success, package_specs = _parse_requirements_file_cached(requirements_file)
         if not success:
             logger.error(f"Failed to parse requirements file: {requirements_file}")
             return False, {"error": f"Failed to parse requirements file: {requirements_file}"}
@@ -49,58 +341,208 @@ def detect_dependency_conflicts(
         return False, {"error": "No package specifications provided"}
 
     # Determine the pip executable in the virtual environment
-    if platform.system() == "Windows":
-        pip_exe = os.path.join(env_path, "Scripts", "pip.exe")
-    else:
-        pip_exe = os.path.join(env_path, "bin", "pip")
+    pip_exe, pip_found = resolve_pip_exe(env_path)
 
-    if not os.path.exists(pip_exe):
+    if not pip_found:
         logger.error(f"Pip executable not found at {pip_exe}")
         return False, {"error": f"Pip executable not found at {pip_exe}"}
 
-    # Check for conflicts using pip-check
-    try:
-        # First, try to install pip-check if not already installed
-        subprocess.run(
-            [pip_exe, "install", "pip-check"],
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-
-        # Run pip-check to detect conflicts
-        result = subprocess.run(
-            [pip_exe, "check"],
-            check=False,  # Don't raise an exception if conflicts are found
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
+    # Check for conflicts using pip's built-in check command, reusing the
+    # result of an earlier check of the same environment state
+    signature = _environment_signature(env_path)
 
-        # Parse the output
-        conflicts = []
-        for line in result.stdout.splitlines() + result.stderr.splitlines():
-            if "has requirement" in line and "which is incompatible with" in line:
-                conflicts.append(line.strip())
-
-        if conflicts:
-            logger.warning(f"Found {len(conflicts)} dependency conflicts")
-            return True, {
-                "has_conflicts": True,
-                "conflicts": conflicts
-            }
+    try:
+        if signature:
+            conflicts = list(_check_dependency_conflicts_cached(pip_exe, signature))
         else:
-            logger.info("No dependency conflicts found")
-            return True, {
-                "has_conflicts": False,
-                "conflicts": []
-            }
+            conflicts = list(_check_dependency_conflicts_cached.__wrapped__(pip_exe, signature))
+    except FileNotFoundError:
+        # The environment was removed after pip was last found
+        forget_pip_exe(env_path)
+        logger.error(f"Pip executable not found at {pip_exe}")
+        return False, {"error": f"Pip executable not found at {pip_exe}"}
     except subprocess.CalledProcessError as e:
         error_msg = e.stderr if hasattr(e, 'stderr') else str(e)
         logger.error(f"Failed to check for dependency conflicts: {error_msg}")
         return False, {"error": f"Failed to check for dependency conflicts: {error_msg}"}
 
+    if conflicts:
+        logger.warning(f"Found {len(conflicts)} dependency conflicts")
+        return True, {
+            "has_conflicts": True,
+            "conflicts": conflicts
+        }
+    else:
+        logger.info("No dependency conflicts found")
+        return True, {
+            "has_conflicts": False,
+            "conflicts": []
+        }
+
+
+@lru_cache(maxsize=32)
+def _check_dependency_conflicts_cached(pip_exe: str, signature: Optional[str]) -> Tuple[str, ...]:
+    """
+    Run pip check and collect the reported conflicts.
+
+    Results are memoized per environment signature and recorded in the
+    resolve index, so an unchanged environment is only checked once.
+
+    Args:
+        pip_exe: Path to the pip executable of the virtual environment
+        signature: Environment signature, or None if it could not be computed
+
+    Returns:
+        Tuple[str, ...]: Conflict descriptions
+
+    Raises:
+        subprocess.CalledProcessError: If pip fails
+    """
+    cached = _RESOLVE_INDEX.get(signature) if signature else None
+    if cached and "conflicts" in cached:
+        return tuple(cached["conflicts"])
+
+    # pip may report on either stream, so read both through one pipe
+    result = subprocess.run(
+        [pip_exe, "check"],
+        check=False,  # Don't raise an exception if conflicts are found
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        close_fds=_CLOSE_FDS
+    )
+
+    # Parse the output
+    conflicts = [
+        line.strip() for line in _decode_output(result.stdout).splitlines()
+        if "has requirement" in line and "which is incompatible with" in line
+    ]
+
+    # A failed check that yielded no recognized conflicts is not recorded, so
+    # the next run asks pip again instead of trusting an empty result
+    if signature and (conflicts or result.returncode == 0):
+        _RESOLVE_INDEX.put(signature, conflicts=conflicts)
+
+    return tuple(conflicts)
+
+
+def _upgrade_conflicts(
+    env_path: str,
+    conflicts: List[Dict[str, str]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Upgrade the conflicting packages to meet their requirements with a single pip run.
+
+    Args:
+        env_path: Path to the virtual environment
+        conflicts: Parsed conflict information, one entry per package
+
+    Returns:
+        Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: Resolved and failed entries
+    """
+    package_specs = [
+        f"{conflict['actual_package']}{conflict['required_operator']}"
+        f"{conflict['required_version']}"
+        for conflict in conflicts
+    ]
+    success, result = install_packages(env_path, package_specs, upgrade=True)
+
+    if success:
+        resolved = [
+            {
+                "package": conflict['actual_package'],
+                "action": "upgraded",
+                "from_version": conflict['actual_version'],
+                "to_spec": package_spec
+            }
+            for conflict, package_spec in zip(conflicts, package_specs)
+        ]
+        return resolved, []
+
+    failed = [
+        {
+            "package": conflict['actual_package'],
+            "action": "upgrade",
+            "error": result.get("error")
+        }
+        for conflict in conflicts
+    ]
+    return [], failed
+
+
+def _downgrade_conflict(env_path: str, conflict: Dict[str, str]) -> Tuple[bool, Dict[str, Any]]:
+    """
+    Downgrade the dependent package to a version that doesn't have the conflict.
+
+    Args:
+        env_path: Path to the virtual environment
+        conflict: Parsed conflict information
+
+    Returns:
+        Tuple[bool, Dict[str, Any]]: Success status and resolved or failed entry
+    """
+    success, pkg_info = get_package_info(env_path, conflict['dependent_package'])
+
+    if not success:
+        return False, {
+            "package": conflict['dependent_package'],
+            "action": "downgrade",
+            "error": "Failed to get package information"
+        }
+
+    # Uninstall and reinstall an earlier version
+    uninstall_package(env_path, conflict['dependent_package'])
+
+    # Try to find an earlier version
+    package_spec = f"{conflict['dependent_package']}<{conflict['dependent_version']}"
+    install_success, install_message = install_package(env_path, package_spec)
+
+    if install_success:
+        return True, {
+            "package": conflict['dependent_package'],
+            "action": "downgraded",
+            "from_version": conflict['dependent_version'],
+            "to_spec": package_spec
+        }
+    return False, {
+        "package": conflict['dependent_package'],
+        "action": "downgrade",
+        "error": install_message
+    }
+
+
+def _remove_conflict(env_path: str, conflict: Dict[str, str]) -> Tuple[bool, Dict[str, Any]]:
+    """
+    Remove the conflicting package.
+
+    Args:
+        env_path: Path to the virtual environment
+        conflict: Parsed conflict information
+
+    Returns:
+        Tuple[bool, Dict[str, Any]]: Success status and resolved or failed entry
+    """
+    success, message = uninstall_package(env_path, conflict['actual_package'])
+
+    if success:
+        return True, {
+            "package": conflict['actual_package'],
+            "action": "removed",
+            "version": conflict['actual_version']
+        }
+    return False, {
+        "package": conflict['actual_package'],
+        "action": "remove",
+        "error": message
+    }
+
+
+# Resolution functions by strategy name, applied one conflict at a time;
+# upgrades are batched in _upgrade_conflicts instead
+_RESOLUTION_STRATEGIES = {
+    "downgrade": _downgrade_conflict,
+    "remove": _remove_conflict
+}
+
 
 def resolve_dependency_conflicts(
     env_path: str,
@@ -127,11 +569,7 @@ def resolve_dependency_conflicts(
     # Parse conflicts to extract package information
     conflict_info = []
     for conflict in conflicts:
-        # Example conflict: "package1 1.0.0 has requirement package2>=2.0.0, but you have package2 1.0.0."
-        match = re.match(
-            r"([a-zA-Z0-9_.-]+)\s+([a-zA-Z0-9_.-]+)\s+has requirement\s+([a-zA-Z0-9_.-]+)([>=<~!]+)([a-zA-Z0-9_.-]+),\s+but you have\s+([a-zA-Z0-9_.-]+)\s+([a-zA-Z0-9_.-]+)",
-            conflict
-        )
+        match = _CONFLICT_RE.match(conflict)
 
         if match:
             pkg1_name, pkg1_version, pkg2_name, operator, required_version, actual_pkg_name, actual_version = match.groups()
@@ -145,78 +583,35 @@ def resolve_dependency_conflicts(
                 "actual_version": actual_version
             })
 
-    # Apply resolution strategy
-    resolved = []
-    failed = []
+    # One action per package; a later conflict on the same package replaces an
+    # earlier one, as it would have when the actions ran one after another
+    actions: Dict[str, Dict[str, str]] = {}
+    if strategy == "upgrade" or strategy in _RESOLUTION_STRATEGIES:
+        target_key = "dependent_package" if strategy == "downgrade" else "actual_package"
+        for info in conflict_info:
+            actions[info[target_key]] = info
+
+    # Apply resolution strategy; pip must not run concurrently on the same
+    # environment, so upgrades share one pip run and other actions run in turn
+    resolved: List[Dict[str, Any]] = []
+    failed: List[Dict[str, Any]] = []
 
-    for conflict in conflict_info:
+    if actions:
         if strategy == "upgrade":
-            # Upgrade the conflicting package to meet the requirement
-            package_spec = f"{conflict['actual_package']}{conflict['required_operator']}{conflict['required_version']}"
-            success, message = install_package(env_path, package_spec, upgrade=True)
-
-            if success:
-                resolved.append({
-                    "package": conflict['actual_package'],
-                    "action": "upgraded",
-                    "from_version": conflict['actual_version'],
-                    "to_spec": package_spec
-                })
-            else:
-                failed.append({
-                    "package": conflict['actual_package'],
-                    "action": "upgrade",
-                    "error": message
-                })
+            resolved, failed = _upgrade_conflicts(env_path, list(actions.values()))
+        else:
+            resolve_conflict = _RESOLUTION_STRATEGIES[strategy]
 
-        elif strategy == "downgrade":
-            # Downgrade the dependent package to a version that doesn't have the conflict
-            success, pkg_info = get_package_info(env_path, conflict['dependent_package'])
-
-            if success:
-                # Uninstall and reinstall an earlier version
-                uninstall_package(env_path, conflict['dependent_package'])
-
-                # Try to find an earlier version
-                package_spec = f"{conflict['dependent_package']}<{conflict['dependent_version']}"
-                install_success, install_message = install_package(env_path, package_spec)
-
-                if install_success:
-                    resolved.append({
-                        "package": conflict['dependent_package'],
-                        "action": "downgraded",
-                        "from_version": conflict['dependent_version'],
-                        "to_spec": package_spec
-                    })
-                else:
-                    failed.append({
-                        "package": conflict['dependent_package'],
-                        "action": "downgrade",
-                        "error": install_message
-                    })
-            else:
-                failed.append({
-                    "package": conflict['dependent_package'],
-                    "action": "downgrade",
-                    "error": "Failed to get package information"
-                })
+            for info in actions.values():
+                success, outcome = resolve_conflict(env_path, info)
 
-        elif strategy == "remove":
-            # Remove the conflicting package
-            success, message = uninstall_package(env_path, conflict['actual_package'])
+                if success:
+                    resolved.append(outcome)
+                else:
+                    failed.append(outcome)
 
-            if success:
-                resolved.append({
-                    "package": conflict['actual_package'],
-                    "action": "removed",
-                    "version": conflict['actual_version']
-                })
-            else:
-                failed.append({
-                    "package": conflict['actual_package'],
-                    "action": "remove",
-                    "error": message
-                })
+        # Packages were installed or removed, so memoized graphs are out of date
+        invalidate_cache()
 
     # Check if all conflicts were resolved
     if not failed:
@@ -235,6 +630,134 @@ def resolve_dependency_conflicts(
         }
 
 
+@lru_cache(maxsize=32)
+def _build_dependency_graph_cached(
+    env_path: str,
+    pip_exe: str,
+    root_key: Tuple[str, ...],
+    signature: Optional[str]
+) -> Tuple[Dict[str, Dict[str, Any]], Tuple[str, ...]]:
+    """
+    Build the dependency graph for a set of root packages.
+
+    Results are memoized per environment signature, so a changed environment
+    is never served a stale graph. The graph is frozen (dependency lists are
+    tuples) because it is shared between callers; build_dependency_graph
+    returns copies.
+
+    Args:
+        env_path: Path to the virtual environment
+        pip_exe: Path to the pip executable of the virtual environment
+        root_key: Lowercase root package names (empty for all packages)
+        signature: Environment signature, or None if it could not be computed
+
+    Returns:
+        Tuple[Dict[str, Dict[str, Any]], Tuple[str, ...]]: Graph and root packages
+
+    Raises:
+        subprocess.CalledProcessError: If pip fails
+        json.JSONDecodeError: If the pip list output cannot be parsed
+    """
+    # Reuse the package information recorded for this environment state
+    cached = _RESOLVE_INDEX.get(signature) if signature else None
+
+    if cached and "packages" in cached:
+        installed_package_names = cached["installed"]
+        package_infos = cached["packages"]
+    else:
+        # Read the installed metadata in-process, and only ask pip if that
+        # is not possible
+        package_infos = get_all_package_info_from_metadata(env_path)
+
+        if package_infos is not None:
+            installed_package_names = sorted(package_infos)
+        else:
+            result = subprocess.run(
+                [pip_exe, "list", "--format=json"],
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                **_PIPE_SIZE_KWARGS
+            )
+
+            # Parse the JSON output, with orjson when available
+            if ORJSON_AVAILABLE:
+                installed_packages = orjson.loads(result.stdout)
+            else:
+                installed_packages = json.loads(result.stdout)
+            installed_package_names = [pkg["name"].lower() for pkg in installed_packages]
+
+            # Get information for all installed packages with a single pip show
+            package_infos = {}
+            if installed_package_names:
+                result = subprocess.run(
+                    [pip_exe, "show"] + installed_package_names,
+                    check=True,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    **_PIPE_SIZE_KWARGS
+                )
+                package_infos = _parse_pip_show_output(result.stdout)
+
+        if signature:
+            _RESOLVE_INDEX.put(signature, installed=installed_package_names, packages=package_infos)
+
+    # If no root packages specified, use all installed packages
+    if not root_key:
+        root_packages = tuple(installed_package_names)
+    else:
+        # Filter out packages that are not installed
+        installed_set = set(installed_package_names)
+        root_packages = tuple(pkg for pkg in root_key if pkg in installed_set)
+
+    # Build dependency graph from the packages reachable from the roots
+    graph = {}
+    pending = list(reversed(root_packages))
+
+    while pending:
+        package_name = pending.pop()
+        if package_name in graph:
+            continue
+
+        pkg_info = package_infos.get(package_name)
+        if pkg_info is None:
+            logger.warning(f"Failed to get information for package: {package_name}")
+            continue
+
+        # Extract package names from the dependency specifications once, so
+        # the graph searches can use them directly
+        dependencies = tuple(pkg_info.get("requires", []))
+        dep_names = tuple(
+            sys.intern(_spec_name(dep)) for dep in dependencies
+        )
+
+        # Add package to graph
+        graph[package_name] = {
+            "name": package_name,
+            "version": pkg_info.get("version", "unknown"),
+            "dependencies": dependencies,
+            "dependents": tuple(pkg_info.get("required_by", [])),
+            "dep_names": dep_names
+        }
+
+        # Process dependencies, in order
+        for dep_name in reversed(dep_names):
+            if dep_name in package_infos and dep_name not in graph:
+                pending.append(dep_name)
+
+    return graph, root_packages
+
+
+def invalidate_cache() -> None:
+    """
+    Discard the dependency graphs and conflict checks memoized in this process.
+    """
+    _build_dependency_graph_cached.cache_clear()
+    _check_dependency_conflicts_cached.cache_clear()
+
+
 def build_dependency_graph(
     env_path: str,
     root_packages: Optional[List[str]] = None
@@ -252,78 +775,30 @@ def build_dependency_graph(
     logger.info("Building dependency graph")
 
     # Determine the pip executable in the virtual environment
-    if platform.system() == "Windows":
-        pip_exe = os.path.join(env_path, "Scripts", "pip.exe")
-    else:
-        pip_exe = os.path.join(env_path, "bin", "pip")
+    pip_exe, pip_found = resolve_pip_exe(env_path)
 
-    if not os.path.exists(pip_exe):
+    if not pip_found:
         logger.error(f"Pip executable not found at {pip_exe}")
         return False, {"error": f"Pip executable not found at {pip_exe}"}
 
-    # Get list of installed packages
-    try:
-        result = subprocess.run(
-            [pip_exe, "list", "--format=json"],
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-
-        import json
-        installed_packages = json.loads(result.stdout)
-        installed_package_names = [pkg["name"].lower() for pkg in installed_packages]
+    root_key = tuple(pkg.lower() for pkg in root_packages or ())
+    signature = _environment_signature(env_path)
 
-        # If no root packages specified, use all installed packages
-        if not root_packages:
-            root_packages = installed_package_names
+    try:
+        if signature:
+            frozen_graph, resolved_roots = _build_dependency_graph_cached(
+                env_path, pip_exe, root_key, signature
+            )
         else:
-            root_packages = [pkg.lower() for pkg in root_packages]
-            # Filter out packages that are not installed
-            root_packages = [pkg for pkg in root_packages if pkg in installed_package_names]
-
-        # Build dependency graph
-        graph = {}
-        visited = set()
-
-        def build_graph_recursive(package_name):
-            if package_name in visited:
-                return
-
-            visited.add(package_name)
-
-            # Get package information
-            success, pkg_info = get_package_info(env_path, package_name)
-
-            if success:
-                # Add package to graph
-                graph[package_name] = {
-                    "name": package_name,
-                    "version": pkg_info.get("version", "unknown"),
-                    "dependencies": pkg_info.get("requires", []),
-                    "dependents": pkg_info.get("required_by", [])
-                }
-
-                # Recursively process dependencies
-                for dep in pkg_info.get("requires", []):
-                    # Extract package name from dependency specification
-                    dep_name = re.split(r'[<>=!~]', dep)[0].strip().lower()
-                    if dep_name in installed_package_names:
-                        build_graph_recursive(dep_name)
-            else:
-                logger.warning(f"Failed to get information for package: {package_name}")
-
-        # Build graph starting from root packages
-        for package in root_packages:
-            build_graph_recursive(package)
-
-        logger.info(f"Successfully built dependency graph with {len(graph)} packages")
-        return True, {
-            "graph": graph,
-            "root_packages": root_packages,
-            "package_count": len(graph)
-        }
+            # Without a signature the environment state is unknown, so do not memoize
+            frozen_graph, resolved_roots = _build_dependency_graph_cached.__wrapped__(
+                env_path, pip_exe, root_key, signature
+            )
+    except FileNotFoundError:
+        # The environment was removed after pip was last found
+        forget_pip_exe(env_path)
+        logger.error(f"Pip executable not found at {pip_exe}")
+        return False, {"error": f"Pip executable not found at {pip_exe}"}
     except subprocess.CalledProcessError as e:
         error_msg = e.stderr if hasattr(e, 'stderr') else str(e)
         logger.error(f"Failed to build dependency graph: {error_msg}")
@@ -332,6 +807,41 @@ def build_dependency_graph(
         logger.error(f"Failed to parse pip list output: {str(e)}")
         return False, {"error": f"Failed to parse pip list output: {str(e)}"}
 
+    # Copy the shared graph so callers may modify the result
+    graph = {
+        name: {
+            **node,
+            "dependencies": list(node["dependencies"]),
+            "dependents": list(node["dependents"]),
+            "dep_names": list(node["dep_names"])
+        }
+        for name, node in frozen_graph.items()
+    }
+
+    logger.info(f"Successfully built dependency graph with {len(graph)} packages")
+    return True, {
+        "graph": graph,
+        "root_packages": list(resolved_roots),
+        "package_count": len(graph)
+    }
+
+
+def _dependency_names(node: Dict[str, Any]) -> List[str]:
+    """
+    Get the normalized dependency names of a graph node.
+
+    Args:
+        node: Package entry of a dependency graph
+
+    Returns:
+        List[str]: Lowercase names of the package's dependencies
+    """
+    dep_names = node.get("dep_names")
+    if dep_names is None:
+        # Graphs not built by build_dependency_graph only carry the specifications
+        dep_names = [_spec_name(dep_spec) for dep_spec in node.get("dependencies", [])]
+    return dep_names
+
 
 def find_dependency_path(
     env_path: str,
@@ -370,15 +880,23 @@ def find_dependency_path(
         logger.error(f"Package not found in graph: {to_package}")
         return False, {"error": f"Package not found in graph: {to_package}"}
 
-    # Breadth-first search to find the shortest path
-    queue = [(from_package, [from_package])]
-    visited = {from_package}
+    # Breadth-first search to find the shortest path, recording each
+    # package's predecessor instead of copying the path at every step
+    queue = deque([from_package])
+    parent: Dict[str, Optional[str]] = {from_package: None}
 
     while queue:
-        current, path = queue.pop(0)
+        current = queue.popleft()
 
         # Check if we've reached the target
         if current == to_package:
+            path = []
+            step: Optional[str] = current
+            while step is not None:
+                path.append(step)
+                step = parent[step]
+            path.reverse()
+
             logger.info(f"Found dependency path: {' -> '.join(path)}")
 
             # Build detailed path with version information
@@ -397,13 +915,10 @@ def find_dependency_path(
             }
 
         # Add dependencies to the queue
-        for dep_spec in graph[current]["dependencies"]:
-            # Extract package name from dependency specification
-            dep_name = re.split(r'[<>=!~]', dep_spec)[0].strip().lower()
-
-            if dep_name in graph and dep_name not in visited:
-                visited.add(dep_name)
-                queue.append((dep_name, path + [dep_name]))
+        for dep_name in _dependency_names(graph[current]):
+            if dep_name in graph and dep_name not in parent:
+                parent[dep_name] = current
+                queue.append(dep_name)
 
     logger.info(f"No dependency path found from {from_package} to {to_package}")
     return True, {
@@ -416,6 +931,10 @@ def find_circular_dependencies(env_path: str) -> Tuple[bool, Dict[str, Any]]:
     """
     Find circular dependencies in the installed packages.
 
+    Each circular dependency is reported once, as the list of packages in one
+    strongly connected component of the dependency graph (a package that
+    depends on itself forms a component on its own).
+
     Args:
         env_path: Path to the virtual environment
 
@@ -432,53 +951,62 @@ def find_circular_dependencies(env_path: str) -> Tuple[bool, Dict[str, Any]]:
 
     graph = graph_info["graph"]
 
-    # Find circular dependencies using depth-first search
-    circular_deps = []
-    visited = set()
-    path = []
-    path_set = set()
-
-    def dfs(package):
-        if package in path_set:
-            # Found a cycle
-            cycle_start = path.index(package)
-            cycle = path[cycle_start:] + [package]
-            circular_deps.append(cycle)
-            return
-
-        if package in visited:
-            return
-
-        visited.add(package)
-        path.append(package)
-        path_set.add(package)
-
-        for dep_spec in graph.get(package, {}).get("dependencies", []):
-            # Extract package name from dependency specification
-            dep_name = re.split(r'[<>=!~]', dep_spec)[0].strip().lower()
+    # Resolve dependency names once, keeping only packages in the graph
+    adjacency: Dict[str, List[str]] = {}
+    for package, node in graph.items():
+        adjacency[package] = [dep_name for dep_name in _dependency_names(node) if dep_name in graph]
 
-            if dep_name in graph:
-                dfs(dep_name)
-
-        path.pop()
-        path_set.remove(package)
-
-    # Run DFS from each package
-    for package in graph:
-        dfs(package)
-
-    # Remove duplicate cycles (same cycle starting from different points)
-    unique_cycles = []
-    cycle_sets = []
-
-    for cycle in circular_deps:
-        cycle_set = frozenset(cycle)
-        if cycle_set not in cycle_sets:
-            cycle_sets.append(cycle_set)
-            unique_cycles.append(cycle)
-
-    logger.info(f"Found {len(unique_cycles)} circular dependencies")
+    # Find strongly connected components with an iterative Tarjan's algorithm
+    circular_deps = []
+    index: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    stack: List[str] = []
+    on_stack: Set[str] = set()
+
+    for root in adjacency:
+        if root in index:
+            continue
+
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(adjacency[root]))]
+
+        while work:
+            package, dependencies = work[-1]
+
+            for dep_name in dependencies:
+                if dep_name not in index:
+                    # Descend into the dependency
+                    index[dep_name] = lowlink[dep_name] = len(index)
+                    stack.append(dep_name)
+                    on_stack.add(dep_name)
+                    work.append((dep_name, iter(adjacency[dep_name])))
+                    break
+                if dep_name in on_stack:
+                    lowlink[package] = min(lowlink[package], index[dep_name])
+            else:
+                # All dependencies visited
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[package])
+
+                if lowlink[package] == index[package]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.remove(member)
+                        component.append(member)
+                        if member == package:
+                            break
+
+                    if len(component) > 1 or package in adjacency[package]:
+                        component.reverse()
+                        circular_deps.append(component)
+
+    logger.info(f"Found {len(circular_deps)} circular dependencies")
     return True, {
-        "circular_dependencies": unique_cycles,
-        "count": len(unique_cycles)
+        "circular_dependencies": circular_deps,
+        "count": len(circular_deps)
     }
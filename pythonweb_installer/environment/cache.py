@@ -0,0 +1,68 @@
+"""
+Short-lived cache of environment validation results.
+
+Validation functions composed by callers would otherwise rerun the same
+subprocesses against an unchanged environment. Anything that changes an
+environment calls clear_validation_cache so the next validation sees it.
+"""
+import os
+import threading
+import time
+from typing import Tuple, Dict, Any, Optional
+
+# Cached results expire after this many seconds
+_VALIDATION_CACHE_TTL = 2.0
+_VALIDATION_CACHE: Dict[Tuple[str, str, bool], Tuple[float, Any]] = {}
+_VALIDATION_CACHE_LOCK = threading.Lock()
+
+
+def cache_get(key: Tuple[str, str, bool]) -> Any:
+    """
+    Get an unexpired entry from the validation cache.
+    
+    Args:
+        key: Cache key
+        
+    Returns:
+        Any: Cached value, or None if missing or expired
+    """
+    with _VALIDATION_CACHE_LOCK:
+        entry = _VALIDATION_CACHE.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del _VALIDATION_CACHE[key]
+            return None
+        return entry[1]
+
+
+def cache_put(key: Tuple[str, str, bool], value: Any) -> None:
+    """
+    Store an entry in the validation cache.
+    
+    Args:
+        key: Cache key
+        value: Value to cache
+    """
+    with _VALIDATION_CACHE_LOCK:
+        _VALIDATION_CACHE[key] = (time.monotonic() + _VALIDATION_CACHE_TTL, value)
+
+
+def clear_validation_cache(env_path: Optional[str] = None) -> None:
+    """
+    Clear cached validation results.
+    
+    Call this after installing, removing or repairing anything in a virtual
+    environment so the next validation sees the change.
+    
+    Args:
+        env_path: Path to the virtual environment to clear, or None to clear all
+    """
+    with _VALIDATION_CACHE_LOCK:
+        if env_path is None:
+            _VALIDATION_CACHE.clear()
+            return
+        
+        abs_path = os.path.abspath(env_path)
+        for key in [key for key in _VALIDATION_CACHE if key[1] == abs_path]:
+            del _VALIDATION_CACHE[key]
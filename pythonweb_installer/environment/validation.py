@@ -6,12 +6,24 @@ import sys
 import logging
 import platform
 import subprocess
+from functools import lru_cache
 from typing import Tuple, Dict, Any, List, Optional
 
 from pythonweb_installer.environment.virtualenv import list_installed_packages
+from pythonweb_installer.environment.cache import cache_get, cache_put, clear_validation_cache
+from pythonweb_installer.dependencies.metadata import list_installed_packages_from_metadata
 
 logger = logging.getLogger(__name__)
 
+_IS_WINDOWS = platform.system() == "Windows"
+
+# Layout of executables inside a virtual environment
+_BIN_DIR = "Scripts" if _IS_WINDOWS else "bin"
+_PY_EXE_NAME = "python.exe" if _IS_WINDOWS else "python"
+_PIP_EXE_NAME = "pip.exe" if _IS_WINDOWS else "pip"
+
+_CURRENT_VERSION = tuple(sys.version_info[:3])
+
 
 def validate_python_version(
     min_version: str = "3.7",
@@ -30,26 +42,13 @@ def validate_python_version(
     logger.info(f"Validating Python version (min: {min_version}, max: {max_version or 'none'})")
     
     # Get current Python version
-    current_version = f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
-    
-    # Parse version strings
-    min_parts = list(map(int, min_version.split('.')))
-    while len(min_parts) < 3:
-        min_parts.append(0)
-    
-    current_parts = [sys.version_info.major, sys.version_info.minor, sys.version_info.micro]
-    
-    max_parts = None
-    if max_version:
-        max_parts = list(map(int, max_version.split('.')))
-        while len(max_parts) < 3:
-            max_parts.append(0)
+    current_version = ".".join(map(str, _CURRENT_VERSION))
     
     # Compare versions
-    meets_min = current_parts >= min_parts
+    meets_min = _CURRENT_VERSION >= _parse_version(min_version)
     meets_max = True
-    if max_parts:
-        meets_max = current_parts <= max_parts
+    if max_version:
+        meets_max = _CURRENT_VERSION <= _parse_version(max_version)
     
     valid = meets_min and meets_max
     
@@ -70,12 +69,82 @@ def validate_python_version(
     return valid, result
 
 
-def validate_virtual_environment(env_path: str) -> Tuple[bool, Dict[str, Any]]:
+def _venv_paths(env_path: str) -> Tuple[str, str, str, str]:
+    """
+    Build the paths of a virtual environment's layout.
+    
+    Args:
+        env_path: Path to the virtual environment
+        
+    Returns:
+        Tuple[str, str, str, str]: Executables directory, Python executable,
+        pip executable and pyvenv.cfg paths
+    """
+    bin_dir = os.path.join(env_path, _BIN_DIR)
+    return (
+        bin_dir,
+        bin_dir + os.sep + _PY_EXE_NAME,
+        bin_dir + os.sep + _PIP_EXE_NAME,
+        os.path.join(env_path, "pyvenv.cfg"),
+    )
+
+
+@lru_cache(maxsize=128)
+def _parse_version(version: str) -> Tuple[int, ...]:
+    """
+    Parse a dotted version string into a tuple padded to three components.
+    
+    Args:
+        version: Version string such as "3.7"
+        
+    Returns:
+        Tuple[int, ...]: Version components
+    """
+    parts = tuple(map(int, version.split('.')))
+    return parts + (0,) * (3 - len(parts))
+
+
+def validate_virtual_environment(
+    env_path: str,
+    fetch_version: bool = True
+) -> Tuple[bool, Dict[str, Any]]:
     """
     Validate that a directory is a valid virtual environment.
     
+    Results are reused for a couple of seconds; call clear_validation_cache
+    after changing the environment.
+    
+    Args:
+        env_path: Path to the virtual environment
+        fetch_version: Whether to run the environment's Python to fill in
+            python_version
+        
+    Returns:
+        Tuple[bool, Dict[str, Any]]: Success status and validation information
+    """
+    key = ("venv", os.path.abspath(env_path), fetch_version)
+    cached = cache_get(key)
+    if cached is None:
+        cached = _validate_virtual_environment(env_path, fetch_version)
+        cache_put(key, cached)
+    else:
+        logger.debug(f"Using cached validation of virtual environment at {env_path}")
+    
+    valid, result = cached
+    return valid, dict(result)
+
+
+def _validate_virtual_environment(
+    env_path: str,
+    fetch_version: bool
+) -> Tuple[bool, Dict[str, Any]]:
+    """
+    Validate that a directory is a valid virtual environment, without caching.
+    
     Args:
         env_path: Path to the virtual environment
+        fetch_version: Whether to run the environment's Python to fill in
+            python_version
         
     Returns:
         Tuple[bool, Dict[str, Any]]: Success status and validation information
@@ -99,53 +168,53 @@ def validate_virtual_environment(env_path: str) -> Tuple[bool, Dict[str, Any]]:
     
     result["exists"] = True
     
+    bin_dir, python_exe, pip_exe, pyvenv_cfg_path = _venv_paths(env_path)
+    
     # Check for pyvenv.cfg
-    pyvenv_cfg_path = os.path.join(env_path, "pyvenv.cfg")
-    if not os.path.exists(pyvenv_cfg_path):
+    if not os.path.isfile(pyvenv_cfg_path):
         logger.error(f"pyvenv.cfg not found in {env_path}")
         return False, result
     
     result["has_pyvenv_cfg"] = True
     
-    # Check for Python executable
-    if platform.system() == "Windows":
-        python_exe = os.path.join(env_path, "Scripts", "python.exe")
-    else:
-        python_exe = os.path.join(env_path, "bin", "python")
+    # List the executables directory once to check for both Python and pip
+    try:
+        with os.scandir(bin_dir) as entries:
+            bin_files = {entry.name for entry in entries if entry.is_file()}
+    except OSError:
+        # A missing or unreadable directory means neither executable is usable
+        bin_files = set()
     
-    if not os.path.exists(python_exe):
+    # Check for Python executable
+    if _PY_EXE_NAME not in bin_files:
         logger.error(f"Python executable not found at {python_exe}")
         return False, result
     
     result["has_python_exe"] = True
     
     # Check for pip executable
-    if platform.system() == "Windows":
-        pip_exe = os.path.join(env_path, "Scripts", "pip.exe")
-    else:
-        pip_exe = os.path.join(env_path, "bin", "pip")
-    
-    if not os.path.exists(pip_exe):
+    if _PIP_EXE_NAME not in bin_files:
         logger.warning(f"Pip executable not found at {pip_exe}")
         # Not having pip is not a fatal error
     else:
         result["has_pip_exe"] = True
     
     # Get Python version
-    try:
-        version_cmd = f"{python_exe} --version"
-        version_result = subprocess.run(
-            version_cmd,
-            shell=True,
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        version_output = version_result.stdout.strip() or version_result.stderr.strip()
-        result["python_version"] = version_output
-    except subprocess.CalledProcessError:
-        logger.warning("Could not determine Python version in virtual environment")
+    if fetch_version:
+        try:
+            version_result = subprocess.run(
+                [python_exe, "--version"],
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                close_fds=False
+            )
+            version_output = version_result.stdout.strip() or version_result.stderr.strip()
+            result["python_version"] = version_output
+        except (subprocess.CalledProcessError, OSError):
+            # OSError covers a Python executable that exists but cannot be run
+            logger.warning("Could not determine Python version in virtual environment")
     
     # Environment is valid if it has pyvenv.cfg and a Python executable
     result["valid"] = result["has_pyvenv_cfg"] and result["has_python_exe"]
@@ -182,9 +251,15 @@ def validate_dependencies(
         "installed_packages": [],
     }
     
+    # Nothing to check, so there is no need to list installed packages
+    if not required_packages:
+        logger.info("No required packages to validate")
+        result["valid"] = True
+        return True, result
+    
     # Get installed packages
-    success, installed_packages = list_installed_packages(env_path)
-    if not success:
+    installed_packages = _get_installed_packages(env_path)
+    if installed_packages is None:
         logger.error("Failed to list installed packages")
         return False, result
     
@@ -225,6 +300,36 @@ def validate_dependencies(
     return result["valid"], result
 
 
+def _get_installed_packages(env_path: str) -> Optional[List[Dict[str, str]]]:
+    """
+    List installed packages from the metadata files, falling back to pip list.
+    
+    Results are reused for a couple of seconds; call clear_validation_cache
+    after changing the environment.
+    
+    Args:
+        env_path: Path to the virtual environment
+        
+    Returns:
+        Optional[List[Dict[str, str]]]: Installed packages, or None if they could
+        not be listed
+    """
+    key = ("packages", os.path.abspath(env_path), False)
+    installed_packages = cache_get(key)
+    if installed_packages is not None:
+        logger.debug(f"Using cached package list of virtual environment at {env_path}")
+        return [dict(package) for package in installed_packages]
+    
+    installed_packages = list_installed_packages_from_metadata(env_path)
+    if installed_packages is None:
+        success, installed_packages = list_installed_packages(env_path)
+        if not success:
+            return None
+    
+    cache_put(key, installed_packages)
+    return [dict(package) for package in installed_packages]
+
+
 def repair_virtual_environment(env_path: str) -> Tuple[bool, str]:
     """
     Attempt to repair a virtual environment.
@@ -238,7 +343,7 @@ def repair_virtual_environment(env_path: str) -> Tuple[bool, str]:
     logger.info(f"Attempting to repair virtual environment at {env_path}")
     
     # Validate the environment first
-    valid, validation_result = validate_virtual_environment(env_path)
+    valid, validation_result = validate_virtual_environment(env_path, fetch_version=False)
     if valid:
         logger.info("Virtual environment is already valid, no repair needed")
         return True, "Virtual environment is already valid, no repair needed"
@@ -253,29 +358,31 @@ def repair_virtual_environment(env_path: str) -> Tuple[bool, str]:
         logger.info("Attempting to install pip")
         
         # Determine the Python executable in the virtual environment
-        if platform.system() == "Windows":
-            python_exe = os.path.join(env_path, "Scripts", "python.exe")
-        else:
-            python_exe = os.path.join(env_path, "bin", "python")
+        _, python_exe, _, _ = _venv_paths(env_path)
         
         try:
-            # Download get-pip.py
+            # Only stderr is read, to report failures
             subprocess.run(
-                f"{python_exe} -m ensurepip",
-                shell=True,
+                [python_exe, "-m", "ensurepip"],
                 check=True,
-                stdout=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
                 stderr=subprocess.PIPE,
-                text=True
+                text=True,
+                close_fds=False
             )
             logger.info("Successfully installed pip")
         except subprocess.CalledProcessError as e:
             error_msg = e.stderr if hasattr(e, 'stderr') else str(e)
             logger.error(f"Failed to install pip: {error_msg}")
             return False, f"Failed to install pip: {error_msg}"
+        except OSError as e:
+            logger.error(f"Failed to install pip: {str(e)}")
+            return False, f"Failed to install pip: {str(e)}"
+        finally:
+            clear_validation_cache(env_path)
     
     # Validate again after repair attempts
-    valid, validation_result = validate_virtual_environment(env_path)
+    valid, validation_result = validate_virtual_environment(env_path, fetch_version=False)
     if valid:
         logger.info("Successfully repaired virtual environment")
         return True, "Successfully repaired virtual environment"
@@ -286,7 +393,8 @@ def repair_virtual_environment(env_path: str) -> Tuple[bool, str]:
 
 def install_missing_dependencies(
     env_path: str,
-    required_packages: List[Dict[str, str]]
+    required_packages: List[Dict[str, str]],
+    verify: bool = False
 ) -> Tuple[bool, Dict[str, Any]]:
     """
     Install missing dependencies in the virtual environment.
@@ -294,6 +402,8 @@ def install_missing_dependencies(
     Args:
         env_path: Path to the virtual environment
         required_packages: List of required packages with name and version
+        verify: Whether to list installed packages again after installing
+            instead of trusting pip's exit status
         
     Returns:
         Tuple[bool, Dict[str, Any]]: Success status and installation information
@@ -307,10 +417,7 @@ def install_missing_dependencies(
         return True, {"message": "All dependencies are already installed"}
     
     # Determine the pip executable in the virtual environment
-    if platform.system() == "Windows":
-        pip_exe = os.path.join(env_path, "Scripts", "pip.exe")
-    else:
-        pip_exe = os.path.join(env_path, "bin", "pip")
+    _, _, pip_exe, _ = _venv_paths(env_path)
     
     if not os.path.exists(pip_exe):
         logger.error(f"Pip executable not found at {pip_exe}")
@@ -320,73 +427,44 @@ def install_missing_dependencies(
     missing_packages = validation_result["missing_packages"]
     version_mismatches = validation_result["version_mismatches"]
     
-    result = {
+    result: Dict[str, Any] = {
         "success": True,
         "installed": [],
         "failed": [],
         "upgraded": [],
     }
     
-    # Install missing packages
-    for pkg in missing_packages:
-        pkg_name = pkg["name"]
-        pkg_version = pkg.get("version", "")
-        pkg_spec = f"{pkg_name}{f'=={pkg_version}' if pkg_version else ''}"
-        
-        logger.info(f"Installing {pkg_spec}")
-        try:
-            install_cmd = f"{pip_exe} install {pkg_spec}"
-            subprocess.run(
-                install_cmd,
-                shell=True,
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            result["installed"].append(pkg)
-            logger.info(f"Successfully installed {pkg_spec}")
-        except subprocess.CalledProcessError as e:
-            error_msg = e.stderr if hasattr(e, 'stderr') else str(e)
-            logger.error(f"Failed to install {pkg_spec}: {error_msg}")
-            result["failed"].append({
-                "name": pkg_name,
-                "version": pkg_version,
-                "error": error_msg,
-            })
-            result["success"] = False
+    # Install missing packages with a single pip command
+    if missing_packages:
+        installed, failed = _install_package_group(
+            pip_exe,
+            [(pkg, pkg["name"], pkg.get("version", "")) for pkg in missing_packages],
+            upgrade=False
+        )
+        result["installed"].extend(installed)
+        result["failed"].extend(failed)
+    
+    # Upgrade packages with version mismatches with a single pip command
+    if version_mismatches:
+        upgraded, failed = _install_package_group(
+            pip_exe,
+            [(pkg, pkg["name"], pkg["required_version"]) for pkg in version_mismatches],
+            upgrade=True
+        )
+        result["upgraded"].extend(upgraded)
+        result["failed"].extend(failed)
     
-    # Upgrade packages with version mismatches
-    for pkg in version_mismatches:
-        pkg_name = pkg["name"]
-        pkg_version = pkg["required_version"]
-        pkg_spec = f"{pkg_name}=={pkg_version}"
-        
-        logger.info(f"Upgrading {pkg_name} to {pkg_version}")
-        try:
-            upgrade_cmd = f"{pip_exe} install --upgrade {pkg_spec}"
-            subprocess.run(
-                upgrade_cmd,
-                shell=True,
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            result["upgraded"].append(pkg)
-            logger.info(f"Successfully upgraded {pkg_name} to {pkg_version}")
-        except subprocess.CalledProcessError as e:
-            error_msg = e.stderr if hasattr(e, 'stderr') else str(e)
-            logger.error(f"Failed to upgrade {pkg_name} to {pkg_version}: {error_msg}")
-            result["failed"].append({
-                "name": pkg_name,
-                "version": pkg_version,
-                "error": error_msg,
-            })
-            result["success"] = False
+    # The installed packages have changed
+    clear_validation_cache(env_path)
     
-    # Validate dependencies again after installation
-    valid, _ = validate_dependencies(env_path, required_packages)
+    if result["failed"]:
+        result["success"] = False
+    
+    if verify:
+        # Validate dependencies again after installation
+        valid, _ = validate_dependencies(env_path, required_packages)
+    else:
+        valid = result["success"] and not result["failed"]
     result["all_dependencies_valid"] = valid
     
     if result["success"] and valid:
@@ -395,3 +473,81 @@ def install_missing_dependencies(
         logger.error("Failed to install some dependencies")
     
     return result["success"], result
+
+
+def _install_package_group(
+    pip_exe: str,
+    packages: List[Tuple[Dict[str, str], str, str]],
+    upgrade: bool
+) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    """
+    Install a group of packages with one pip command.
+    
+    If the combined command fails, each package is installed on its own so
+    the failure can be attributed to the packages that caused it.
+    
+    Args:
+        pip_exe: Path to the pip executable
+        packages: Tuples of (package entry, name, version); an empty version
+            installs the latest version
+        upgrade: Whether to pass --upgrade to pip
+        
+    Returns:
+        Tuple[List[Dict[str, str]], List[Dict[str, str]]]: Package entries that were
+        installed, and failure entries with name, version and error
+    """
+    base_cmd = [pip_exe, "install", "--upgrade"] if upgrade else [pip_exe, "install"]
+    action = "upgrade" if upgrade else "install"
+    specs = [f"{name}=={version}" if version else name for _, name, version in packages]
+    
+    logger.info(f"Running pip {action} for {', '.join(specs)}")
+    try:
+        subprocess.run(
+            base_cmd + specs,
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            close_fds=False
+        )
+        logger.info(f"Successfully ran pip {action} for {', '.join(specs)}")
+        return [pkg for pkg, _, _ in packages], []
+    except subprocess.CalledProcessError as e:
+        error_msg = e.stderr if hasattr(e, 'stderr') else str(e)
+        if len(packages) == 1:
+            logger.error(f"Failed to {action} {specs[0]}: {error_msg}")
+            pkg, name, version = packages[0]
+            return [], [{"name": name, "version": version, "error": error_msg}]
+        logger.warning(f"pip {action} of {len(specs)} packages failed, retrying one at a time")
+    except OSError as e:
+        # Pip could not be started at all, so retrying each package cannot help
+        logger.error(f"Failed to run pip {action}: {str(e)}")
+        return [], [
+            {"name": name, "version": version, "error": str(e)}
+            for _, name, version in packages
+        ]
+    
+    # Retry each package on its own to find the ones that fail
+    succeeded = []
+    failed = []
+    for (pkg, name, version), spec in zip(packages, specs):
+        try:
+            subprocess.run(
+                base_cmd + [spec],
+                check=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                close_fds=False
+            )
+            succeeded.append(pkg)
+            logger.info(f"Successfully ran pip {action} for {spec}")
+        except subprocess.CalledProcessError as e:
+            error_msg = e.stderr if hasattr(e, 'stderr') else str(e)
+            logger.error(f"Failed to {action} {spec}: {error_msg}")
+            failed.append({"name": name, "version": version, "error": error_msg})
+        except OSError as e:
+            logger.error(f"Failed to {action} {spec}: {str(e)}")
+            failed.append({"name": name, "version": version, "error": str(e)})
+    
+    return succeeded, failed
@@ -3,18 +3,30 @@ Environment variables management functionality.
 """
 import os
 import re
+import sys
 import logging
 import platform
-from typing import Dict, Any, Tuple, List, Optional
+from functools import lru_cache
+from typing import Dict, Any, Tuple, List, Optional, Iterator
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+_IS_WINDOWS = platform.system() == "Windows"
+
+# Patterns used to read and write .env files
+_ENV_LINE_RE = re.compile(r'(?m)^[^\S\n]*([A-Za-z0-9_]+)=(.*)$')
+_QUOTE_RE = re.compile(r'[\s\'"\\]')
+_EXPORT_RE = re.compile(r'(?m)^export ([A-Za-z0-9_]+)="(.*)"$')
+
 
 def load_env_file(file_path: str) -> Tuple[bool, Dict[str, str]]:
     """
     Load environment variables from a .env file.
     
+    The parsed file is reused while its modification time and size are
+    unchanged.
+    
     Args:
         file_path: Path to the .env file
         
@@ -23,38 +35,87 @@ def load_env_file(file_path: str) -> Tuple[bool, Dict[str, str]]:
     """
     logger.info(f"Loading environment variables from {file_path}")
     
-    env_vars = {}
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        # Let the parser report the missing file
+        return _read_env_file(file_path)
     
-    if not os.path.exists(file_path):
-        logger.error(f"Environment file {file_path} does not exist")
-        return False, {}
+    success, pairs = _load_env_file_memoized(
+        os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size
+    )
+    # Return a fresh dict so callers can modify it
+    return success, dict(pairs)
+
+
+@lru_cache(maxsize=256)
+def _load_env_file_memoized(
+    file_path: str,
+    mtime_ns: int,
+    size: int
+) -> Tuple[bool, Tuple[Tuple[str, str], ...]]:
+    """
+    Parse a .env file, memoized on its path, mtime and size.
     
+    Args:
+        file_path: Absolute path to the .env file
+        mtime_ns: Modification time of the file in nanoseconds
+        size: Size of the file in bytes
+        
+    Returns:
+        Tuple[bool, Tuple[Tuple[str, str], ...]]: Success status and
+        (key, value) pairs
+    """
+    success, env_vars = _read_env_file(file_path)
+    return success, tuple(env_vars.items())
+
+
+def _read_env_file(file_path: str) -> Tuple[bool, Dict[str, str]]:
+    """
+    Parse environment variables from a .env file.
+    
+    Args:
+        file_path: Path to the .env file
+        
+    Returns:
+        Tuple[bool, Dict[str, str]]: Success status and environment variables
+    """
     try:
         with open(file_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                
-                # Parse key-value pairs
-                match = re.match(r'^([A-Za-z0-9_]+)=(.*)$', line)
-                if match:
-                    key, value = match.groups()
-                    
-                    # Remove quotes if present
-                    if value and value[0] == value[-1] and value[0] in ('"', "'"):
-                        value = value[1:-1]
-                    
-                    env_vars[key] = value
-                    logger.debug(f"Loaded environment variable: {key}")
+            data = f.read()
+        
+        # Match every KEY=VALUE line in one scan; comment lines never match
+        # because '#' is not allowed in a key
+        env_vars = {
+            key: _strip_quotes(value.rstrip())
+            for key, value in _ENV_LINE_RE.findall(data)
+        }
         
         logger.info(f"Loaded {len(env_vars)} environment variables from {file_path}")
         return True, env_vars
+    except FileNotFoundError:
+        logger.error(f"Environment file {file_path} does not exist")
+        return False, {}
     except Exception as e:
         logger.error(f"Failed to load environment variables: {str(e)}")
         return False, {}
 
 
+def _strip_quotes(value: str) -> str:
+    """
+    Remove matching single or double quotes around a value.
+    
+    Args:
+        value: Raw value from a .env file
+        
+    Returns:
+        str: Value without surrounding quotes
+    """
+    if value and value[0] == value[-1] and value[0] in ('"', "'"):
+        return value[1:-1]
+    return value
+
+
 def save_env_file(file_path: str, env_vars: Dict[str, str], overwrite: bool = False) -> Tuple[bool, str]:
     """
     Save environment variables to a .env file.
@@ -69,29 +130,43 @@ def save_env_file(file_path: str, env_vars: Dict[str, str], overwrite: bool = Fa
     """
     logger.info(f"Saving environment variables to {file_path}")
     
-    if os.path.exists(file_path) and not overwrite:
-        logger.error(f"Environment file {file_path} already exists and overwrite is False")
-        return False, f"Environment file {file_path} already exists"
-    
     try:
         # Create directory if it doesn't exist
         os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
         
-        with open(file_path, 'w') as f:
-            for key, value in env_vars.items():
-                # Add quotes if value contains spaces or special characters
-                if re.search(r'[\s\'"\\]', value):
-                    value = f'"{value}"'
-                
-                f.write(f"{key}={value}\n")
+        # Exclusive create refuses to replace an existing file
+        content = "".join(
+            f"{key}={_format_env_value(value)}\n" for key, value in env_vars.items()
+        )
+        with open(file_path, 'w' if overwrite else 'x') as f:
+            f.write(content)
         
         logger.info(f"Saved {len(env_vars)} environment variables to {file_path}")
         return True, f"Successfully saved environment variables to {file_path}"
+    except FileExistsError:
+        logger.error(f"Environment file {file_path} already exists and overwrite is False")
+        return False, f"Environment file {file_path} already exists"
     except Exception as e:
         logger.error(f"Failed to save environment variables: {str(e)}")
         return False, f"Failed to save environment variables: {str(e)}"
 
 
+def _format_env_value(value: str) -> str:
+    """
+    Format a value for a .env file, quoting it if it contains spaces or
+    special characters.
+    
+    Args:
+        value: Value to format
+        
+    Returns:
+        str: Formatted value
+    """
+    if _QUOTE_RE.search(value):
+        return f'"{value}"'
+    return value
+
+
 def set_environment_variables(env_vars: Dict[str, str], persistent: bool = False) -> Tuple[bool, str]:
     """
     Set environment variables in the current process and optionally make them persistent.
@@ -112,22 +187,47 @@ def set_environment_variables(env_vars: Dict[str, str], persistent: bool = False
     
     # Make variables persistent if requested
     if persistent:
-        if platform.system() == "Windows":
-            # On Windows, use setx command
-            for key, value in env_vars.items():
+        if _IS_WINDOWS:
+            # On Windows, write all variables to the user environment with a
+            # single reg import instead of one setx process per variable
+            import subprocess
+            import tempfile
+            
+            reg_lines = [
+                "Windows Registry Editor Version 5.00",
+                "",
+                "[HKEY_CURRENT_USER\\Environment]",
+            ]
+            reg_lines.extend(
+                f'"{_escape_reg_string(key)}"="{_escape_reg_string(value)}"'
+                for key, value in env_vars.items()
+            )
+            
+            fd, reg_path = tempfile.mkstemp(suffix=".reg")
+            try:
+                # reg import expects UTF-16 with a byte order mark and CRLF line endings
+                with os.fdopen(fd, 'w', encoding='utf-16', newline='\r\n') as f:
+                    f.write("\n".join(reg_lines) + "\n")
+                
+                subprocess.run(
+                    ["reg", "import", reg_path],
+                    check=True,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    close_fds=False
+                )
+            except (OSError, subprocess.CalledProcessError) as e:
+                logger.error(f"Failed to set persistent environment variables: {str(e)}")
+                return False, f"Failed to set persistent environment variables: {str(e)}"
+            finally:
                 try:
-                    import subprocess
-                    subprocess.run(
-                        f'setx {key} "{value}"',
-                        shell=True,
-                        check=True,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        text=True
-                    )
-                except subprocess.CalledProcessError as e:
-                    logger.error(f"Failed to set persistent environment variable {key}: {str(e)}")
-                    return False, f"Failed to set persistent environment variables: {str(e)}"
+                    os.remove(reg_path)
+                except OSError:
+                    pass
+            
+            # Tell running applications that the environment changed, as setx does
+            _broadcast_environment_change()
         else:
             # On Unix-like systems, add to .profile or .bash_profile
             home_dir = os.path.expanduser("~")
@@ -144,10 +244,23 @@ def set_environment_variables(env_vars: Dict[str, str], persistent: bool = False
                 return False, "Could not find a profile file to update"
             
             try:
-                with open(profile_path, 'a') as f:
-                    f.write("\n# Environment variables added by PythonWeb Installer\n")
-                    for key, value in env_vars.items():
-                        f.write(f'export {key}="{value}"\n')
+                with open(profile_path, 'a+') as f:
+                    # Skip variables the profile already exports with the same value,
+                    # so repeated runs do not keep growing the file
+                    f.seek(0)
+                    exported = dict(_EXPORT_RE.findall(f.read()))
+                    lines = [
+                        f'export {key}="{value}"\n'
+                        for key, value in env_vars.items()
+                        if exported.get(key) != value
+                    ]
+                    if lines:
+                        f.write(
+                            "\n# Environment variables added by PythonWeb Installer\n"
+                            + "".join(lines)
+                        )
+                    else:
+                        logger.debug(f"All variables are already exported in {profile_path}")
             except Exception as e:
                 logger.error(f"Failed to update profile file: {str(e)}")
                 return False, f"Failed to update profile file: {str(e)}"
@@ -156,6 +269,47 @@ def set_environment_variables(env_vars: Dict[str, str], persistent: bool = False
     return True, f"Successfully set {len(env_vars)} environment variables"
 
 
+def _escape_reg_string(value: str) -> str:
+    """
+    Escape a string for use inside double quotes in a .reg file.
+    
+    Args:
+        value: String to escape
+        
+    Returns:
+        str: Escaped string
+    """
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _broadcast_environment_change() -> None:
+    """
+    Broadcast WM_SETTINGCHANGE so running applications reload the environment.
+    """
+    if sys.platform != "win32":
+        return
+    
+    try:
+        import ctypes
+        
+        HWND_BROADCAST = 0xFFFF
+        WM_SETTINGCHANGE = 0x001A
+        SMTO_ABORTIFHUNG = 0x0002
+        
+        result = ctypes.c_ulong()
+        ctypes.windll.user32.SendMessageTimeoutW(
+            HWND_BROADCAST,
+            WM_SETTINGCHANGE,
+            0,
+            "Environment",
+            SMTO_ABORTIFHUNG,
+            5000,
+            ctypes.byref(result)
+        )
+    except (AttributeError, OSError) as e:
+        logger.warning(f"Could not broadcast environment change: {str(e)}")
+
+
 def get_environment_variables(prefix: Optional[str] = None) -> Dict[str, str]:
     """
     Get environment variables, optionally filtered by prefix.
@@ -169,7 +323,10 @@ def get_environment_variables(prefix: Optional[str] = None) -> Dict[str, str]:
     logger.info(f"Getting environment variables (prefix: {prefix or 'none'})")
     
     if prefix:
-        env_vars = {k: v for k, v in os.environ.items() if k.startswith(prefix)}
+        # Iterate over keys and look up values only for matches; items() would
+        # decode every value in os.environ
+        environ = os.environ
+        env_vars = {k: environ[k] for k in environ if k.startswith(prefix)}
     else:
         env_vars = dict(os.environ)
     
@@ -197,31 +354,38 @@ def generate_env_file(
     """
     logger.info(f"Generating .env file from template {template_path}")
     
-    if os.path.exists(output_path) and not overwrite:
-        logger.error(f"Output file {output_path} already exists and overwrite is False")
-        return False, f"Output file {output_path} already exists"
-    
-    if not os.path.exists(template_path):
+    try:
+        with open(template_path, 'r') as f:
+            template_content = f.read()
+    except FileNotFoundError:
         logger.error(f"Template file {template_path} does not exist")
         return False, f"Template file {template_path} does not exist"
+    except Exception as e:
+        logger.error(f"Failed to generate .env file: {str(e)}")
+        return False, f"Failed to generate .env file: {str(e)}"
     
     try:
-        with open(template_path, 'r') as f:
-            template_content = f.read()
-        
-        # Replace variables in the template
-        for key, value in variables.items():
-            template_content = template_content.replace(f"${{{key}}}", value)
-            template_content = template_content.replace(f"${key}", value)
+        # Replace ${KEY} and $KEY references in a single pass over the template
+        if variables:
+            names = "|".join(map(re.escape, variables))
+            pattern = re.compile(rf'\$\{{({names})\}}|\$({names})\b')
+            template_content = pattern.sub(
+                lambda match: variables[match.group(1) or match.group(2)],
+                template_content
+            )
         
         # Create directory if it doesn't exist
         os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
         
-        with open(output_path, 'w') as f:
+        # Exclusive create refuses to replace an existing file
+        with open(output_path, 'w' if overwrite else 'x') as f:
             f.write(template_content)
         
         logger.info(f"Successfully generated .env file at {output_path}")
         return True, f"Successfully generated .env file at {output_path}"
+    except FileExistsError:
+        logger.error(f"Output file {output_path} already exists and overwrite is False")
+        return False, f"Output file {output_path} already exists"
     except Exception as e:
         logger.error(f"Failed to generate .env file: {str(e)}")
         return False, f"Failed to generate .env file: {str(e)}"
@@ -240,22 +404,43 @@ def find_env_files(directory: str, recursive: bool = True) -> List[str]:
     """
     logger.info(f"Finding .env files in {directory} (recursive: {recursive})")
     
-    env_files = []
-    
     if recursive:
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if file == ".env" or file.endswith(".env"):
-                    env_files.append(os.path.join(root, file))
+        # Like os.walk, skip directories that cannot be read
+        try:
+            env_files = list(_scan_env_files(directory, recursive))
+        except OSError as e:
+            logger.warning(f"Could not read directory {directory}: {str(e)}")
+            env_files = []
     else:
-        for file in os.listdir(directory):
-            if file == ".env" or file.endswith(".env"):
-                env_files.append(os.path.join(directory, file))
+        env_files = list(_scan_env_files(directory, recursive))
     
     logger.info(f"Found {len(env_files)} .env files")
     return env_files
 
 
+def _scan_env_files(directory: str, recursive: bool) -> Iterator[str]:
+    """
+    Yield paths of .env files in a directory using os.scandir.
+    
+    Args:
+        directory: Directory to search in
+        recursive: Whether to descend into subdirectories (symlinked
+            directories are not followed)
+        
+    Returns:
+        Iterator[str]: Iterator over .env file paths
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.endswith(".env") and entry.is_file():
+                yield entry.path
+            elif recursive and entry.is_dir(follow_symlinks=False):
+                try:
+                    yield from _scan_env_files(entry.path, recursive)
+                except OSError as e:
+                    logger.warning(f"Could not read directory {entry.path}: {str(e)}")
+
+
 def merge_env_files(
     file_paths: List[str],
     output_path: str,
@@ -274,10 +459,6 @@ def merge_env_files(
     """
     logger.info(f"Merging {len(file_paths)} .env files into {output_path}")
     
-    if os.path.exists(output_path) and not overwrite:
-        logger.error(f"Output file {output_path} already exists and overwrite is False")
-        return False, f"Output file {output_path} already exists"
-    
     merged_vars = {}
     
     # Load variables from each file
@@ -288,5 +469,6 @@ def merge_env_files(
         else:
             logger.warning(f"Failed to load environment variables from {file_path}")
     
-    # Save merged variables to output file
+    # Save merged variables to output file; save_env_file refuses to
+    # replace an existing file unless overwrite is set
     return save_env_file(output_path, merged_vars, overwrite=overwrite)
@@ -10,6 +10,7 @@ import platform
 from typing import Tuple, Optional, Dict, Any, List
 
 from pythonweb_installer.utils import run_command
+from pythonweb_installer.environment.cache import clear_validation_cache
 
 logger = logging.getLogger(__name__)
 
@@ -192,6 +193,9 @@ def create_virtual_environment(
         error_msg = e.stderr if hasattr(e, 'stderr') else str(e)
         logger.error(f"Failed to create virtual environment: {error_msg}")
         return False, f"Failed to create virtual environment: {error_msg}"
+    finally:
+        # Validation results cached for the path no longer apply
+        clear_validation_cache(env_path)
 
 
 def get_activation_script(env_path: str) -> Tuple[bool, str]:
@@ -319,6 +323,9 @@ def upgrade_pip(env_path: str) -> Tuple[bool, str]:
         error_msg = e.stderr if hasattr(e, 'stderr') else str(e)
         logger.error(f"Failed to upgrade pip: {error_msg}")
         return False, f"Failed to upgrade pip: {error_msg}"
+    finally:
+        # Pip may have changed the environment even if it failed
+        clear_validation_cache(env_path)
 
 
 def list_installed_packages(env_path: str) -> Tuple[bool, List[Dict[str, str]]]:
@@ -148,6 +148,18 @@ class TestMigrationGenerator:
         assert "INSERT INTO target_table" in content
         assert "DELETE FROM target_table" in content
     
+    def test_generate_migration_content_single_pass(self, migration_generator):
+        """Test that placeholder-like text in values is not substituted again."""
+        content = migration_generator._generate_migration_content(
+            '20220101000000',
+            'Rename {{description}}',
+            'Rename the {{version}} column'
+        )
+        
+        assert "Migration: Rename {{description}}" in content
+        assert "Version: 20220101000000" in content
+        assert "Description: Rename the {{version}} column" in content
+    
     def test_create_migration_generator(self, temp_migrations_dir):
         """Test creating a migration generator."""
         # Create a migration generator
@@ -10,6 +10,7 @@ from unittest.mock import patch, MagicMock
 import pytest
 
 from pythonweb_installer.database.connection import DatabaseConnection
+from pythonweb_installer.database.schema import SchemaManager
 from pythonweb_installer.database.migrations.version import (
     VersionManager,
     create_version_manager,
@@ -83,6 +84,37 @@ class TestVersionManager:
         assert len(index_info) == 1
         assert index_info[0]['name'] == 'version'
 
+    def test_ensure_migrations_table_once_per_connection(self, version_manager):
+        """Test that the migrations table is only looked up once per connection."""
+        with patch.object(version_manager.connection, 'table_exists') as mock_table_exists:
+            VersionManager(version_manager.connection)
+
+            mock_table_exists.assert_not_called()
+
+    def test_ensure_migrations_table_after_reconnect(self):
+        """Test that the migrations table is looked up again on a new connection."""
+        connection = DatabaseConnection('sqlite:///:memory:')
+        connection.connect()
+        VersionManager(connection)
+
+        # A new in-memory database has no migrations table
+        connection.disconnect()
+        connection.connect()
+        VersionManager(connection)
+
+        assert connection.table_exists("migrations") is True
+        connection.disconnect()
+
+    def test_ensure_migrations_table_after_drop(self, version_manager):
+        """Test that dropping the migrations table makes it be created again."""
+        schema_manager = SchemaManager(version_manager.connection)
+        success, _ = schema_manager.drop_table(version_manager.migrations_table)
+        assert success is True
+
+        VersionManager(version_manager.connection)
+
+        assert version_manager.connection.table_exists(version_manager.migrations_table) is True
+
     def test_get_applied_migrations_empty(self, version_manager):
         """Test getting applied migrations when there are none."""
         # Get the applied migrations
@@ -111,6 +143,15 @@ class TestVersionManager:
 
         assert applied is False
 
+    def test_has_any_applied(self, version_manager):
+        """Test checking if any migration is applied."""
+        assert version_manager.has_any_applied() is False
+
+        # Record a migration
+        version_manager.record_migration('20220101000000', 'test_migration', 'Test migration', 1, True)
+
+        assert version_manager.has_any_applied() is True
+
     def test_record_migration(self, version_manager):
         """Test recording a migration."""
         # Record a migration
@@ -157,6 +198,30 @@ class TestVersionManager:
         assert len(migrations) == 2
         assert migrations[1]['batch'] == 2
 
+    def test_get_last_batch_number_cached(self, version_manager):
+        """Test that the last batch number is cached and kept up to date."""
+        version_manager.record_migration('20220101000000', 'test_migration_1', 'Test migration 1', 1, True)
+
+        assert version_manager.get_last_batch_number() == 1
+
+        # Recording a migration updates the cached value without a query
+        with patch.object(version_manager.connection, 'execute',
+                          wraps=version_manager.connection.execute) as mock_execute:
+            version_manager.record_migration('20220102000000', 'test_migration_2', 'Test migration 2', 2, True)
+
+            assert version_manager.get_last_batch_number() == 2
+            assert mock_execute.call_count == 1
+
+        # Removing a migration invalidates the cached value
+        version_manager.remove_migration('20220102000000')
+
+        assert version_manager.get_last_batch_number() == 1
+
+        # Resetting the migrations clears the cached value
+        version_manager.reset_migrations()
+
+        assert version_manager.get_last_batch_number() == 0
+
     def test_remove_migration(self, version_manager):
         """Test removing a migration."""
         # Record a migration
@@ -197,6 +262,26 @@ class TestVersionManager:
         assert len(migrations) == 1
         assert migrations[0]['version'] == '20220103000000'
 
+    def test_get_migrations_in_batches(self, version_manager):
+        """Test getting migrations from several batches at once."""
+        # Record some migrations
+        version_manager.record_migration('20220101000000', 'test_migration_1', 'Test migration 1', 1, True)
+        version_manager.record_migration('20220102000000', 'test_migration_2', 'Test migration 2', 2, True)
+        version_manager.record_migration('20220103000000', 'test_migration_3', 'Test migration 3', 2, True)
+        version_manager.record_migration('20220104000000', 'test_migration_4', 'Test migration 4', 3, True)
+
+        # Get the migrations in batches 2 and 1
+        migrations = version_manager.get_migrations_in_batches([2, 1])
+
+        assert [m['version'] for m in migrations] == [
+            '20220103000000',
+            '20220102000000',
+            '20220101000000'
+        ]
+
+        # No batches means no migrations
+        assert version_manager.get_migrations_in_batches([]) == []
+
     def test_reset_migrations(self, version_manager):
         """Test resetting all migrations."""
         # Record some migrations
@@ -251,6 +336,9 @@ class TestVersionManager:
 
         assert parsed is None
 
+        # Repeated parses are served from the cache
+        assert parse_migration_version('20220101000000') is parse_migration_version('20220101000000')
+
     def test_format_migration_name(self):
         """Test formatting a migration name."""
         # Format a migration name
@@ -264,3 +352,9 @@ class TestVersionManager:
         formatted = format_migration_name(name)
 
         assert formatted == 'create_users__posts_table'
+
+        # Format a migration name with non-ASCII characters
+        name = 'Café  Ünïcode\tTable'
+        formatted = format_migration_name(name)
+
+        assert formatted == 'caf_ncode_table'
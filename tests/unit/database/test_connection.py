@@ -10,7 +10,9 @@ import pytest
 
 from pythonweb_installer.database.connection import (
     DatabaseConnection,
+    ConnectionPool,
     create_connection,
+    create_connection_pool,
     get_connection_string,
     parse_connection_string,
     test_connection
@@ -200,6 +202,80 @@ class TestDatabaseConnection:
         
         connection.disconnect()
     
+    def test_executemany(self, temp_db_path):
+        """Test executing a query for several parameter sets."""
+        connection_string = f'sqlite:///{temp_db_path}'
+        connection = DatabaseConnection(connection_string)
+        
+        # Connect to the database
+        connection.connect()
+        
+        # Create a table
+        connection.execute('CREATE TABLE test (id INTEGER PRIMARY KEY, name TEXT)')
+        
+        # Insert several rows at once
+        success, results = connection.executemany(
+            'INSERT INTO test (id, name) VALUES (?, ?)',
+            [(1, 'test1'), (2, 'test2'), (3, 'test3')]
+        )
+        
+        assert success is True
+        assert results is None
+        
+        # Verify the data was inserted
+        success, results = connection.execute('SELECT * FROM test ORDER BY id')
+        
+        assert success is True
+        assert [row['name'] for row in results] == ['test1', 'test2', 'test3']
+        
+        connection.disconnect()
+    
+    def test_executemany_not_connected(self):
+        """Test executing a query for several parameter sets when not connected."""
+        connection = DatabaseConnection('sqlite:///test.db')
+        
+        success, results = connection.executemany('INSERT INTO test (id) VALUES (?)', [(1,)])
+        
+        assert success is False
+        assert results is None
+    
+    def test_execute_batch(self, temp_db_path):
+        """Test executing several statements in one batch."""
+        connection_string = f'sqlite:///{temp_db_path}'
+        connection = DatabaseConnection(connection_string)
+        
+        # Connect to the database
+        connection.connect()
+        
+        # Create two tables and an index in one batch
+        success, results = connection.execute_batch([
+            'CREATE TABLE test (id INTEGER PRIMARY KEY, name TEXT);',
+            'CREATE TABLE other (id INTEGER PRIMARY KEY)',
+            'CREATE INDEX idx_test_name ON test (name);'
+        ])
+        
+        assert success is True
+        assert results is None
+        assert connection.table_exists('test') is True
+        assert connection.table_exists('other') is True
+        
+        # A failing statement is reported
+        success, results = connection.execute_batch(['CREATE TABLE test (id INTEGER)'])
+        
+        assert success is False
+        assert results is None
+        
+        connection.disconnect()
+    
+    def test_execute_batch_not_connected(self):
+        """Test executing a batch when not connected."""
+        connection = DatabaseConnection('sqlite:///test.db')
+        
+        success, results = connection.execute_batch(['SELECT 1'])
+        
+        assert success is False
+        assert results is None
+    
     def test_execute_not_connected(self):
         """Test executing a query when not connected."""
         connection = DatabaseConnection('sqlite:///test.db')
@@ -565,6 +641,7 @@ class TestDatabaseConnection:
         assert isinstance(connection, DatabaseConnection)
         assert connection.connection is not None
         assert connection.cursor is not None
+        assert connection.shared is False
         
         connection.disconnect()
     
@@ -577,6 +654,58 @@ class TestDatabaseConnection:
         
         assert connection is None
     
+    def test_connection_pool_reuses_connections(self, temp_db_path):
+        """Test that a released connection is handed out again."""
+        pool = create_connection_pool(f'sqlite:///{temp_db_path}', pool_size=2)
+        
+        assert isinstance(pool, ConnectionPool)
+        
+        with pool.acquire() as first:
+            success, _ = first.execute("SELECT 1")
+            assert success is True
+            assert first.shared is True
+        
+        with pool.acquire() as second:
+            assert second is first
+        
+        pool.close()
+        assert first.connection is None
+    
+    def test_connection_pool_exhausted(self, temp_db_path):
+        """Test that checking out more connections than the pool size times out."""
+        pool = ConnectionPool(f'sqlite:///{temp_db_path}', pool_size=1, timeout=0.01)
+        
+        with pool.acquire():
+            with pytest.raises(ConnectionError):
+                with pool.acquire():
+                    pass
+        
+        pool.close()
+    
+    def test_connection_pool_threads(self, temp_db_path):
+        """Test sharing pooled connections between threads."""
+        import threading
+        
+        pool = ConnectionPool(f'sqlite:///{temp_db_path}', pool_size=2)
+        results = []
+        
+        def worker():
+            with pool.acquire() as connection:
+                results.append(connection.execute("SELECT 1 AS value")[0])
+        
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        
+        for thread in threads:
+            thread.start()
+        
+        for thread in threads:
+            thread.join()
+        
+        assert results == [True] * 8
+        assert pool._created <= 2
+        
+        pool.close()
+    
     def test_get_connection_string_sqlite(self):
         """Test getting a SQLite connection string."""
         connection_string = get_connection_string('sqlite', db_path='test.db')
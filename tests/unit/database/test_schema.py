@@ -9,7 +9,7 @@ from unittest.mock import patch, MagicMock
 
 import pytest
 
-from pythonweb_installer.database.connection import DatabaseConnection
+from pythonweb_installer.database.connection import DatabaseConnection, ConnectionPool
 from pythonweb_installer.database.schema import (
     SchemaManager,
     create_schema_manager
@@ -483,6 +483,212 @@ class TestSchemaManager:
         assert users_indexes[0]['columns'] == ["email"]
         assert users_indexes[0]['unique'] is False
     
+    def test_create_schema_dry_run(self, schema_manager):
+        """Test generating the schema script without executing it."""
+        # Define a simple schema
+        schema = {
+            "tables": [
+                {
+                    "name": "users",
+                    "columns": [
+                        {"name": "id", "type": "INTEGER", "primary_key": True},
+                        {"name": "email", "type": "TEXT", "not_null": True}
+                    ],
+                    "indexes": [
+                        {"name": "idx_users_email", "columns": ["email"], "unique": True}
+                    ]
+                }
+            ]
+        }
+        
+        # Generate the schema script
+        success, script = schema_manager.create_schema(schema, dry_run=True)
+        
+        assert success is True
+        assert "CREATE TABLE IF NOT EXISTS users" in script
+        assert "CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email ON users (email);" in script
+        
+        # Verify nothing was created
+        assert schema_manager.connection.table_exists("users") is False
+    
+    def test_generate_create_table_sql_cached(self, schema_manager):
+        """Test that tables with the same columns share the compiled body."""
+        columns = [
+            {"name": "id", "type": "INTEGER", "primary_key": True},
+            {"name": "price", "type": "REAL", "default": 1}
+        ]
+        
+        first = schema_manager._generate_create_table_sql("first", columns)
+        second = schema_manager._generate_create_table_sql("second", columns)
+        
+        assert first.replace("first", "second") == second
+        
+        # Defaults that compare equal but render differently are not mixed up
+        columns[1]["default"] = 1.0
+        third = schema_manager._generate_create_table_sql("third", columns)
+        
+        assert "DEFAULT 1.0" in third
+        
+        # Unhashable defaults are still rendered
+        columns[1]["default"] = [1]
+        fourth = schema_manager._generate_create_table_sql("fourth", columns)
+        
+        assert "DEFAULT [1]" in fourth
+    
+    def test_generate_create_table_sql_default_literals(self, schema_manager):
+        """Test that default values are rendered as SQL literals."""
+        sql = schema_manager._generate_create_table_sql("settings", [
+            {"name": "label", "type": "TEXT", "default": "it's"},
+            {"name": "enabled", "type": "BOOLEAN", "default": True},
+            {"name": "ratio", "type": "REAL", "default": 0.5}
+        ])
+        
+        assert "label TEXT DEFAULT 'it''s'" in sql
+        assert "enabled BOOLEAN DEFAULT 1" in sql
+        assert "ratio REAL DEFAULT 0.5" in sql
+        
+        # The generated SQL is valid
+        success, _ = schema_manager.connection.execute(sql)
+        assert success is True
+    
+    def test_generate_sql_invalid_identifier(self, schema_manager):
+        """Test that names which are not plain identifiers are rejected."""
+        with pytest.raises(ValueError):
+            schema_manager._generate_create_table_sql("users; DROP TABLE x", [
+                {"name": "id", "type": "INTEGER"}
+            ])
+        
+        with pytest.raises(ValueError):
+            schema_manager._generate_create_table_sql("users", [
+                {"name": "id) --", "type": "INTEGER"}
+            ])
+        
+        with pytest.raises(ValueError):
+            schema_manager._generate_create_index_sql("users", "idx users", ["id"])
+        
+        # The public methods report the failure instead of raising
+        success, message = schema_manager.create_table("bad-name", [
+            {"name": "id", "type": "INTEGER"}
+        ])
+        
+        assert success is False
+        assert "Invalid table name" in message
+    
+    def test_create_schema_existing_table(self, schema_manager):
+        """Test that existing tables are skipped while their indexes are created."""
+        schema_manager.connection.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, email TEXT)")
+        schema_manager.connection.commit()
+        
+        schema = {
+            "tables": [
+                {
+                    "name": "users",
+                    "columns": [
+                        {"name": "id", "type": "INTEGER", "primary_key": True},
+                        {"name": "email", "type": "TEXT"}
+                    ],
+                    "indexes": [
+                        {"name": "idx_users_email", "columns": ["email"]}
+                    ]
+                }
+            ]
+        }
+        
+        with patch.object(SchemaManager, '_generate_create_table_sql',
+                          wraps=schema_manager._generate_create_table_sql) as mock_generate:
+            success, message = schema_manager.create_schema(schema)
+        
+        assert success is True
+        mock_generate.assert_not_called()
+        
+        success, results = schema_manager.connection.execute(
+            "SELECT name FROM sqlite_master WHERE type='index' AND name='idx_users_email'"
+        )
+        assert success is True
+        assert len(results) == 1
+    
+    def test_create_schema_index_pool_sqlite(self, schema_manager, temp_db_path):
+        """Test that SQLite builds the indexes in the batch instead of on the pool."""
+        schema = {
+            "tables": [
+                {
+                    "name": f"table_{i}",
+                    "columns": [
+                        {"name": "id", "type": "INTEGER", "primary_key": True},
+                        {"name": "value", "type": "TEXT"}
+                    ],
+                    "indexes": [
+                        {"name": f"idx_table_{i}_value", "columns": ["value"]}
+                    ]
+                }
+                for i in range(4)
+            ]
+        }
+        
+        pool = ConnectionPool(f'sqlite:///{temp_db_path}', pool_size=2)
+        
+        try:
+            with patch.object(pool, 'acquire') as mock_acquire:
+                success, message = schema_manager.create_schema(schema, index_pool=pool)
+        finally:
+            pool.close()
+        
+        assert success is True
+        mock_acquire.assert_not_called()
+        
+        success, results = schema_manager.connection.execute(
+            "SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx_table_%'"
+        )
+        assert success is True
+        assert len(results) == 4
+    
+    def test_create_indexes_in_parallel_failure(self, schema_manager, temp_db_path):
+        """Test that a failing index build reports the failing statement."""
+        schema_manager.connection.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, email TEXT)")
+        schema_manager.connection.commit()
+        
+        statements = [
+            "CREATE INDEX idx_users_email ON users (email);",
+            "CREATE INDEX idx_users_name ON users (name);"
+        ]
+        
+        pool = ConnectionPool(f'sqlite:///{temp_db_path}', pool_size=2)
+        
+        try:
+            success, message = schema_manager._create_indexes_in_parallel(statements, pool)
+        finally:
+            pool.close()
+        
+        assert success is False
+        assert "idx_users_name" in message
+        assert "idx_users_email" not in message
+    
+    def test_create_schema_failure(self, schema_manager):
+        """Test that a failing statement reports the schema as not created."""
+        # The index refers to a column that does not exist
+        schema = {
+            "tables": [
+                {
+                    "name": "users",
+                    "columns": [
+                        {"name": "id", "type": "INTEGER", "primary_key": True}
+                    ],
+                    "indexes": [
+                        {"name": "idx_users_email", "columns": ["email"]}
+                    ]
+                }
+            ]
+        }
+        
+        # Create the schema
+        success, message = schema_manager.create_schema(schema)
+        
+        assert success is False
+        assert "Failed to create database schema" in message
+        
+        # The table created earlier in the batch was rolled back
+        assert not schema_manager.connection.table_exists("users")
+    
     def test_drop_schema(self, schema_manager):
         """Test dropping a schema."""
         # Define a simple schema
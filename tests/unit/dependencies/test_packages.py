@@ -14,6 +14,8 @@ from pythonweb_installer.dependencies.packages import (
     parse_requirements_file,
     parse_package_spec,
     install_package,
+    install_packages,
+    install_packages_with_fallback,
     install_requirements,
     uninstall_package,
     get_package_info,
@@ -67,6 +69,29 @@ http://example.com/package8-1.0.0.tar.gz
         assert packages[1]["version_spec"] == ">=2.0.0"
         assert packages[6]["direct_reference"] is True
 
+    def test_parse_requirements_file_continuation(self, temp_dir):
+        """Test parsing a requirements file with line continuations."""
+        file_path = os.path.join(temp_dir, "requirements.txt")
+        with open(file_path, "w") as f:
+            f.write("package1==1.0.0 \\\n    # Comment\n\n-e .\npackage2\n")
+
+        success, packages = parse_requirements_file(file_path)
+
+        assert success is True
+        assert [package["name"] for package in packages] == ["package1", "package2"]
+        assert packages[0]["version"] == "1.0.0"
+
+    def test_parse_requirements_file_duplicates(self, temp_dir):
+        """Test parsing a requirements file with repeated lines."""
+        file_path = os.path.join(temp_dir, "requirements.txt")
+        with open(file_path, "w") as f:
+            f.write("package1==1.0.0\npackage2\npackage1==1.0.0\n")
+
+        success, packages = parse_requirements_file(file_path)
+
+        assert success is True
+        assert [package["name"] for package in packages] == ["package1", "package2"]
+
     def test_parse_requirements_file_not_exists(self, temp_dir):
         """Test parsing a non-existent requirements file."""
         file_path = os.path.join(temp_dir, "nonexistent.txt")
@@ -200,6 +225,46 @@ http://example.com/package8-1.0.0.tar.gz
         assert success is False
         assert "Failed to install package" in message
 
+    @patch('os.path.exists')
+    @patch('subprocess.run')
+    def test_install_package_pip_path_cached(self, mock_run, mock_exists, temp_dir):
+        """Test that the pip executable is only looked up once per environment."""
+        # Configure the mocks
+        mock_exists.return_value = True
+        mock_run.return_value = MagicMock(stdout="")
+
+        env_path = os.path.join(temp_dir, "venv")
+        install_package(env_path, "package1")
+        install_package(env_path, "package2")
+
+        assert mock_exists.call_count == 1
+        assert mock_run.call_count == 2
+
+    @patch('os.path.exists')
+    @patch('subprocess.run')
+    def test_install_package_pip_removed_after_caching(self, mock_run, mock_exists, temp_dir):
+        """Test that a cached pip executable that has been removed is reported as missing."""
+        # Configure the mocks
+        mock_exists.return_value = True
+        mock_run.return_value = MagicMock(stdout="")
+
+        env_path = os.path.join(temp_dir, "venv")
+        install_package(env_path, "package1")
+
+        # The environment is deleted after pip was found
+        mock_run.side_effect = FileNotFoundError(2, "No such file or directory")
+        mock_exists.return_value = False
+
+        success, message = install_package(env_path, "package2")
+        assert success is False
+        assert "Pip executable not found" in message
+
+        # The stale entry was dropped, so the next call looks pip up again
+        success, message = uninstall_package(env_path, "package1")
+        assert success is False
+        assert "Pip executable not found" in message
+        assert mock_run.call_count == 2
+
     @patch('os.path.exists')
     def test_install_package_no_pip(self, mock_exists, temp_dir):
         """Test package installation when pip is not available."""
@@ -212,6 +277,85 @@ http://example.com/package8-1.0.0.tar.gz
         assert success is False
         assert "Pip executable not found" in message
 
+    @patch('os.path.exists')
+    @patch('subprocess.run')
+    def test_install_packages_single_command(self, mock_run, mock_exists, temp_dir):
+        """Test installing several packages with one pip invocation."""
+        # Configure the mocks
+        mock_exists.return_value = True
+        mock_process = MagicMock()
+        mock_process.stdout = "Successfully installed package1-1.0.0 package2-2.0.0"
+        mock_run.return_value = mock_process
+
+        env_path = os.path.join(temp_dir, "venv")
+        success, result = install_packages(env_path, ["package1==1.0.0", "package2"], upgrade=True)
+
+        assert success is True
+        assert result["installed_packages"] == ["package1-1.0.0", "package2-2.0.0"]
+        mock_run.assert_called_once()
+
+        # Check that both packages are passed to the same command
+        cmd = mock_run.call_args[0][0]
+        assert cmd[-2:] == ["package1==1.0.0", "package2"]
+        assert "--upgrade" in cmd
+
+    @patch('os.path.exists')
+    @patch('subprocess.run')
+    def test_install_packages_single_package(self, mock_run, mock_exists, temp_dir):
+        """Test that a single package also reports what pip installed."""
+        # Configure the mocks
+        mock_exists.return_value = True
+        mock_process = MagicMock()
+        mock_process.stdout = "Successfully installed package1-1.0.0 dependency-2.0.0"
+        mock_run.return_value = mock_process
+
+        env_path = os.path.join(temp_dir, "venv")
+        success, result = install_packages(env_path, ["package1==1.0.0"])
+
+        assert success is True
+        assert result["installed_packages"] == ["package1-1.0.0", "dependency-2.0.0"]
+        mock_run.assert_called_once()
+
+    @patch('pythonweb_installer.dependencies.packages.install_packages')
+    def test_install_packages_with_fallback(self, mock_install_packages, temp_dir):
+        """Test installing packages with a single pip run."""
+        # Configure the mock
+        mock_install_packages.return_value = (True, {"message": "Successfully installed 2 packages"})
+
+        env_path = os.path.join(temp_dir, "venv")
+        success, result = install_packages_with_fallback(
+            env_path, ["package1==1.0.0", "package2"], upgrade=True
+        )
+
+        assert success is True
+        assert result["installed_packages"] == ["package1==1.0.0", "package2"]
+        assert result["failed_packages"] == {}
+        mock_install_packages.assert_called_once_with(
+            env_path, ["package1==1.0.0", "package2"], upgrade=True
+        )
+
+    @patch('pythonweb_installer.dependencies.packages.install_package')
+    @patch('pythonweb_installer.dependencies.packages.install_packages')
+    def test_install_packages_with_fallback_failure(self, mock_install_packages, mock_install, temp_dir):
+        """Test finding the failing packages one at a time after the batch fails."""
+        # Configure the mocks to fail for one package
+        mock_install_packages.return_value = (False, {"error": "Failed to install packages"})
+        mock_install.side_effect = lambda env_path, spec, **kwargs: (
+            (False, "Failed to install package2") if spec == "package2" else (True, f"Installed {spec}")
+        )
+
+        env_path = os.path.join(temp_dir, "venv")
+        success, result = install_packages_with_fallback(
+            env_path, ["package1==1.0.0", "package2", "package3"], upgrade=True
+        )
+
+        assert success is False
+        assert result["installed_packages"] == ["package1==1.0.0", "package3"]
+        assert result["failed_packages"] == {"package2": "Failed to install package2"}
+        assert mock_install.call_count == 3
+        for call in mock_install.call_args_list:
+            assert call[1] == {"upgrade": True}
+
     @patch('os.path.exists')
     @patch('subprocess.run')
     def test_install_requirements_success(self, mock_run, mock_exists, temp_dir, requirements_file):
@@ -328,7 +472,7 @@ http://example.com/package8-1.0.0.tar.gz
         # Configure the mocks
         mock_exists.return_value = True
         mock_process = MagicMock()
-        mock_process.stdout = """
+        mock_process.stdout = b"""
 Name: package1
 Version: 1.0.0
 Summary: Test package
@@ -357,6 +501,70 @@ Required-by: package4, package5
         assert package_info["requires"] == ["package2", "package3"]
         assert package_info["required_by"] == ["package4", "package5"]
 
+    @patch('subprocess.run')
+    def test_get_package_info_from_metadata(self, mock_run, temp_dir):
+        """Test reading package information from installed metadata without pip."""
+        env_path = os.path.join(temp_dir, "venv")
+        if os.name == "nt":
+            site_packages = os.path.join(env_path, "Lib", "site-packages")
+        else:
+            site_packages = os.path.join(env_path, "lib", "python3.9", "site-packages")
+
+        # Create metadata for two packages, one depending on the other
+        for name, version, requires in [
+            ("package1", "1.0.0", ["Package_2>=2.0", "extra-only; extra == 'test'"]),
+            ("package_2", "2.0.0", [])
+        ]:
+            dist_info = os.path.join(site_packages, f"{name}-{version}.dist-info")
+            os.makedirs(dist_info)
+            with open(os.path.join(dist_info, "METADATA"), "w") as f:
+                f.write(f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n"
+                        f"Summary: Test package\n")
+                for requirement in requires:
+                    f.write(f"Requires-Dist: {requirement}\n")
+
+        success, info = get_package_info(env_path, "package1")
+
+        assert success is True
+        assert info["name"] == "package1"
+        assert info["version"] == "1.0.0"
+        assert info["summary"] == "Test package"
+        assert info["requires"] == ["Package_2"]
+        assert info["required_by"] == []
+
+        success, info = get_package_info(env_path, "Package-2")
+
+        assert success is True
+        assert info["required_by"] == ["package1"]
+        mock_run.assert_not_called()
+
+    @patch('importlib.metadata.distributions')
+    @patch('subprocess.run')
+    def test_get_package_info_metadata_error(self, mock_run, mock_distributions, temp_dir):
+        """Test falling back to pip when the installed metadata cannot be read."""
+        env_path = os.path.join(temp_dir, "venv")
+        if os.name == "nt":
+            os.makedirs(os.path.join(env_path, "Lib", "site-packages"))
+            pip_exe = os.path.join(env_path, "Scripts", "pip.exe")
+        else:
+            os.makedirs(os.path.join(env_path, "lib", "python3.9", "site-packages"))
+            pip_exe = os.path.join(env_path, "bin", "pip")
+        os.makedirs(os.path.dirname(pip_exe))
+        open(pip_exe, "w").close()
+
+        # Configure the mocks
+        mock_distributions.side_effect = OSError("Permission denied")
+        mock_process = MagicMock()
+        mock_process.stdout = b"Name: package1\nVersion: 1.0.0\n"
+        mock_run.return_value = mock_process
+
+        success, info = get_package_info(env_path, "package1")
+
+        assert success is True
+        assert info["name"] == "package1"
+        assert info["version"] == "1.0.0"
+        mock_run.assert_called_once()
+
     @patch('os.path.exists')
     @patch('subprocess.run')
     def test_get_package_info_no_dependencies(self, mock_run, mock_exists, temp_dir):
@@ -364,7 +572,7 @@ Required-by: package4, package5
         # Configure the mocks
         mock_exists.return_value = True
         mock_process = MagicMock()
-        mock_process.stdout = """
+        mock_process.stdout = b"""
 Name: package1
 Version: 1.0.0
 Summary: Test package
@@ -5,6 +5,7 @@ import os
 import json
 import tempfile
 import shutil
+import threading
 import subprocess
 from unittest.mock import patch, MagicMock
 
@@ -15,7 +16,9 @@ from pythonweb_installer.dependencies.resolution import (
     resolve_dependency_conflicts,
     build_dependency_graph,
     find_dependency_path,
-    find_circular_dependencies
+    find_circular_dependencies,
+    invalidate_cache,
+    _ResolveIndex
 )
 
 
@@ -77,18 +80,11 @@ package3<3.0.0
         # Configure the mocks
         mock_exists.return_value = True
 
-        # First call to install pip-check succeeds
-        first_process = MagicMock()
-        first_process.stdout = ""
-        first_process.stderr = ""
-
-        # Second call to pip check returns conflicts
-        second_process = MagicMock()
-        second_process.stdout = "package1 1.0.0 has requirement package2>=2.0.0, which is incompatible with installed version package2 1.0.0."
-        second_process.stderr = ""
-
-        # Configure mock_run to return different results for each call
-        mock_run.side_effect = [first_process, second_process]
+        # pip check returns conflicts
+        mock_process = MagicMock()
+        mock_process.stdout = b"package1 1.0.0 has requirement package2>=2.0.0, which is incompatible with installed version package2 1.0.0."
+        mock_process.stderr = ""
+        mock_run.return_value = mock_process
 
         env_path = os.path.join(temp_dir, "venv")
         success, result = detect_dependency_conflicts(env_path, package_specs=package_specs)
@@ -97,6 +93,62 @@ package3<3.0.0
         assert result["has_conflicts"] is True
         assert len(result["conflicts"]) == 1
         assert "package1 1.0.0 has requirement package2>=2.0.0" in result["conflicts"][0]
+        mock_run.assert_called_once()
+        assert mock_run.call_args[0][0][1:] == ["check"]
+        assert mock_run.call_args[1]["stderr"] == subprocess.STDOUT
+
+    @patch('subprocess.run')
+    def test_detect_dependency_conflicts_cached(self, mock_run, temp_dir, package_specs):
+        """Test reusing the conflict check of an unchanged environment."""
+        env_path = os.path.join(temp_dir, "venv")
+        site_packages = os.path.join(env_path, "lib", "python3.11", "site-packages")
+        os.makedirs(os.path.join(site_packages, "package1-1.0.0.dist-info"))
+        os.makedirs(os.path.join(env_path, "bin"))
+        open(os.path.join(env_path, "bin", "pip"), "w").close()
+
+        # Configure the mock
+        mock_process = MagicMock()
+        mock_process.stdout = b"package1 1.0.0 has requirement package2>=2.0.0, which is incompatible with installed version package2 1.0.0."
+        mock_process.stderr = ""
+        mock_run.return_value = mock_process
+
+        index = _ResolveIndex(os.path.join(temp_dir, "cache", "resolve_index.json"))
+        with patch('pythonweb_installer.dependencies.resolution._RESOLVE_INDEX', index):
+            first_success, first_result = detect_dependency_conflicts(env_path, package_specs=package_specs)
+
+            # The on-disk index still answers once the in-process cache is gone
+            invalidate_cache()
+            second_success, second_result = detect_dependency_conflicts(env_path, package_specs=package_specs)
+
+        assert first_success is True
+        assert second_success is True
+        assert second_result == first_result
+        assert first_result["has_conflicts"] is True
+        mock_run.assert_called_once()
+
+    @patch('subprocess.run')
+    def test_detect_dependency_conflicts_failed_check_not_recorded(self, mock_run, temp_dir, package_specs):
+        """Test that a failed pip check without recognized conflicts is not recorded."""
+        env_path = os.path.join(temp_dir, "venv")
+        site_packages = os.path.join(env_path, "lib", "python3.11", "site-packages")
+        os.makedirs(os.path.join(site_packages, "package1-1.0.0.dist-info"))
+        os.makedirs(os.path.join(env_path, "bin"))
+        open(os.path.join(env_path, "bin", "pip"), "w").close()
+
+        # Configure the mock with pip check output the conflict filter does not match
+        mock_run.return_value = MagicMock(
+            returncode=1, stdout=b"package1 1.0.0 requires package2, which is not installed.\n"
+        )
+
+        index = _ResolveIndex(os.path.join(temp_dir, "cache", "resolve_index.json"))
+        with patch('pythonweb_installer.dependencies.resolution._RESOLVE_INDEX', index):
+            detect_dependency_conflicts(env_path, package_specs=package_specs)
+
+            invalidate_cache()
+            detect_dependency_conflicts(env_path, package_specs=package_specs)
+
+        assert mock_run.call_count == 2
+        assert "close_fds" in mock_run.call_args[1]
 
     @patch('os.path.exists')
     @patch('subprocess.run')
@@ -154,11 +206,11 @@ package3<3.0.0
         assert "error" in result
         assert "Pip executable not found" in result["error"]
 
-    @patch('pythonweb_installer.dependencies.resolution.install_package')
+    @patch('pythonweb_installer.dependencies.resolution.install_packages')
     def test_resolve_dependency_conflicts_upgrade_success(self, mock_install, temp_dir):
         """Test resolving dependency conflicts with upgrade strategy."""
         # Configure the mock
-        mock_install.return_value = (True, "Successfully installed package2>=2.0.0")
+        mock_install.return_value = (True, {"message": "Successfully installed 1 packages"})
 
         env_path = os.path.join(temp_dir, "venv")
         conflicts = [
@@ -172,7 +224,29 @@ package3<3.0.0
         assert result["resolved"][0]["package"] == "package2"
         assert result["resolved"][0]["action"] == "upgraded"
         assert len(result["failed"]) == 0
-        mock_install.assert_called_once()
+        mock_install.assert_called_once_with(env_path, ["package2>=2.0.0"], upgrade=True)
+
+    @patch('pythonweb_installer.dependencies.resolution.install_packages')
+    def test_resolve_dependency_conflicts_upgrade_multiple(self, mock_install, temp_dir):
+        """Test upgrading several conflicting packages with a single pip run."""
+        # Configure the mock
+        mock_install.return_value = (True, {"message": "Successfully installed 2 packages"})
+
+        env_path = os.path.join(temp_dir, "venv")
+        conflicts = [
+            "package1 1.0.0 has requirement package2>=2.0.0, but you have package2 1.0.0.",
+            "package3 1.0.0 has requirement package4>=4.0.0, but you have package4 1.0.0.",
+            "package5 1.0.0 has requirement package2>=2.1.0, but you have package2 1.0.0."
+        ]
+
+        success, result = resolve_dependency_conflicts(env_path, conflicts, strategy="upgrade")
+
+        assert success is True
+        assert [entry["package"] for entry in result["resolved"]] == ["package2", "package4"]
+        assert result["resolved"][0]["to_spec"] == "package2>=2.1.0"
+        mock_install.assert_called_once_with(
+            env_path, ["package2>=2.1.0", "package4>=4.0.0"], upgrade=True
+        )
 
     @patch('pythonweb_installer.dependencies.resolution.get_package_info')
     @patch('pythonweb_installer.dependencies.resolution.uninstall_package')
@@ -220,11 +294,11 @@ package3<3.0.0
         assert len(result["failed"]) == 0
         mock_uninstall.assert_called_once()
 
-    @patch('pythonweb_installer.dependencies.resolution.install_package')
+    @patch('pythonweb_installer.dependencies.resolution.install_packages')
     def test_resolve_dependency_conflicts_partial_failure(self, mock_install, temp_dir):
         """Test partially failing to resolve dependency conflicts."""
         # Configure the mock
-        mock_install.return_value = (False, "Failed to install package2>=2.0.0")
+        mock_install.return_value = (False, {"error": "Failed to install packages"})
 
         env_path = os.path.join(temp_dir, "venv")
         conflicts = [
@@ -238,6 +312,7 @@ package3<3.0.0
         assert len(result["failed"]) == 1
         assert result["failed"][0]["package"] == "package2"
         assert result["failed"][0]["action"] == "upgrade"
+        assert result["failed"][0]["error"] == "Failed to install packages"
         mock_install.assert_called_once()
 
     def test_resolve_dependency_conflicts_no_conflicts(self, temp_dir):
@@ -250,47 +325,87 @@ package3<3.0.0
         assert success is True
         assert "No conflicts to resolve" in result["message"]
 
+    def test_resolve_index_reload(self, temp_dir):
+        """Test that the resolve index is only read again when the file changes."""
+        index_file = os.path.join(temp_dir, "cache", "resolve_index.json")
+        first = _ResolveIndex(index_file)
+        second = _ResolveIndex(index_file)
+
+        first.put("sig1", conflicts=[])
+        assert second.get("sig1") == {"created": first.get("sig1")["created"], "conflicts": []}
+
+        with patch('json.load', wraps=json.load) as mock_load:
+            second.get("sig1")
+            first.get("sig1")
+            mock_load.assert_not_called()
+
+            # Entries written by another instance are merged, not overwritten
+            second.put("sig2", conflicts=["conflict"])
+            assert first.get("sig1")["conflicts"] == []
+            assert first.get("sig2")["conflicts"] == ["conflict"]
+            assert mock_load.call_count == 1
+
+    def test_resolve_index_expired(self, temp_dir):
+        """Test that expired resolve index entries are not used."""
+        index = _ResolveIndex(os.path.join(temp_dir, "resolve_index.json"), max_age=60)
+
+        with patch('time.time', return_value=1000.0):
+            index.put("sig", conflicts=[])
+        with patch('time.time', return_value=1059.0):
+            assert index.get("sig") is not None
+        with patch('time.time', return_value=1060.0):
+            assert index.get("sig") is None
+
+    def test_resolve_index_concurrent_put(self, temp_dir):
+        """Test that concurrent writes to the resolve index are not lost."""
+        index_file = os.path.join(temp_dir, "cache", "resolve_index.json")
+        index = _ResolveIndex(index_file)
+        signatures = [f"sig{i}" for i in range(16)]
+
+        threads = [
+            threading.Thread(target=index.put, args=(signature,), kwargs={"conflicts": []})
+            for signature in signatures
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with open(index_file) as f:
+            assert sorted(json.load(f)) == sorted(signatures)
+        assert os.listdir(os.path.dirname(index_file)) == ["resolve_index.json"]
+
     @patch('os.path.exists')
     @patch('subprocess.run')
-    @patch('pythonweb_installer.dependencies.resolution.get_package_info')
-    def test_build_dependency_graph_success(self, mock_get_info, mock_run, mock_exists, temp_dir):
+    def test_build_dependency_graph_success(self, mock_run, mock_exists, temp_dir):
         """Test successful dependency graph building."""
         # Configure the mocks
         mock_exists.return_value = True
-        mock_process = MagicMock()
-        mock_process.stdout = json.dumps([
+        list_process = MagicMock()
+        list_process.stdout = json.dumps([
             {"name": "package1", "version": "1.0.0"},
             {"name": "package2", "version": "2.0.0"},
             {"name": "package3", "version": "3.0.0"}
         ])
-        mock_run.return_value = mock_process
-
-        # Mock package info responses
-        def get_info_side_effect(env_path, package_name):
-            if package_name == "package1":
-                return True, {
-                    "name": "package1",
-                    "version": "1.0.0",
-                    "requires": ["package2>=2.0.0"],
-                    "required_by": []
-                }
-            elif package_name == "package2":
-                return True, {
-                    "name": "package2",
-                    "version": "2.0.0",
-                    "requires": ["package3>=3.0.0"],
-                    "required_by": ["package1"]
-                }
-            elif package_name == "package3":
-                return True, {
-                    "name": "package3",
-                    "version": "3.0.0",
-                    "requires": [],
-                    "required_by": ["package2"]
-                }
-            return False, {"error": f"Unknown package: {package_name}"}
 
-        mock_get_info.side_effect = get_info_side_effect
+        # All packages are shown by a single pip show call
+        show_process = MagicMock()
+        show_process.stdout = """Name: package1
+Version: 1.0.0
+Requires: package2>=2.0.0
+Required-by:
+---
+Name: package2
+Version: 2.0.0
+Requires: package3>=3.0.0
+Required-by: package1
+---
+Name: package3
+Version: 3.0.0
+Requires:
+Required-by: package2
+"""
+        mock_run.side_effect = [list_process, show_process]
 
         env_path = os.path.join(temp_dir, "venv")
         success, result = build_dependency_graph(env_path)
@@ -304,6 +419,102 @@ package3<3.0.0
         assert result["graph"]["package1"]["dependencies"] == ["package2>=2.0.0"]
         assert result["graph"]["package2"]["dependencies"] == ["package3>=3.0.0"]
         assert result["graph"]["package3"]["dependencies"] == []
+        assert result["graph"]["package2"]["dependents"] == ["package1"]
+        assert mock_run.call_count == 2
+
+    @patch('subprocess.run')
+    def test_build_dependency_graph_resolve_index(self, mock_run, temp_dir):
+        """Test reusing package information from the resolve index."""
+        env_path = os.path.join(temp_dir, "venv")
+        site_packages = os.path.join(env_path, "lib", "python3.11", "site-packages")
+        os.makedirs(os.path.join(site_packages, "package1-1.0.0.dist-info"))
+        os.makedirs(os.path.join(env_path, "bin"))
+        open(os.path.join(env_path, "bin", "pip"), "w").close()
+
+        # Configure the mock
+        list_process = MagicMock()
+        list_process.stdout = json.dumps([{"name": "package1", "version": "1.0.0"}])
+        show_process = MagicMock()
+        show_process.stdout = "Name: package1\nVersion: 1.0.0\nRequires:\nRequired-by:\n"
+        mock_run.side_effect = [list_process, show_process]
+
+        index = _ResolveIndex(os.path.join(temp_dir, "cache", "resolve_index.json"))
+        with patch('pythonweb_installer.dependencies.resolution._RESOLVE_INDEX', index):
+            first_success, first_result = build_dependency_graph(env_path)
+            second_success, second_result = build_dependency_graph(env_path)
+
+            # A changed environment is not served from the index
+            os.makedirs(os.path.join(site_packages, "package2-2.0.0.dist-info"))
+            mock_run.side_effect = subprocess.CalledProcessError(1, "pip", stderr="Graph building failed")
+            third_success, _ = build_dependency_graph(env_path)
+
+        assert first_success is True
+        assert second_success is True
+        assert second_result["graph"] == first_result["graph"]
+        assert "package1" in second_result["graph"]
+        assert third_success is False
+
+    @patch('subprocess.run')
+    def test_build_dependency_graph_memoized(self, mock_run, temp_dir):
+        """Test reusing a dependency graph built earlier in the process."""
+        env_path = os.path.join(temp_dir, "venv")
+        os.makedirs(os.path.join(env_path, "lib", "python3.11", "site-packages"))
+        os.makedirs(os.path.join(env_path, "bin"))
+        open(os.path.join(env_path, "bin", "pip"), "w").close()
+
+        # Configure the mock
+        list_process = MagicMock()
+        list_process.stdout = json.dumps([{"name": "package1", "version": "1.0.0"}])
+        show_process = MagicMock()
+        show_process.stdout = "Name: package1\nVersion: 1.0.0\nRequires: package2\nRequired-by:\n"
+        mock_run.side_effect = [list_process, show_process, list_process, show_process]
+
+        index = MagicMock()
+        index.get.return_value = None
+        with patch('pythonweb_installer.dependencies.resolution._RESOLVE_INDEX', index):
+            _, first_result = build_dependency_graph(env_path)
+            first_result["graph"]["package1"]["dependencies"].append("package3")
+            _, second_result = build_dependency_graph(env_path)
+            assert mock_run.call_count == 2
+
+            invalidate_cache()
+            build_dependency_graph(env_path)
+            assert mock_run.call_count == 4
+
+        # Results are copies of the memoized graph
+        assert second_result["graph"]["package1"]["dependencies"] == ["package2"]
+
+    @patch('subprocess.run')
+    def test_build_dependency_graph_from_metadata(self, mock_run, temp_dir):
+        """Test building a dependency graph from installed metadata without pip."""
+        env_path = os.path.join(temp_dir, "venv")
+        site_packages = os.path.join(env_path, "lib", "python3.11", "site-packages")
+        os.makedirs(os.path.join(env_path, "bin"))
+        open(os.path.join(env_path, "bin", "pip"), "w").close()
+
+        # Create metadata for three packages in a chain
+        for name, version, requires in [
+            ("package1", "1.0.0", ["package2>=2.0"]),
+            ("package2", "2.0.0", ["package3"]),
+            ("package3", "3.0.0", [])
+        ]:
+            dist_info = os.path.join(site_packages, f"{name}-{version}.dist-info")
+            os.makedirs(dist_info)
+            with open(os.path.join(dist_info, "METADATA"), "w") as f:
+                f.write(f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n")
+                for requirement in requires:
+                    f.write(f"Requires-Dist: {requirement}\n")
+
+        index = MagicMock()
+        index.get.return_value = None
+        with patch('pythonweb_installer.dependencies.resolution._RESOLVE_INDEX', index):
+            success, result = build_dependency_graph(env_path, ["package2"])
+
+        assert success is True
+        assert list(result["graph"]) == ["package2", "package3"]
+        assert result["graph"]["package2"]["dependencies"] == ["package3"]
+        assert result["graph"]["package2"]["dependents"] == ["package1"]
+        mock_run.assert_not_called()
 
     @patch('os.path.exists')
     @patch('subprocess.run')
@@ -500,6 +711,34 @@ package3<3.0.0
 
         assert found_cycle is True
 
+    @patch('pythonweb_installer.dependencies.resolution.build_dependency_graph')
+    def test_find_circular_dependencies_components(self, mock_build_graph, temp_dir):
+        """Test reporting each circular dependency once, including self-dependencies."""
+        # Configure the mock with a long cycle, a two-package cycle and a self-dependency
+        graph = {
+            f"package{i}": {
+                "name": f"package{i}",
+                "version": "1.0.0",
+                "dependencies": [f"package{(i + 1) % 2000}>=1.0.0"],
+                "dependents": []
+            }
+            for i in range(2000)
+        }
+        graph["packagea"] = {"name": "packagea", "version": "1.0.0", "dependencies": ["packageb"], "dependents": []}
+        graph["packageb"] = {"name": "packageb", "version": "1.0.0", "dependencies": ["packagea"], "dependents": []}
+        graph["packagec"] = {"name": "packagec", "version": "1.0.0", "dependencies": ["packagec"], "dependents": []}
+        mock_build_graph.return_value = (True, {"graph": graph})
+
+        env_path = os.path.join(temp_dir, "venv")
+        success, result = find_circular_dependencies(env_path)
+
+        assert success is True
+        assert result["count"] == 3
+        cycles = sorted(result["circular_dependencies"], key=len)
+        assert cycles[0] == ["packagec"]
+        assert sorted(cycles[1]) == ["packagea", "packageb"]
+        assert len(cycles[2]) == 2000
+
     @patch('pythonweb_installer.dependencies.resolution.build_dependency_graph')
     def test_find_circular_dependencies_none(self, mock_build_graph, temp_dir):
         """Test finding circular dependencies when none exist."""
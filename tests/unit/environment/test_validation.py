@@ -10,12 +10,17 @@ from unittest.mock import patch, MagicMock
 
 import pytest
 
+from pythonweb_installer.dependencies.packages import install_package
 from pythonweb_installer.environment.validation import (
     validate_python_version,
     validate_virtual_environment,
     validate_dependencies,
     repair_virtual_environment,
-    install_missing_dependencies
+    install_missing_dependencies,
+    clear_validation_cache,
+    _BIN_DIR,
+    _PY_EXE_NAME,
+    _PIP_EXE_NAME
 )
 
 
@@ -74,17 +79,26 @@ class TestEnvironmentValidation:
         assert result["meets_min"] is True
         assert result["meets_max"] is False
 
-    @patch('os.path.exists')
+    def _make_venv(self, env_path, executables):
+        """Create a minimal virtual environment layout."""
+        bin_dir = os.path.join(env_path, _BIN_DIR)
+        os.makedirs(bin_dir)
+        with open(os.path.join(env_path, "pyvenv.cfg"), "w") as f:
+            f.write("home = /usr/bin\n")
+        for name in executables:
+            with open(os.path.join(bin_dir, name), "w") as f:
+                f.write("")
+
     @patch('subprocess.run')
-    def test_validate_virtual_environment_valid(self, mock_run, mock_exists, temp_dir):
+    def test_validate_virtual_environment_valid(self, mock_run, temp_dir):
         """Test validating a valid virtual environment."""
         # Configure the mocks
-        mock_exists.return_value = True
         mock_process = MagicMock()
         mock_process.stdout = "Python 3.9.5\n"
         mock_run.return_value = mock_process
 
         env_path = os.path.join(temp_dir, "venv")
+        self._make_venv(env_path, [_PY_EXE_NAME, _PIP_EXE_NAME])
         valid, result = validate_virtual_environment(env_path)
 
         assert valid is True
@@ -93,8 +107,42 @@ class TestEnvironmentValidation:
         assert result["exists"] is True
         assert result["has_pyvenv_cfg"] is True
         assert result["has_python_exe"] is True
+        assert result["has_pip_exe"] is True
         assert result["python_version"] == "Python 3.9.5"
 
+    @patch('subprocess.run')
+    def test_validate_virtual_environment_python_not_runnable(self, mock_run, temp_dir):
+        """Test validating an environment whose Python executable cannot be run."""
+        mock_run.side_effect = PermissionError(13, "Permission denied")
+
+        env_path = os.path.join(temp_dir, "venv")
+        self._make_venv(env_path, [_PY_EXE_NAME, _PIP_EXE_NAME])
+        valid, result = validate_virtual_environment(env_path)
+
+        assert valid is True
+        assert result["python_version"] is None
+
+    @patch('subprocess.run')
+    def test_validate_virtual_environment_cached(self, mock_run, temp_dir):
+        """Test that validation results are reused until the cache is cleared."""
+        mock_run.return_value = MagicMock(stdout="Python 3.9.5\n")
+
+        env_path = os.path.join(temp_dir, "venv")
+        self._make_venv(env_path, [_PY_EXE_NAME, _PIP_EXE_NAME])
+
+        valid, result = validate_virtual_environment(env_path)
+        result["valid"] = False
+        valid, result = validate_virtual_environment(env_path)
+
+        assert valid is True
+        assert result["valid"] is True
+        assert mock_run.call_count == 1
+
+        clear_validation_cache(env_path)
+        validate_virtual_environment(env_path)
+
+        assert mock_run.call_count == 2
+
     @patch('os.path.exists')
     def test_validate_virtual_environment_not_exists(self, mock_exists, temp_dir):
         """Test validating a non-existent virtual environment."""
@@ -127,22 +175,11 @@ class TestEnvironmentValidation:
         assert result["exists"] is True
         assert result["has_pyvenv_cfg"] is False
 
-    @patch('os.path.exists')
-    def test_validate_virtual_environment_missing_python(self, mock_exists, temp_dir):
+    def test_validate_virtual_environment_missing_python(self, temp_dir):
         """Test validating a virtual environment without Python executable."""
-        # Configure the mock to simulate missing Python executable
-        def exists_side_effect(path):
-            if os.path.dirname(path) == temp_dir:
-                return True  # Directory exists
-            if "pyvenv.cfg" in path:
-                return True  # pyvenv.cfg exists
-            if "python" in path:
-                return False  # Python executable doesn't exist
-            return True
-
-        mock_exists.side_effect = exists_side_effect
-
+        # Create an environment with pip but no Python executable
         env_path = os.path.join(temp_dir, "venv")
+        self._make_venv(env_path, [_PIP_EXE_NAME])
         valid, result = validate_virtual_environment(env_path)
 
         assert valid is False
@@ -179,6 +216,42 @@ class TestEnvironmentValidation:
         assert len(result["version_mismatches"]) == 0
         assert len(result["installed_packages"]) == 3
 
+    @patch('pythonweb_installer.environment.validation.list_installed_packages')
+    def test_validate_dependencies_no_required_packages(self, mock_list_packages, temp_dir):
+        """Test that nothing is listed when no packages are required."""
+        env_path = os.path.join(temp_dir, "venv")
+
+        valid, result = validate_dependencies(env_path, [])
+
+        assert valid is True
+        assert result["valid"] is True
+        mock_list_packages.assert_not_called()
+
+    @patch('pythonweb_installer.environment.validation.list_installed_packages')
+    def test_validate_dependencies_from_metadata(self, mock_list_packages, temp_dir):
+        """Test validating dependencies from the metadata files without running pip."""
+        env_path = os.path.join(temp_dir, "venv")
+        site_packages = os.path.join(env_path, "lib", "python3.9", "site-packages")
+        for name, version in (("package1", "1.0.0"), ("package2", "2.0.0")):
+            dist_info = os.path.join(site_packages, f"{name}-{version}.dist-info")
+            os.makedirs(dist_info)
+            with open(os.path.join(dist_info, "METADATA"), "w") as f:
+                f.write(f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n")
+
+        required_packages = [
+            {"name": "package1", "version": "1.0.0"},
+            {"name": "package2", "version": "2.1.0"},
+            {"name": "package3", "version": "3.0.0"},
+        ]
+
+        with patch('pythonweb_installer.dependencies.metadata._IS_WINDOWS', False):
+            valid, result = validate_dependencies(env_path, required_packages)
+
+        assert valid is False
+        assert [pkg["name"] for pkg in result["missing_packages"]] == ["package3"]
+        assert result["version_mismatches"][0]["installed_version"] == "2.0.0"
+        mock_list_packages.assert_not_called()
+
     @patch('pythonweb_installer.environment.validation.list_installed_packages')
     def test_validate_dependencies_missing_package(self, mock_list_packages, temp_dir):
         """Test validating dependencies when a package is missing."""
@@ -252,6 +325,45 @@ class TestEnvironmentValidation:
         assert result["valid"] is False
         assert len(result["installed_packages"]) == 0
 
+    @patch('pythonweb_installer.environment.validation.list_installed_packages')
+    def test_validate_dependencies_cached_copies(self, mock_list_packages, temp_dir):
+        """Test that changing a result leaves the cached package list untouched."""
+        # Configure the mock
+        mock_list_packages.return_value = (True, [{"name": "package1", "version": "1.0.0"}])
+
+        env_path = os.path.join(temp_dir, "venv")
+        required_packages = [
+            {"name": "package1", "version": "1.0.0"},
+        ]
+
+        valid, result = validate_dependencies(env_path, required_packages)
+        result["installed_packages"][0]["version"] = "2.0.0"
+        valid, result = validate_dependencies(env_path, required_packages)
+
+        assert valid is True
+        assert result["installed_packages"][0]["version"] == "1.0.0"
+        assert mock_list_packages.call_count == 1
+
+    @patch('subprocess.run')
+    @patch('pythonweb_installer.environment.validation.list_installed_packages')
+    def test_install_package_clears_validation_cache(self, mock_list_packages, mock_run, temp_dir):
+        """Test that installing a package makes validation list the packages again."""
+        # Configure the mock
+        mock_list_packages.return_value = (True, [])
+
+        env_path = os.path.join(temp_dir, "venv")
+        self._make_venv(env_path, [_PY_EXE_NAME, _PIP_EXE_NAME])
+        required_packages = [
+            {"name": "package1", "version": "1.0.0"},
+        ]
+
+        validate_dependencies(env_path, required_packages)
+        install_package(env_path, "package1==1.0.0")
+        validate_dependencies(env_path, required_packages)
+
+        mock_run.assert_called_once()
+        assert mock_list_packages.call_count == 2
+
     @patch('pythonweb_installer.environment.validation.validate_virtual_environment')
     @patch('subprocess.run')
     def test_repair_virtual_environment_already_valid(self, mock_run, mock_validate, temp_dir):
@@ -265,6 +377,7 @@ class TestEnvironmentValidation:
         assert success is True
         assert "already valid" in message
         mock_run.assert_not_called()
+        mock_validate.assert_called_once_with(env_path, fetch_version=False)
 
     @patch('pythonweb_installer.environment.validation.validate_virtual_environment')
     def test_repair_virtual_environment_not_exists(self, mock_validate, temp_dir):
@@ -313,6 +426,21 @@ class TestEnvironmentValidation:
         assert success is False
         assert "Failed to install pip" in message
 
+    @patch('pythonweb_installer.environment.validation.validate_virtual_environment')
+    @patch('subprocess.run')
+    def test_repair_virtual_environment_python_not_runnable(self, mock_run, mock_validate, temp_dir):
+        """Test repairing an environment whose Python executable cannot be run."""
+        mock_validate.return_value = (
+            False, {"valid": False, "exists": True, "has_pyvenv_cfg": True, "has_pip_exe": False}
+        )
+        mock_run.side_effect = PermissionError(13, "Permission denied")
+
+        env_path = os.path.join(temp_dir, "venv")
+        success, message = repair_virtual_environment(env_path)
+
+        assert success is False
+        assert "Failed to install pip" in message
+
     @patch('pythonweb_installer.environment.validation.validate_dependencies')
     def test_install_missing_dependencies_already_valid(self, mock_validate, temp_dir):
         """Test installing dependencies when all are already installed."""
@@ -401,6 +529,34 @@ class TestEnvironmentValidation:
         assert result["failed"][0]["name"] == "package3"
         assert result["all_dependencies_valid"] is False
 
+    @patch('pythonweb_installer.environment.validation.validate_dependencies')
+    @patch('os.path.exists')
+    @patch('subprocess.run')
+    def test_install_missing_dependencies_pip_not_runnable(
+        self, mock_run, mock_exists, mock_validate, temp_dir
+    ):
+        """Test installing dependencies when the pip executable cannot be run."""
+        # Configure the mocks
+        mock_validate.return_value = (False, {
+            "valid": False,
+            "missing_packages": [
+                {"name": "package1", "version": "1.0.0"},
+                {"name": "package2", "version": "2.0.0"},
+            ],
+            "version_mismatches": []
+        })
+        mock_exists.return_value = True
+        mock_run.side_effect = OSError(8, "Exec format error")
+
+        env_path = os.path.join(temp_dir, "venv")
+        success, result = install_missing_dependencies(env_path, [], verify=False)
+
+        assert success is False
+        assert result["installed"] == []
+        assert [failure["name"] for failure in result["failed"]] == ["package1", "package2"]
+        # Pip is not retried one package at a time when it cannot be started
+        mock_run.assert_called_once()
+
     @patch('pythonweb_installer.environment.validation.validate_dependencies')
     @patch('os.path.exists')
     def test_install_missing_dependencies_no_pip(self, mock_exists, mock_validate, temp_dir):
@@ -426,3 +582,72 @@ class TestEnvironmentValidation:
 
         assert success is False
         assert "Pip executable not found" in result["error"]
+
+    @patch('pythonweb_installer.environment.validation.validate_dependencies')
+    @patch('os.path.exists')
+    @patch('subprocess.run')
+    def test_install_missing_dependencies_batch_retry(self, mock_run, mock_exists, mock_validate, temp_dir):
+        """Test that a failed batch install is retried per package to find the failure."""
+        # Configure the mocks
+        mock_validate.side_effect = [
+            (False, {
+                "valid": False,
+                "missing_packages": [
+                    {"name": "package2", "version": "2.0.0"},
+                    {"name": "package3", "version": "3.0.0"},
+                ],
+                "version_mismatches": []
+            }),
+            (False, {"valid": False})
+        ]
+        mock_exists.return_value = True
+        mock_run.side_effect = [
+            subprocess.CalledProcessError(1, "pip", stderr="Command failed"),
+            MagicMock(returncode=0),
+            subprocess.CalledProcessError(1, "pip", stderr="Command failed"),
+        ]
+
+        env_path = os.path.join(temp_dir, "venv")
+        required_packages = [
+            {"name": "package2", "version": "2.0.0"},
+            {"name": "package3", "version": "3.0.0"},
+        ]
+
+        success, result = install_missing_dependencies(env_path, required_packages)
+
+        assert success is False
+        assert [pkg["name"] for pkg in result["installed"]] == ["package2"]
+        assert [pkg["name"] for pkg in result["failed"]] == ["package3"]
+        assert mock_run.call_args_list[0][0][0][2:] == ["package2==2.0.0", "package3==3.0.0"]
+        assert mock_run.call_count == 3
+
+    @patch('pythonweb_installer.environment.validation.validate_dependencies')
+    @patch('os.path.exists')
+    @patch('subprocess.run')
+    def test_install_missing_dependencies_verify(self, mock_run, mock_exists, mock_validate, temp_dir):
+        """Test that dependencies are only listed again when verify is requested."""
+        # Configure the mocks
+        missing = (False, {
+            "valid": False,
+            "missing_packages": [{"name": "package3", "version": "3.0.0"}],
+            "version_mismatches": []
+        })
+        mock_validate.side_effect = [missing, missing]
+        mock_exists.return_value = True
+        mock_run.return_value = MagicMock(returncode=0)
+
+        env_path = os.path.join(temp_dir, "venv")
+        required_packages = [{"name": "package3", "version": "3.0.0"}]
+
+        success, result = install_missing_dependencies(env_path, required_packages)
+
+        assert result["all_dependencies_valid"] is True
+        assert mock_validate.call_count == 1
+
+        mock_validate.side_effect = [missing, missing]
+        mock_validate.reset_mock()
+
+        success, result = install_missing_dependencies(env_path, required_packages, verify=True)
+
+        assert result["all_dependencies_valid"] is False
+        assert mock_validate.call_count == 2